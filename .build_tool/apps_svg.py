@@ -0,0 +1,133 @@
+#!/usr/bin/env python3.6
+
+""" Application icon transforms for build_tool.py script: the scalable icon groups are given
+    ids and lined up, and larger embedded PNG icons removed - on the parsed element tree, or
+    streamed element by element. """
+
+import io
+import os
+import re
+import global_variables
+from output_files import create_output_file, create_temporary_file
+from svg_stream import APPS_SVG_MATRIX_REGEX, APPS_SVG_TRANSLATE_REGEX
+from svg_stream import AppsSvgStreamHandler, SvgStreamWriter
+
+
+def xml_process_apps_svg_id_element(xml_root, element, max_icon_size):
+    """ For the specified application icon embedded PNG icon fix the y coord.
+        Remove larger icon references. """
+    internal_size = (max_icon_size*3)//4
+    icon_border = (max_icon_size-internal_size)//2
+    xml_height = int(element.get("height"))
+    if element.tag == '{'+global_variables.XMLNS['svg']+'}image':
+        y_value = max_icon_size-xml_height-icon_border
+        element.set('y', str(y_value))
+    elif xml_height > max_icon_size:
+        xml_root.remove(element)
+        element = None
+    return xml_root
+
+
+def xml_process_apps_svg_group(xml_root, element, x_offset, y_offset):
+    """ Remove very large application scaled icons (>1x scale) for specified XML element.
+        For all other icons set X and Y offsets. """
+    xml_transform_attrib = element.attrib.get('transform')
+    if xml_transform_attrib is None:
+        return xml_root
+    matrix_match = APPS_SVG_MATRIX_REGEX.search(xml_transform_attrib)
+    if matrix_match:
+        x_scale = round(float(matrix_match.group(1)))
+        y_scale = round(float(matrix_match.group(4)))
+        if x_scale == 1 and y_scale == 1:
+            element.set('transform', 'translate()') # dummy translate
+        else:
+            xml_root.remove(element)
+            return xml_root
+    if APPS_SVG_TRANSLATE_REGEX.search(xml_transform_attrib):
+        element.set('transform', 'translate('+str(x_offset)+', '+str(y_offset)+')')
+    return xml_root
+
+
+def get_apps_svg_icon_order(apps_svg_file):
+    """ Get the ids, in order, for the scalable icon groups of an application icon. """
+    if apps_svg_file in ['iexplore.svg', 'notepad.svg']:
+        return [global_variables.SMALL_SVG_ICON_ID,
+                global_variables.MEDIUM_SVG_ICON_ID,
+                global_variables.LARGE_SVG_ICON_ID]
+    if apps_svg_file in ['taskmgr.svg', 'winecfg.svg', 'wordpad.svg']:
+        return [global_variables.MEDIUM_SVG_ICON_ID,
+                global_variables.LARGE_SVG_ICON_ID]
+    return [global_variables.LARGE_SVG_ICON_ID,
+            global_variables.MEDIUM_SVG_ICON_ID,
+            global_variables.SMALL_SVG_ICON_ID]
+
+
+def get_apps_svg_offsets(apps_svg_file):
+    """ Get the X and Y offsets for the first (translated) group of an application icon. """
+    if apps_svg_file in ['taskmgr.svg', 'wcmd.svg', 'winefile.svg',
+                         'winhelp.svg', 'winemine.svg']:
+        return 8, 8
+    if apps_svg_file in ['winecfg.svg']:
+        return 176, 24
+    return 0, 0
+
+
+def xml_apps_svg_parse_groups(xml_root, apps_svg_file):
+    """ Set ID tags for all application SVG scalable icons.
+        Set X and Y translation offsets for all application SVG icons
+        - to ensure these are 'neatly' lined up. """
+    for element in xml_root.findall(".//*[@id]"):
+        if re.search(r'^icon\:[0-9]+\-[0-9]+$', element.attrib.get('id')):
+            xml_root = xml_process_apps_svg_id_element(xml_root,
+                                                       element,
+                                                       global_variables.NEW_ICON_SIZE)
+    icon_order = get_apps_svg_icon_order(apps_svg_file)
+    first = True
+    for element in xml_root.findall(".//svg:g", global_variables.XMLNS):
+        x_offset = y_offset = 0
+        if icon_order:
+            element.set('id', icon_order[0])
+            icon_order = icon_order[1:]
+        if int(xml_root.get('height')) <= global_variables.NEW_ICON_SIZE:
+            continue
+        if first:
+            first = False
+            x_offset, y_offset = get_apps_svg_offsets(apps_svg_file)
+        if element.get('transform') != None:
+            xml_root = xml_process_apps_svg_group(xml_root, element, x_offset, y_offset)
+    return xml_root
+
+
+def xml_apps_svg_stream(source_path, apps_svg_file, icon_path):
+    """ Streaming equivalent of xml_apps_svg_parse_groups() and xml_svg_fix_icon_size()
+        - for an application icon. The output is identical, but no element tree is built:
+        large embedded PNG icons are passed straight through. The icon is streamed to a
+        temporary file, beside its path in the spool directory, if set - otherwise to memory.
+        Returns the icon data (or output file) - and the embedded PNG icons, as (image id,
+        href) tuples. """
+    prefix_dict = {global_variables.XMLNS[name_space]:name_space
+                   for name_space in global_variables.XMLNS}
+    prefix_dict[global_variables.XMLNS['svg']] = ''
+    prefix_dict['http://www.w3.org/XML/1998/namespace'] = 'xml'
+    root_attrib_dict = {'{'+global_variables.XMLNS['inkscape']+'}version':
+                            str(global_variables.NEW_INKSCAPE_VERSION),
+                        'height':str(global_variables.NEW_ICON_SIZE),
+                        'width':str(global_variables.NEW_ICON_SIZE)}
+    handler = AppsSvgStreamHandler(global_variables.XMLNS['svg'],
+                                   global_variables.NEW_ICON_SIZE,
+                                   get_apps_svg_icon_order(apps_svg_file),
+                                   get_apps_svg_offsets(apps_svg_file),
+                                   root_attrib_dict)
+    if global_variables.SPOOL_DIRECTORY is None:
+        with io.BytesIO() as target_file:
+            SvgStreamWriter(handler, prefix_dict).transform(source_path, target_file)
+            return target_file.getvalue(), handler.image_list
+    temporary_path = create_temporary_file(os.path.join(global_variables.SPOOL_DIRECTORY,
+                                                        icon_path))
+    try:
+        with open(temporary_path, "wb") as target_file:
+            SvgStreamWriter(handler, prefix_dict).transform(source_path, target_file)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+    return create_output_file(temporary_path, temporary=True), handler.image_list
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3.6
+
+""" Artifact manifest, and Makefile, for build_tool.py script: each generated file to
+    install, with its install destination, mode, size and checksum - and the installation of
+    all these files, from the manifest of a target directory. """
+
+import json
+import os
+import global_variables
+from build_state import get_output_digest
+from install_files import INSTALL_METHODS, install_file, is_installed, update_system_cache
+from output_files import get_output_size
+
+
+def get_installation_files(path_list, subdirectory, file_type):
+    """ Get the (sorted) list of paths generated, to be installed from a subdirectory - with
+        the specified file type. Hidden files are skipped. """
+    search_directory = os.path.normpath(subdirectory)
+    source_files = []
+    for path in path_list:
+        filename = os.path.basename(path)
+        if (not filename.startswith('.') and
+                os.path.dirname(path) == search_directory and
+                filename.endswith("."+file_type)
+           ):
+            source_files.append(path)
+    return sorted(source_files)
+
+
+def create_makefile_variable(variable_name, source_files):
+    """ Create a single variable for Makefile - from a list of source files. """
+    if len(source_files) == 1:
+        file_text = variable_name+" = "+source_files[0]
+    elif len(source_files) > 1:
+        file_text = variable_name+"  = "
+        for source_file in source_files:
+            file_text += " \\\n\t"+source_file
+    else:
+        file_text = ""
+    if len(source_files) >= 1:
+        file_text += "\n\n"
+    return file_text
+
+
+def get_manifest_inputs(manifest):
+    """ Get the build graph node inputs, of the artifact manifest file - the manifest itself. """
+    return manifest
+
+
+def get_makefile_inputs(manifest):
+    """ Get the build graph node inputs, of the Makefile: each file to install, and its
+        destination - but not its content. """
+    return [{key:file_entry[key] for key in ['path', 'variable', 'destination', 'mode']}
+            for file_entry in manifest['files']]
+
+
+def get_png_icon_sizes(path_list):
+    """ Get the sizes of all the hicolor fixed size application icon directories generated. """
+    icon_size_list = []
+    for icon_size in global_variables.PNG_ICON_SIZES:
+        path = os.path.normpath(global_variables.PNG_APPS_TARGET_RELPATH.format(size=icon_size))
+        if any(os.path.dirname(icon_path) == path and icon_path.endswith('.png')
+               for icon_path in path_list):
+            icon_size_list += [icon_size]
+    return icon_size_list
+
+
+def get_file_installation_list(path_list):
+    """ Get the (Makefile variable, file type, subdirectory, install destination) of each type
+        of file to be installed, in installation order - from the list of paths generated
+        (relative to the target directory). """
+    file_installation_list = \
+        [('MENU_FILES',
+          'menu',
+          'xdg/',
+          '/etc/xdg/menus/applications-merged'),
+         ('DESKTOP_FILES',
+          'desktop',
+          'applications/',
+          '/usr/share/applications'),
+         ('DIRECTORY_FILES',
+          'directory',
+          'desktop-directories/',
+          '/usr/share/desktop-directories'),
+         ('APPS_ICONS',
+          'svg',
+          global_variables.SVG_APPS_TARGET_RELPATH,
+          '/usr/share/icons/hicolor/scalable/apps'),
+         ('PLACES_ICONS',
+          'svg',
+          global_variables.SVG_PLACES_TARGET_RELPATH,
+          '/usr/share/icons/hicolor/scalable/places'),
+         ('WINE_ICO',
+          'ico',
+          global_variables.ICONS_TARGET_RELPATH,
+          '/usr/share/wine/icons')]
+    file_installation_list[-1:-1] = \
+        [(f'PNG_APPS_ICONS_{icon_size}',
+          'png',
+          global_variables.PNG_APPS_TARGET_RELPATH.format(size=icon_size),
+          f'/usr/share/icons/hicolor/{icon_size}x{icon_size}/apps')
+         for icon_size in get_png_icon_sizes(path_list)]
+    return file_installation_list
+
+
+def create_manifest(output_dict):
+    """ Create the artifact manifest - from a {path (relative to the target directory): data}
+        dictionary, of all files generated: each file to install, in installation order, with
+        its Makefile variable, install destination, mode, size and checksum. """
+    path_list = list(output_dict)
+    file_list = []
+    for variable_name, file_type, subdirectory, destination_directory in \
+            get_file_installation_list(path_list):
+        for path in get_installation_files(path_list, subdirectory, file_type):
+            file_list += [{'path': path,
+                           'variable': variable_name,
+                           'destination': os.path.join(destination_directory,
+                                                       os.path.basename(path)),
+                           'mode': f'{global_variables.INSTALL_FILE_MODE:04o}',
+                           'size': get_output_size(output_dict[path]),
+                           'sha256': get_output_digest(output_dict[path])}]
+    return {'format': global_variables.MANIFEST_FORMAT, 'files': file_list}
+
+
+def create_manifest_file(manifest):
+    """ Write the artifact manifest, as JSON - for packaging tools.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    manifest_data = json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True)+"\n"
+    return {global_variables.MANIFEST_FILENAME: manifest_data.encode('utf-8')}
+
+
+def get_system_cache_updates(manifest):
+    """ Get the (command, directory) of each system cache to update - for the directories, files
+        in the artifact manifest are installed in. """
+    return [(command, directory) for command, directory in global_variables.SYSTEM_CACHE_UPDATES
+            if any(file_entry['destination'].startswith(directory+'/')
+                   for file_entry in manifest['files'])]
+
+
+def create_makefile(manifest):
+    """ Generate Makefile - from the artifact manifest: a variable for each type of file to
+        install, and a target for each installed file, so make -j install runs in parallel,
+        only installs files newer than installed and skips those with unchanged content.
+        Then install updates the system caches, of these directories (without a DESTDIR).
+        Returns a {path (relative to the target directory): data} dictionary. """
+    variable_dict = {}
+    for file_entry in manifest['files']:
+        variable_dict.setdefault(file_entry['variable'], [])
+        variable_dict[file_entry['variable']] += [file_entry['path']]
+    file_text = ""
+    for variable_name, source_files in variable_dict.items():
+        file_text += create_makefile_variable(variable_name, source_files)
+    file_text += 'all:'
+    for variable_name in variable_dict:
+        file_text += ' $('+variable_name+')'
+    file_text += '\n\n.PHONY: all install\n\ninstall:'
+    target_list = ['$(DESTDIR)$(EPREFIX)'+file_entry['destination']
+                   for file_entry in manifest['files']]
+    for target in target_list:
+        file_text += ' \\\n\t'+target
+    for command, directory in get_system_cache_updates(manifest):
+        file_text += ('\n\t@if [ -z "$(DESTDIR)" ] && command -v '+command[0]+' >/dev/null; then \\'
+                      +'\n\t\t'+' '.join(command)+' "$(EPREFIX)'+directory+'"; \\\n\tfi')
+    file_text += '\n'
+    for file_entry, target in zip(manifest['files'], target_list):
+        file_text += ('\n'+target+': '+file_entry['path']
+                      +'\n\tinstall -C -D -m'+file_entry['mode']+' "$<" "$@"\n')
+    return {"Makefile": file_text.encode('utf-8')}
+
+
+def load_manifest(root_directory):
+    """ Load the artifact manifest, of a target directory. """
+    path = os.path.join(root_directory, global_variables.MANIFEST_FILENAME)
+    try:
+        with open(path, "r", encoding='utf-8') as file_handle:
+            manifest = json.load(file_handle)
+    except (OSError, ValueError) as error:
+        raise SystemError(f'Artifact manifest: {path} could not be loaded ({error})') from error
+    if not isinstance(manifest, dict) or manifest.get('format') != global_variables.MANIFEST_FORMAT:
+        raise SystemError(f'Artifact manifest: {path} has an unsupported format')
+    return manifest
+
+
+def report_installed_files(file_count, skipped_count, method_dict):
+    """ Print the number of files installed, and skipped (unchanged) - then the files, and
+        bytes, installed by each method. Only copied bytes are actually written. """
+    written_size = method_dict['copy_file_range'][1]+method_dict['copy'][1]
+    print(f'Install: {file_count-skipped_count} of {file_count} files installed,'
+          f' {skipped_count} unchanged - {written_size} bytes written')
+    for method in INSTALL_METHODS:
+        if method_dict[method][0]:
+            print(f'{method}: {method_dict[method][0]} files, {method_dict[method][1]} bytes')
+
+
+def install_all(target_directory, destination_directory, prefix_directory, hardlink):
+    """ Install all files, in the artifact manifest of the target directory, to their install
+        destinations - in a (staging) destination directory and prefix, as make install does
+        with DESTDIR and EPREFIX. Files with unchanged content are skipped, only their mode is
+        set. Then the system caches, of these directories, are updated - unless installing
+        in a destination directory. """
+    manifest = load_manifest(target_directory)
+    method_dict = {method:[0, 0] for method in INSTALL_METHODS}
+    skipped_count = 0
+    for file_entry in manifest['files']:
+        source_path = os.path.join(target_directory, file_entry['path'])
+        if os.path.getsize(source_path) != file_entry['size']:
+            raise SystemError(f'Install: {source_path} does not match the artifact manifest')
+        path = os.path.abspath(destination_directory+prefix_directory+file_entry['destination'])
+        mode = int(file_entry['mode'], 8)
+        if not is_installed(path, file_entry['size'], file_entry['sha256']):
+            method = install_file(source_path, path, mode, hardlink)
+            method_dict[method][0] += 1
+            method_dict[method][1] += file_entry['size']
+            continue
+        skipped_count += 1
+        if os.stat(path).st_mode & 0o7777 != mode:
+            os.chmod(path, mode)
+    report_installed_files(len(manifest['files']), skipped_count, method_dict)
+    if not destination_directory:
+        for command, directory in get_system_cache_updates(manifest):
+            if update_system_cache(command, prefix_directory+directory):
+                print(f'Updated: {prefix_directory+directory} ({command[0]})')
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3.6
+
+""" Micro-benchmark for the translation post-processing of build_tool.py script:
+    remove_invalid_translations() and find_best_translation(). Compares these against the
+    original (reference) implementations, on a recorded corpus of translation backend
+    results - checking that the same translation is selected for every entry. By default,
+    the corpus is built from the translated desktop entries committed in this repository. """
+
+import argparse
+import functools
+import json
+import os
+import re
+import sys
+import timeit
+import global_variables
+import translations
+
+
+def reference_remove_invalid_translations(translated_text_list):
+    """ Original implementation of remove_invalid_translations(). """
+    protected_ids = []
+    for protected_term in global_variables.PROTECTED_TERMS_DICT:
+        protected_ids += [global_variables.PROTECTED_TERMS_DICT[protected_term]]
+    valid_translated_text_list = []
+    for translated_text in translated_text_list:
+        if translated_text == '':
+            continue
+        valid = True
+        for match in re.findall(r'[0-9]{10,}', translated_text):
+            if not match in protected_ids:
+                valid = False
+                break
+        if valid:
+            valid_translated_text_list += [translated_text]
+    return valid_translated_text_list
+
+
+def reference_find_best_translation(untranslated_text, translated_text_list):
+    """ Original implementation of find_best_translation(). """
+    untranslated_word_list = re.split(' ', untranslated_text)
+    untranslated_word_count = len(untranslated_word_list)
+    current_score = len(untranslated_text)
+    target_text = ""
+    mangled_protected_terms_list = [global_variables.PROTECTED_TERMS_DICT[x]
+                                    for x in global_variables.PROTECTED_TERMS_DICT]
+    for translated_text in translated_text_list:
+        translated_text = translated_text.strip()
+        translated_text = translated_text.replace('\"', '')
+        if re.search(r'^[0-9]{10,}$', translated_text) and untranslated_word_count > 1:
+            continue
+        translated_word_list = re.split(' ', translated_text)
+        translated_word_count = len(translated_word_list)
+        score = 0
+        if translated_text.upper() == untranslated_text.upper():
+            score = untranslated_word_count
+        score += abs(translated_word_count - untranslated_word_count)
+        for untranslated_word in untranslated_word_list:
+            offset = len(untranslated_word)
+            if (untranslated_word.upper() in mangled_protected_terms_list
+                    and untranslated_word_count > 1):
+                offset = -offset
+            if untranslated_word.upper() in translated_text.upper():
+                score += offset
+        if score < current_score or target_text == "":
+            target_text = translated_text
+            current_score = score
+    return target_text
+
+
+DESKTOP_ENTRY_DIRECTORIES = ['applications', 'desktop-directories']
+DESKTOP_ENTRY_KEYS = ['Name', 'GenericName', 'Comment']
+
+
+def load_desktop_entry_corpus(root_directory):
+    """ Load a corpus of (text, translation list) entries from the translated desktop entry
+        files of a repository tree. The translation list, of each (English text, locale),
+        holds the recorded translations of all locales of the same language, the English
+        text and the protected (masked) English text - as returned by the backends. """
+    translation_dictionary = {}
+    for entry_directory in DESKTOP_ENTRY_DIRECTORIES:
+        directory = os.path.join(root_directory, entry_directory)
+        for filename in sorted(os.listdir(directory)):
+            entry_dictionary = {}
+            with open(os.path.join(directory, filename), "r", encoding='utf-8') as file_handle:
+                for line in file_handle.read().splitlines():
+                    match = re.match(r'^([A-Za-z]+)(?:\[([^\]]+)\])?=(.*)$', line)
+                    if match and match.group(1) in DESKTOP_ENTRY_KEYS:
+                        entry_dictionary.setdefault(match.group(1), {})[match.group(2)] = \
+                            match.group(3)
+            for locale_entries in entry_dictionary.values():
+                text = locale_entries.pop(None, None)
+                if text:
+                    translation_dictionary.setdefault(text, {}).update(locale_entries)
+    corpus = []
+    for text, locale_entries in translation_dictionary.items():
+        protected_text = translations.protect_text(text)[0]
+        for locale in sorted(locale_entries):
+            language = locale.split('-')[0]
+            corpus += [(text, [translation
+                               for translation_locale, translation in sorted(locale_entries.items())
+                               if translation_locale.split('-')[0] == language]
+                        + [text, protected_text])]
+    return corpus
+
+
+def load_corpus(path):
+    """ Load a corpus of (text, translation list) entries: from a translation cache file,
+        or from a JSON catalog written by --export-backend-catalog. """
+    with open(path, "r", encoding='utf-8') as file_handle:
+        corpus_data = json.load(file_handle)
+    corpus = []
+    if 'backends' in corpus_data:
+        for locales in corpus_data['backends'].values():
+            for locale_entries in locales.values():
+                corpus += [(text, entry['translations']) for text, entry in locale_entries.items()]
+    else:
+        for locale_entries in corpus_data.values():
+            corpus += [(text, translation_list if isinstance(translation_list, list)
+                        else [translation_list])
+                       for text, translation_list in locale_entries.items()]
+    return corpus
+
+
+def select_translations(corpus, remove_invalid, find_best):
+    """ Select the best translation, for every entry in the corpus. """
+    return [find_best(text, remove_invalid(translation_list)) for text, translation_list in corpus]
+
+
+def main():
+    """ Run the translation scoring micro-benchmark. """
+    global_variables.init()
+    parser = argparse.ArgumentParser(description='Translation scoring micro-benchmark.')
+    parser.add_argument('-c', '--corpus', nargs='?',
+                        help='Translation cache, or backend catalog, file to use as the corpus'
+                             ' (default: the translated desktop entries of this repository)')
+    parser.add_argument('-n', '--number', type=int, default=10,
+                        help='Number of passes over the corpus')
+    args = parser.parse_args()
+    if args.corpus:
+        corpus_name = args.corpus
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus_name = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        corpus = load_desktop_entry_corpus(corpus_name)
+    if not corpus:
+        print(f'Corpus: {corpus_name} is empty')
+        sys.exit(1)
+    reference_list = select_translations(corpus, reference_remove_invalid_translations,
+                                         reference_find_best_translation)
+    selected_list = select_translations(corpus, translations.remove_invalid_translations,
+                                        translations.find_best_translation)
+    mismatch_count = sum(1 for reference, selected in zip(reference_list, selected_list)
+                         if reference != selected)
+    print(f'Corpus: {len(corpus)} entries, {mismatch_count} selection mismatches')
+    for name, remove_invalid, find_best in [
+            ('reference', reference_remove_invalid_translations, reference_find_best_translation),
+            ('build_tool', translations.remove_invalid_translations,
+             translations.find_best_translation)]:
+        seconds = timeit.timeit(functools.partial(select_translations, corpus, remove_invalid,
+                                                  find_best),
+                                number=args.number)
+        print(f'{name}: {seconds*1000000/(args.number*len(corpus)):.2f} us per entry')
+    if mismatch_count:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
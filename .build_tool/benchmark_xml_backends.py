@@ -0,0 +1,101 @@
+#!/usr/bin/env python3.6
+
+""" Benchmark of the XML backends of build_tool.py script (lxml and ElementTree), on the
+    Wine icons of a Wine Source tree: parsing, transforming (as for the application and
+    places icons) and serializing all icons - without the SVG cache. """
+
+import argparse
+import os
+import sys
+import timeit
+import apps_svg
+import build_tool
+import global_variables
+import svg_overlay
+from xml_backend import lxml_etree
+
+
+def load_icons(wine_source_directory):
+    """ Parse all application and places icons - as (icon type, SVG file, tree) tuples. """
+    icon_list = []
+    for icon_type, svg_files in [('apps', global_variables.APP_SVG_FILES),
+                                 ('places', global_variables.PLACES_SVG_FILES)]:
+        for svg_file in svg_files:
+            source_directory = os.path.join(wine_source_directory, svg_files[svg_file]['srpath'])
+            prepare_function = None
+            if svg_file == 'document.svg':
+                prepare_function = build_tool.xml_svg_join_fragmented_groups
+            icon_list += [(icon_type, svg_file,
+                           build_tool.xml_svg_load_and_parse(source_directory, svg_file,
+                                                             prepare_function))]
+    return icon_list
+
+
+def transform_icons(icon_list):
+    """ Transform all parsed icons - as build_tool.py script does. """
+    for icon_type, svg_file, xml_tree in icon_list:
+        xml_root = xml_tree.getroot()
+        if icon_type == 'apps':
+            xml_root = apps_svg.xml_apps_svg_parse_groups(xml_root, svg_file)
+        else:
+            xml_root = svg_overlay.xml_do_overlay_svg(xml_root,
+                                                      global_variables.WINE_LOGO_OVERLAY,
+                                                      svg_file)
+        build_tool.xml_svg_fix_icon_size(xml_root)
+
+
+def serialize_icons(icon_list):
+    """ Serialize all transformed icons. """
+    return sum(len(global_variables.XML_BACKEND.tostring(xml_tree.getroot()))
+               for _, _, xml_tree in icon_list)
+
+
+def benchmark_backend(backend_name, wine_source_directory, repeat):
+    """ Time parsing, transforming and serializing all icons, with an XML backend.
+        Returns the best time (in seconds) for each stage. """
+    build_tool.init_xml_backend(backend_name)
+    build_tool.xml_register_svg_ns()
+    global_variables.WINE_LOGO_OVERLAY = build_tool.load_wine_logo_overlay(wine_source_directory)
+    time_dict = {'parse':[], 'transform':[], 'serialize':[]}
+    for _ in range(repeat):
+        start_time = timeit.default_timer()
+        icon_list = load_icons(wine_source_directory)
+        parse_time = timeit.default_timer()
+        transform_icons(icon_list)
+        transform_time = timeit.default_timer()
+        serialize_icons(icon_list)
+        serialize_time = timeit.default_timer()
+        time_dict['parse'] += [parse_time-start_time]
+        time_dict['transform'] += [transform_time-parse_time]
+        time_dict['serialize'] += [serialize_time-transform_time]
+    return {stage:min(time_dict[stage]) for stage in time_dict}
+
+
+def main():
+    """ Benchmark all available XML backends on the Wine icons. """
+    global_variables.init()
+    parser = argparse.ArgumentParser(description=('Benchmark the XML backends on the Wine'
+                                                  ' icons of a Wine Source tree.'))
+    parser.add_argument('-w', '--wine', required=True,
+                        help='Wine Source directory')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='Number of timed runs per backend (the best is reported)')
+    args = parser.parse_args()
+    if not os.path.isdir(args.wine):
+        print(f'Wine Source directory: {args.wine} is not a valid, pre-existing directory')
+        sys.exit(2)
+    backend_list = ['etree']
+    if lxml_etree is None:
+        print('lxml: not available - unable to import lxml.etree')
+    else:
+        backend_list += ['lxml']
+    for backend_name in backend_list:
+        time_dict = benchmark_backend(backend_name, args.wine, args.repeat)
+        print(f'{backend_name}: parse {time_dict["parse"]*1000:.1f} ms,'
+              f' transform {time_dict["transform"]*1000:.1f} ms,'
+              f' serialize {time_dict["serialize"]*1000:.1f} ms,'
+              f' total {sum(time_dict.values())*1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
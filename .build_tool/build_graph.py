@@ -0,0 +1,70 @@
+#!/usr/bin/env python3.6
+
+""" Build graph helpers for build_tool.py script: the build state, of the target directory,
+    and the nodes (generated artifacts) built with it - each only regenerated if its inputs, or
+    its output files, have changed since the last build. """
+
+import hashlib
+import os
+import sys
+import global_variables
+from build_state import BuildState
+
+
+def get_build_version():
+    """ Get the version of all the modules of this script - a hash of their sources. The
+        global variables module is excluded: each build graph node records the global variables
+        it is generated from, as its inputs. """
+    script_directory = os.path.dirname(os.path.abspath(__file__))
+    module_path_set = set()
+    for module in list(sys.modules.values()):
+        module_path = getattr(module, '__file__', None)
+        if (module_path is not None and module is not global_variables
+                and os.path.dirname(os.path.abspath(module_path)) == script_directory):
+            module_path_set.add(os.path.abspath(module_path))
+    version_hash = hashlib.sha256()
+    for module_path in sorted(module_path_set):
+        with open(module_path, "rb") as file_handle:
+            version_hash.update(hashlib.sha256(file_handle.read()).digest())
+    return version_hash.hexdigest()[:16]
+
+
+def init_build_state(target_directory, check_only):
+    """ Create the build state, for the target directory, and load the state of the previous
+        build - unless all outputs are to be removed, before building. """
+    global_variables.BUILD_STATE = BuildState(target_directory,
+                                              global_variables.BUILD_STATE_FILENAME,
+                                              get_build_version(), check_only)
+    if not global_variables.CLEAN_OUTPUT:
+        global_variables.BUILD_STATE.load()
+
+
+def build_node(node, input_function, generate_function, *args):
+    """ Build a node (generated artifact) of the build graph: its outputs are loaded, if its
+        inputs (from the input function) and its output files are unchanged since the last
+        build - otherwise these are generated, by the generate function, and recorded. Both
+        functions take the same arguments. In check mode nothing is generated - a stale node
+        returns its previous outputs.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    build_state = global_variables.BUILD_STATE
+    if build_state is None:
+        return generate_function(*args)
+    digest = build_state.get_node_digest(input_function(*args))
+    output_dict = build_state.load_node(node, digest)
+    if output_dict is None:
+        if build_state.check_only:
+            return build_state.get_previous_outputs(node, digest)
+        output_dict = generate_function(*args)
+        build_state.store_node(node, digest, output_dict)
+    return output_dict
+
+
+def get_global_inputs(name_list):
+    """ Get the values, of a list of global variables, as build graph node inputs. """
+    return {name:getattr(global_variables, name) for name in name_list}
+
+
+def get_source_file_digest(wine_source_directory, source_rel_directory, filename):
+    """ Get the digest of a file, in the Wine Source tree. """
+    return global_variables.BUILD_STATE.get_file_digest(
+        os.path.join(wine_source_directory, source_rel_directory, filename))
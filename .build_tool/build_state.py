@@ -0,0 +1,193 @@
+#!/usr/bin/env python3.6
+
+""" Incremental build state for build_tool.py script: the build graph of all generated artifacts
+    (nodes) - each recorded, in a state file in the target directory, with a digest of all its
+    inputs and the checksum of each of its output files. A node is only rebuilt if its inputs
+    have changed, or any of its output files are missing or modified. """
+
+import hashlib
+import json
+import os
+
+from output_files import OutputFile, create_output_file, get_file_digest, get_output_size
+from output_files import write_file_if_changed
+
+BUILD_STATE_FORMAT = 3
+
+
+def get_digest(value):
+    """ Get the SHA-256 digest of a (JSON serializable) value. """
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False,
+                                     separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def get_data_digest(data):
+    """ Get the SHA-256 digest of file data - or of an output file. """
+    if isinstance(data, OutputFile):
+        return data.digest
+    return hashlib.sha256(data).hexdigest()
+
+
+class PreviousOutputFile(OutputFile):  # pylint: disable=too-few-public-methods
+    """ An output file, of a stale node with changed inputs, from the previous build - which
+        check mode uses in place of the data a build would generate (not known, without
+        generating it). """
+
+
+def get_output_digest(data):
+    """ Get the digest of generated file data, as an input of another node - or None, for the
+        previous output file of a stale node (in check mode), so all nodes it is an input of
+        are stale too. """
+    if isinstance(data, PreviousOutputFile):
+        return None
+    return get_data_digest(data)
+
+
+class BuildState:
+    """ Build graph nodes, as {node: {'digest': input digest, 'outputs': {path: {'digest': data
+        digest, 'size': data size}}}}, with all paths relative to the root (target) directory.
+        Node names, and paths, are prefixed with the current (vendor variant) directory. The
+        digest of the translations of each phrase is also kept - with the digest of the
+        translation inputs it was derived from, so it can be reused without translating.
+        Only the nodes visited, by a build, are saved. In check mode no outputs are generated:
+        the stale nodes are only recorded. """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, root_directory, filename, tool_version, check_only=False):
+        self.root_directory = root_directory
+        self.path = os.path.join(root_directory, filename)
+        self.tool_version = tool_version
+        self.check_only = check_only
+        self.directory = ""
+        self.nodes = {}
+        self.visited_nodes = {}
+        self.stale_node_list = []
+        self.rebuilt_node_list = []
+        self.translation_node_list = []
+        self.phrases = {}
+        self.phrase_digest_dict = {}
+        self.file_digest_dict = {}
+
+    def load(self):
+        """ Load the build state file - a missing, invalid or outdated state is ignored. """
+        try:
+            with open(self.path, "r", encoding='utf-8') as file_handle:
+                state = json.load(file_handle)
+        except (OSError, ValueError):
+            return
+        if not isinstance(state, dict) or state.get('format') != BUILD_STATE_FORMAT:
+            return
+        self.nodes = state.get('nodes', {})
+        self.phrases = state.get('phrases', {})
+
+    def save(self):
+        """ Write the build state file, for all the nodes visited - only if it has changed. """
+        state = {'format': BUILD_STATE_FORMAT,
+                 'phrases': self.phrases,
+                 'nodes': self.visited_nodes}
+        write_file_if_changed(self.path, json.dumps(state, sort_keys=True, indent=1,
+                                                    ensure_ascii=False).encode('utf-8'))
+
+    def set_directory(self, directory):
+        """ Set the current (vendor variant) directory, for all node names and paths. """
+        self.directory = directory
+
+    def set_translations(self, phrases):
+        """ Record the translations of each phrase, as {phrase: {'inputs': translation input
+            digest, 'digest': translations digest}}. """
+        self.phrases = phrases
+        self.phrase_digest_dict = {phrase:entry['digest'] for phrase, entry in phrases.items()}
+
+    def load_translations(self, input_digest_dict):
+        """ Check the translations of each phrase, without translating: the translations digest
+            of the last build is used, if the translation inputs are unchanged - otherwise the
+            phrase is stale (recorded as a stale translation node, with no digest). """
+        for phrase, input_digest in input_digest_dict.items():
+            node = f'translation:{phrase}'
+            self.translation_node_list += [node]
+            entry = self.phrases.get(phrase)
+            if entry is not None and entry['inputs'] == input_digest:
+                self.phrase_digest_dict[phrase] = entry['digest']
+            else:
+                self.stale_node_list += [node]
+
+    def get_file_digest(self, path):
+        """ Get the (memoized) digest of a source file. """
+        if path not in self.file_digest_dict:
+            self.file_digest_dict[path] = get_file_digest(path)
+        return self.file_digest_dict[path]
+
+    def get_node_digest(self, input_value):
+        """ Get the digest of a node's inputs - including the tool version. """
+        return get_digest([self.tool_version, input_value])
+
+    def read_outputs(self, entry):
+        """ Get the output files, recorded for a node, as these are now - missing files are
+            None. The files are only hashed, not read into memory. Returns a {path (relative
+            to the current directory): output file} dictionary, and whether all the files are
+            unchanged. """
+        output_dict = {}
+        unchanged = True
+        for path, output_entry in entry['outputs'].items():
+            try:
+                output_file = create_output_file(os.path.join(self.root_directory, path))
+            except OSError:
+                output_file = None
+            if output_file is None or output_file.digest != output_entry['digest']:
+                unchanged = False
+            output_dict[os.path.relpath(path, self.directory or '.')] = output_file
+        return output_dict, unchanged
+
+    def load_node(self, node, digest):
+        """ Load the outputs of a node, if its input digest and all its output files are
+            unchanged - otherwise the node is stale. In check mode, a stale node is recorded.
+            Returns a {path (relative to the current directory): output file} dictionary,
+            or None if the node is stale. """
+        node = os.path.join(self.directory, node)
+        entry = self.nodes.get(node)
+        self.visited_nodes[node] = entry
+        if entry is not None and entry['digest'] == digest:
+            output_dict, unchanged = self.read_outputs(entry)
+            if unchanged:
+                return output_dict
+        if self.check_only:
+            self.stale_node_list += [node]
+        return None
+
+    def get_previous_outputs(self, node, digest):
+        """ Get the output files, of a (stale) node, from the previous build. Check mode uses
+            these, in place of the outputs a build would generate. If the node's inputs are
+            unchanged (only its output files are missing or modified), a build would generate
+            the outputs recorded - with their recorded digest and size. Otherwise these are the
+            files as they are now, with missing files empty: marked as previous, so all the
+            nodes these are an input of are stale. Returns a {path (relative to the current
+            directory): output file} dictionary. """
+        entry = self.nodes.get(os.path.join(self.directory, node))
+        if entry is None:
+            return {}
+        if entry['digest'] == digest:
+            return {os.path.relpath(path, self.directory or '.'):
+                    OutputFile(None, output_entry['size'], output_entry['digest'])
+                    for path, output_entry in entry['outputs'].items()}
+        output_dict, _ = self.read_outputs(entry)
+        for path, output_file in output_dict.items():
+            if output_file is None:
+                output_dict[path] = PreviousOutputFile(None, 0, None)
+            else:
+                output_dict[path] = PreviousOutputFile(output_file.path, output_file.size,
+                                                       output_file.digest)
+        return output_dict
+
+    def store_node(self, node, digest, output_dict):
+        """ Record the input digest, and the outputs, of a (re)built node. """
+        node = os.path.join(self.directory, node)
+        self.rebuilt_node_list += [node]
+        self.visited_nodes[node] = \
+            {'digest': digest,
+             'outputs': {os.path.normpath(os.path.join(self.directory, path)):
+                         {'digest': get_data_digest(data), 'size': get_output_size(data)}
+                         for path, data in output_dict.items()}}
+
+    def get_removed_nodes(self):
+        """ Get the nodes, of the previous build, not visited - the outputs of which are stale. """
+        return [node for node in self.nodes if node not in self.visited_nodes]
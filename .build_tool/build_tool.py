@@ -3,15 +3,56 @@
 """ Module to generate Linux Distribution Agnostic Wine icon, .desktop and .menu data files. """
 
 import argparse
+import concurrent.futures
 import copy
 import os
 import re
 import shutil
-import string
-import subprocess
 import sys
-import xml.etree.ElementTree as ElementTree
+import threading
 import global_variables
+from apps_svg import xml_apps_svg_parse_groups, xml_apps_svg_stream
+from artifact_manifest import create_makefile, create_manifest, create_manifest_file
+from artifact_manifest import get_makefile_inputs, get_manifest_inputs, install_all
+from build_graph import build_node, get_build_version, get_global_inputs, get_source_file_digest
+from build_graph import init_build_state
+from build_state import get_digest, get_output_digest
+from cache_files import create_icon_theme_cache_file, get_icon_theme_cache_inputs
+from output_files import read_output_data, remove_stale_files, write_file_if_changed
+from png_icons import export_apps_png_icons, process_wine_icon, xml_apps_svg_get_images
+from svg_bitmaps import dedupe_embedded_pngs
+from svg_cache import SvgCache
+from svg_optimizer import optimize_svg
+from svg_overlay import OVERLAY_MODES, xml_do_overlay_svg, xml_do_overlay_svg_use
+from svg_overlay import xml_svg_overlay_parse_groups
+from translation_backends import TRANSLATION_BACKENDS, create_translation_backend
+from translation_cache import TranslationCache
+from translation_catalog import export_catalog, import_catalog
+from translations import export_backend_catalog, get_phrase_digest, get_translation_digests
+from translations import get_translation_keys, init_translation_backend, init_translation_cache
+from translations import plan_translations, report_translation_plan, translate_all_phrases
+from xdg_files import create_menu_file, create_wine_desktop_files, create_wine_menu_files
+from xdg_files import get_desktop_directory_name, get_menu_file_inputs
+from xml_backend import XML_BACKENDS, create_xml_backend
+
+VENDOR_ID_REGEX = re.compile(r'^[a-z0-9][a-z0-9_\-]*$')
+VENDOR_PREFIX_REGEX = re.compile(r'^[A-Za-z0-9_\-]*$')
+# Global variables, all icons are generated from - build graph node inputs
+ICON_INPUT_NAMES = ['VENDOR_ID', 'NEW_INKSCAPE_VERSION', 'NEW_ICON_SIZE', 'ICONS_TARGET_RELPATH',
+                    'PNG_ICONS', 'PNG_ICON_SIZES', 'PNG_APPS_TARGET_RELPATH', 'OVERLAY_MODE',
+                    'OVERLAY_LARGE_X_SCALE', 'OVERLAY_LARGE_Y_SCALE', 'OVERLAY_MEDIUM_X_SCALE',
+                    'OVERLAY_MEDIUM_Y_SCALE', 'SVG_OPTIMIZE', 'SVG_PRECISION',
+                    'SVG_EDITOR_NAMESPACES', 'BITMAP_DEDUPE', 'WINE_LOGO_DIRECTORY',
+                    'WINE_SVG_LOGO_FILENAME', 'WINE_ICON_LOGO_FILENAME', 'LARGE_SVG_ICON_ID',
+                    'MEDIUM_SVG_ICON_ID', 'SMALL_SVG_ICON_ID', 'XMLNS']
+# Global variables, each icon worker process is initialised with - and its current settings
+ICON_WORKER_NAMES = ICON_INPUT_NAMES + ['SVG_STREAMING', 'SPOOL_DIRECTORY', 'APP_SVG_FILES',
+                                       'PLACES_SVG_FILES']
+ICON_WORKER_STATE = {}
+# Serializes in-process builds - each uses its configuration, as the global variables, so
+# concurrent builds are not supported: a build, started in another thread, waits for this lock
+BUILD_LOCK = threading.RLock()
+
 
 def clean_all(root_directory):
     """ Remove all directories and main Makefile """
@@ -25,6 +66,29 @@ def clean_all(root_directory):
             os.unlink(path)
 
 
+def write_output_files(root_directory, output_dict):
+    """ Write generated files, from a {path (relative to the root directory): data}
+        dictionary - each atomically, and only if its content has changed.
+        All the files written, and whether each changed, are recorded. """
+    for path, data in output_dict.items():
+        path = os.path.normpath(os.path.join(root_directory, path))
+        global_variables.OUTPUT_FILE_DICT[path] = write_file_if_changed(path, data)
+
+
+def remove_stale_output_files(root_directory):
+    """ Remove all files, in the target subdirectories, not written by this build.
+        Returns the number of files removed. """
+    return remove_stale_files(root_directory, global_variables.SUBDIRECTORIES,
+                              set(global_variables.OUTPUT_FILE_DICT))
+
+
+def report_output_files(removed_count):
+    """ Print the number of files written, changed and removed (as stale). """
+    changed_count = sum(1 for changed in global_variables.OUTPUT_FILE_DICT.values() if changed)
+    print(f'Output: {changed_count} of {len(global_variables.OUTPUT_FILE_DICT)} files changed,'
+          f' {removed_count} stale files removed')
+
+
 def create_subdirectory(root_directory, subdirectory):
     """ Creates a subdirectory off a give root directory path. """
     directory = os.path.join(root_directory, subdirectory)
@@ -34,338 +98,119 @@ def create_subdirectory(root_directory, subdirectory):
 
 def create_subdirectories(root_directory):
     """ Create all required subdirectories in target directory. """
-    sudirectory_list = global_variables.SUBDIRECTORIES
-    sudirectory_list += [global_variables.SVG_APPS_TARGET_RELPATH,
-                         global_variables.SVG_PLACES_TARGET_RELPATH]
+    sudirectory_list = global_variables.SUBDIRECTORIES+[global_variables.SVG_APPS_TARGET_RELPATH,
+                                                        global_variables.SVG_PLACES_TARGET_RELPATH]
     for subdirectory in sudirectory_list:
         create_subdirectory(root_directory, subdirectory)
 
 
-def mangle_protected_term(protected_term):
-    """ Mangle a protected technical term - to ensure it is note
-    subject to translation. """
-    mangled_protected_term = ''.join(filter(lambda x:
-                                            x in string.ascii_uppercase, protected_term.upper()))
-    return mangled_protected_term
+def get_vendor_variants():
+    """ Get the list of (vendor id, prefix) variants to generate - or only the default vendor
+        id (with no prefix), if none were specified. """
+    if global_variables.VENDOR_VARIANTS:
+        return global_variables.VENDOR_VARIANTS
+    return [(global_variables.VENDOR_ID, global_variables.VENDOR_PREFIX)]
 
 
-def remove_invalid_translations(translated_text_list):
-    """ Remove translations from a translation list that contain
-    mangled CRC codes. """
-    protected_ids = []
-    for protected_term in global_variables.PROTECTED_TERMS_DICT:
-        protected_ids += [global_variables.PROTECTED_TERMS_DICT[protected_term]]
-    valid_translated_text_list = []
-    for translated_text in translated_text_list:
-        if translated_text == '':
-            continue
-        valid = True
-        for match in re.findall(r'[0-9]{10,}', translated_text):
-            if not match in protected_ids:
-                valid = False
-                break
-        if valid:
-            valid_translated_text_list += [translated_text]
-    return valid_translated_text_list
-
-
-def find_best_translation(untranslated_text, translated_text_list):
-    """ Accepts a base (English) language string and a source list of translation strings.
-    Filters the list of translated strings returning the one with the least matches
-    against any words from the base (English) language string."""
-    untranslated_word_list = re.split(' ', untranslated_text)
-    untranslated_word_count = len(untranslated_word_list)
-    current_score = len(untranslated_text)
-    target_text = ""
-    mangled_protected_terms_list = [global_variables.PROTECTED_TERMS_DICT[x]
-                                    for x in global_variables.PROTECTED_TERMS_DICT]
-    for translated_text in translated_text_list:
-        translated_text = translated_text.strip()
-        translated_text = translated_text.replace('\"', '')
-        if re.search(r'^[0-9]{10,}$', translated_text) and untranslated_word_count > 1:
-            continue
-        translated_word_list = re.split(' ', translated_text)
-        translated_word_count = len(translated_word_list)
-        score = 0
-        if translated_text.upper() == untranslated_text.upper():
-            score = untranslated_word_count
-        score += abs(translated_word_count - untranslated_word_count)
-        for untranslated_word in untranslated_word_list:
-            offset = len(untranslated_word)
-            if (untranslated_word.upper() in mangled_protected_terms_list
-                    and untranslated_word_count > 1):
-                offset = -offset
-            if untranslated_word.upper() in translated_text.upper():
-                score += offset
-        if score < current_score or target_text == "":
-            target_text = translated_text
-            current_score = score
-    return target_text
-
-
-def do_translate_text(text, locale):
-    """ Translates a block text for the specified locale. Uses shell utility trans. """
-    shell_command = 'trans'
-    shell_parameters = (f' -indent 0 -no-ansi -no-auto'
-                        f' -show-languages N -show-dictionary N -show-prompt-message N'
-                        f' -show-original N -s en -t {locale} "{text}"')
-    out = subprocess.run(["/bin/bash",
-                          "-c",
-                          shell_command+shell_parameters],
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.DEVNULL,
-                         encoding='utf-8')
-    if out.returncode != 0:
-        raise SystemError(f'Unable to translate "{text}" to locale: {locale}')
-    translation_list = re.split(r'\n|\,|^\(|\)$', out.stdout, flags=re.MULTILINE)
-    translation_list = remove_invalid_translations(translation_list)
-    translated_text = find_best_translation(text, translation_list)
-    return translated_text
-
-
-def pre_translate_terms():
-    """ Translate a list of non-technical terms that are safe to translate,
-    without affecting their meaning."""
-    for locale in global_variables.TRANSLATION_DICTIONARY:
-        if locale == "en":
-            continue
-        locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
-        for unprotected_term in global_variables.UNPROTECTED_TERMS:
-            if unprotected_term in locale_dictionary:
-                continue
-            locale_dictionary[unprotected_term] = do_translate_text(unprotected_term, locale)
-        for protected_term in global_variables.PROTECTED_TERMS_DICT:
-            if protected_term in locale_dictionary:
-                continue
-            if re.search(r'^[A-Z]:$', protected_term):
-                locale_dictionary[protected_term] = protected_term
-            else:
-                locale_dictionary[protected_term] = do_translate_text(protected_term, locale)
-
-
-def translate_text(text, locale):
-    """ Carry out the translation of a non-english phrase. """
-    # Protect technical terms, we do not want to be translated ...
-    locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
-    protected_term_list = []
-    translated_text = do_translate_text(text, locale)
-    for protected_term in global_variables.PROTECTED_TERMS_DICT:
-        new_text = text.replace(protected_term,
-                                global_variables.PROTECTED_TERMS_DICT[protected_term])
-        if new_text != text:
-            text = new_text
-            protected_term_list += [protected_term]
-    if not protected_term_list:
-        protected_translated_text = translated_text
-    else:
-        protected_translated_text = do_translate_text(text, locale)
-    for unprotected_term in global_variables.UNPROTECTED_TERMS:
-        if unprotected_term in locale_dictionary:
-            translated_text = \
-                    translated_text.replace(unprotected_term,
-                                            locale_dictionary[unprotected_term])
-            protected_translated_text = \
-                    protected_translated_text.replace(unprotected_term,
-                                                      locale_dictionary[unprotected_term])
-    # ... then convert these terms back.
-    translation_ok = True
-    for protected_term in protected_term_list:
-        protected_translated_text = \
-            protected_translated_text.replace(global_variables.PROTECTED_TERMS_DICT[protected_term],
-                                              protected_term)
-        if not translation_ok:
-            continue
-        new_translated_text = translated_text.replace(locale_dictionary[protected_term],
-                                                      protected_term)
-        if new_translated_text == translated_text:
-            new_translated_text = translated_text.replace(locale_dictionary[protected_term].lower(),
-                                                          protected_term)
-        if new_translated_text != translated_text:
-            translated_text = new_translated_text
-        else:
-            translation_ok = False
-    if translation_ok:
-        return translated_text
-    return protected_translated_text
-
-
-def translate_text_lookup(text, locale):
-    """ Translate a phrase or word and return result.
-        Use a dictionary so subsequent lookups are faster."""
-    locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
-    if locale == "en":
-        translated_text = text
-    elif not text in locale_dictionary:
-        translated_text = translate_text(text, locale)
-        locale_dictionary[text] = translated_text
-    else:
-        translated_text = locale_dictionary[text]
-    return translated_text
+def init_vendor_variant(vendor_id, prefix):
+    """ Use the vendor specific global variables, of a (vendor id, prefix) variant - unless no
+        variants were specified, when these are used as they are. """
+    if global_variables.VENDOR_VARIANTS:
+        global_variables.init_vendor(vendor_id, prefix)
 
 
-def create_translated_xdg_entry(entry, content):
-    """ Generate the specified XDG file entry with multiple translations. """
-    file_text = ""
-    for locale in global_variables.TRANSLATION_DICTIONARY:
-        if locale == "en":
-            file_text += f'{entry}={content}\n'
-        else:
-            translated_text = translate_text_lookup(content, locale)
-            file_text += f'{entry}[{locale}]={translated_text}\n'
-    return file_text
-
-
-def create_xdg_type_entry(file_content):
-    """ Generate a XDG file type entry.
-        Also create exec and terminal entries if specified, if is application. """
-    file_text = ""
-    if file_content["Type"] == "Application":
-        # Exec
-        if "Exec" in file_content:
-            file_text += f'Exec={file_content["Exec"]}\n'
-        # Terminal
-        if "Terminal" in file_content:
-            file_text += f'Terminal={file_content["Terminal"]}\n'
-    # Type
-    file_text += f'Type={file_content["Type"]}\n'
-    return file_text
-
-
-def create_xdg_file(path, file_content):
-    """ Create xdg desktop file @ specified path.
-        Use a dictionary of elements."""
-    filename = os.path.basename(path)
-    print(f'{filename} ', end='')
-    sys.stdout.flush()
-    file_text = "[Desktop Entry]\n"
-    # Name
-    if "Name" in file_content:
-        file_text += create_translated_xdg_entry("Name", file_content["Name"])
-    # Comment
-    if "Comment" in file_content:
-        file_text += create_translated_xdg_entry("Comment", file_content["Comment"])
-    if "Type" in file_content:
-        file_text += create_xdg_type_entry(file_content)
-    # Icon
-    if "Icon" in file_content:
-        file_text += f'Icon={file_content["Icon"]}\n'
-    # MimeType
-    if "MimeType" in file_content:
-        mime_types = ""
-        for mime_type in file_content["MimeType"]:
-            mime_types += mime_type+";"
-        file_text += f'MimeType={mime_types}\n'
-    # Hidden
-    if "Hidden" in file_content and file_content["Hidden"]:
-        file_text += f'Hidden={file_content["Hidden"]}\n'
-    # NoDisplay
-    if "NoDisplay" in file_content and file_content["NoDisplay"]:
-        file_text += f'NoDisplay={file_content["NoDisplay"]}\n'
-    # Categories
-    if "Categories" in file_content:
-        categories = ""
-        for category in file_content["Categories"]:
-            categories += category+";"
-        file_text += f'Categories={categories}\n'
-    if "StartupWMClass" in file_content:
-        file_text += f'StartupWMClass={file_content["StartupWMClass"]}\n'
-    with open(path, "w") as file_handle:
-        file_handle.write(file_text)
-
-def create_wine_desktop_files(directory):
-    """ Create all Wine .desktop launcher files. """
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    for desktop_file in global_variables.DESKTOP_FILE_DICT:
-        path = os.path.join(directory, desktop_file+".desktop")
-        create_xdg_file(path, global_variables.DESKTOP_FILE_DICT[desktop_file])
-
-
-def create_menu_file(directory, prefix):
-    """ Generate a menu global file, which references custom Wine application Categories """
-    def generate_menu_entry(indent, i, names):
-        """ Helper to add a nested menu entry to menu file """
-        file_text = indent*i+"<Menu>\n"
-        name = re.sub(r'^Wine', r'wine', names[0])
-        name = re.sub(r'^wine\-', r'', name)
-        file_text += indent*(i+1)+"<Name>"+prefix+global_variables.VENDOR_ID+"-"+name+"</Name>\n"
-        directory = prefix.lower()+global_variables.VENDOR_ID+"-"+name+".directory"
-        file_text += indent*(i+1)+"<Directory>"+directory+"</Directory>\n"
-        file_text += indent*(i+1)+"<Include>\n"
-        file_text += indent*(i+2)+"<Category>"+prefix+names[0]+"</Category>\n"
-        file_text += indent*(i+1)+"</Include>\n"
-        if len(names) > 1:
-            file_text += generate_menu_entry(indent, i+1, names[1:])
-        file_text += indent*i+"</Menu>\n"
-        return file_text
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    indent = "  "
-    i = 1
-    entry_type = "Applications"
-    file_text = '<!DOCTYPE Menu PUBLIC "-//freedesktop//DTD Menu 1.0//EN"\n'
-    file_text += ' "http://www.freedesktop.org/standards/menu-spec/menu-1.0.dtd">\n'
-    file_text += '<Menu>\n'+indent+'<Name>'+entry_type+'</Name>\n'
-    file_text += generate_menu_entry(indent, i, global_variables.WINE_DESKTOP_FILES)
-    file_text += "</Menu>\n"
-    path = prefix.lower()+global_variables.VENDOR_ID+".menu"
-    print(f'{path} ', end='')
-    path = os.path.join(directory, path)
-    with open(path, "w") as file_handle:
-        file_handle.write(file_text)
-
-
-def create_wine_menu_files(directory, prefix):
-    """ Create Wine menu files """
-    entry_type = "Directory"
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-    for desktop_file in global_variables.WINE_DESKTOP_FILES:
-        desktop_filename = re.sub(r'^Wine', r'wine', desktop_file)
-        desktop_filename = re.sub(r'^wine\-', r'', desktop_filename)
-        desktop_filename = (prefix.lower()+global_variables.VENDOR_ID
-                            +"-"+desktop_filename+".directory")
-        path = os.path.join(directory, desktop_filename)
-        icon = 'folder'
-        name = re.sub(r'.*\-', r'', desktop_file)
-        if desktop_file == "Wine":
-            icon = 'wine'
-            name = prefix+name
-        desktop_file_contents = {"Name":name, "Type":entry_type, "Icon":icon}
-        create_xdg_file(path, desktop_file_contents)
+def get_translatable_phrases():
+    """ Get a list of all unique phrases, in the .desktop and .directory files of all vendor
+        variants, to translate. Phrases shared by variants are only translated once. """
+    phrase_list = []
+    for vendor_id, prefix in get_vendor_variants():
+        init_vendor_variant(vendor_id, prefix)
+        for desktop_file in global_variables.DESKTOP_FILE_DICT:
+            for entry in ["Name", "Comment"]:
+                if entry in global_variables.DESKTOP_FILE_DICT[desktop_file]:
+                    phrase_list += [global_variables.DESKTOP_FILE_DICT[desktop_file][entry]]
+        for desktop_file in global_variables.WINE_DESKTOP_FILES:
+            phrase_list += [get_desktop_directory_name(desktop_file, prefix)]
+    return list(dict.fromkeys(phrase_list))
+
+
+def init_xml_backend(backend_name):
+    """ Create the XML backend, used for all SVG handling. """
+    global_variables.XML_BACKEND = create_xml_backend(backend_name)
 
 
 def xml_register_svg_ns():
-    """ Register all global SVG XML namespaces wtth ElementTree module. """
+    """ Register all global SVG XML namespaces wtth the XML backend. """
     for name_space in global_variables.XMLNS:
-        ElementTree.register_namespace(name_space, global_variables.XMLNS[name_space])
+        global_variables.XML_BACKEND.register_namespace(name_space,
+                                                        global_variables.XMLNS[name_space])
         if name_space == 'svg':
-            ElementTree.register_namespace('', global_variables.XMLNS[name_space])
-
-
-def xml_svg_load_and_parse(source_directory, icon_filename):
-    """ Simple function to load and parse an XML file. """
+            global_variables.XML_BACKEND.register_namespace('',
+                                                            global_variables.XMLNS[name_space])
+
+
+def init_svg_cache(cache_directory):
+    """ Create the SVG cache - unless no cache directory is specified. """
+    global_variables.SVG_CACHE = None
+    if cache_directory is not None:
+        global_variables.SVG_CACHE = SvgCache(os.path.join(cache_directory,
+                                                           global_variables.SVG_CACHE_DIRNAME),
+                                              get_build_version(),
+                                              global_variables.SVG_CACHE_MAX_BYTES)
+
+
+def get_wine_icon_inputs(wine_source_directory):
+    """ Get the build graph node inputs, of the Wine (Windows) icon file - and its frames. """
+    return [get_global_inputs(ICON_INPUT_NAMES),
+            get_source_file_digest(wine_source_directory, global_variables.WINE_LOGO_DIRECTORY,
+                                   global_variables.WINE_ICON_LOGO_FILENAME)]
+
+
+def get_svg_file_inputs(wine_source_directory, svg_file_dict, svg_file):
+    """ Get the build graph node inputs, of an application or places icon: its entry, the
+        XML backend, the icon global variables - and all the Wine Source files it is generated
+        from. Places icons are overlaid with the Wine logo, the PNG icons of the Wine logo are
+        replaced by the Wine (Windows) icon frames. """
+    source_file_list = [(svg_file_dict[svg_file]['srpath'], svg_file)]
+    if svg_file_dict is global_variables.PLACES_SVG_FILES:
+        source_file_list += [(global_variables.WINE_LOGO_DIRECTORY,
+                              global_variables.WINE_SVG_LOGO_FILENAME)]
+    elif svg_file == global_variables.WINE_SVG_LOGO_FILENAME:
+        source_file_list += [(global_variables.WINE_LOGO_DIRECTORY,
+                              global_variables.WINE_ICON_LOGO_FILENAME)]
+    return [svg_file_dict[svg_file], global_variables.XML_BACKEND.name,
+            get_global_inputs(ICON_INPUT_NAMES),
+            [get_source_file_digest(wine_source_directory, *source_file)
+             for source_file in source_file_list]]
+
+
+def xml_svg_load_and_parse(source_directory, icon_filename, prepare_function=None):
+    """ Simple function to load and parse an XML file - and optionally prepare its root.
+        Parsed (and prepared) trees are served from the SVG cache, if enabled, keyed by the
+        content of the XML file, the XML backend, the preparation and the icon global
+        variables. """
     icon_path = os.path.join(source_directory, icon_filename)
-    xml_tree = ElementTree.parse(icon_path)
-    return xml_tree
-
-
-def xml_svg_write(xml_tree, root_directory, target_icon_filename):
-    """ Simple function to write an XML file. """
-    icon_path = os.path.join(root_directory, target_icon_filename)
-    xml_tree.write(icon_path)
-
-
-def xml_svg_overlay_parse_groups(xml_root):
-    """ Remove sections of an Wine icon (overlay) that are not required. """
-    first = True
-    for xml_node in xml_root.findall('svg:g', global_variables.XMLNS):
-        if first:
-            first = False
-            xml_node.set('transform', 'matrix()')
-        else:
-            xml_root.remove(xml_node)
-    return xml_root
+    xml_backend = global_variables.XML_BACKEND
+    svg_cache = global_variables.SVG_CACHE
+    if svg_cache is None:
+        xml_tree = xml_backend.parse(icon_path)
+        if prepare_function is None:
+            return xml_tree
+        return xml_backend.get_tree(prepare_function(xml_tree.getroot()))
+    with open(icon_path, "rb") as file_handle:
+        source_data = file_handle.read()
+    cache_key = svg_cache.get_key(source_data,
+                                  get_digest([xml_backend.name,
+                                              getattr(prepare_function, '__name__', ''),
+                                              get_global_inputs(ICON_INPUT_NAMES)]))
+    xml_data = svg_cache.load(cache_key)
+    if xml_data is not None:
+        return xml_backend.get_tree(xml_backend.loads(xml_data))
+    xml_root = xml_backend.fromstring(source_data)
+    if prepare_function is not None:
+        xml_root = prepare_function(xml_root)
+    svg_cache.store(cache_key, xml_backend.dumps(xml_root))
+    return xml_backend.get_tree(xml_root)
 
 
 def xml_svg_join_fragmented_groups(xml_root):
@@ -388,152 +233,32 @@ def xml_svg_join_fragmented_groups(xml_root):
     return xml_root
 
 
-def xml_svg_places_get_transform(icon_size, places_svg_file):
-    """ Get transformation matrix for the specified places icon. """
-    transformation_data = {}
-    if icon_size == global_variables.LARGE_SVG_ICON_ID:
-        transformation_data['x-scale'] = global_variables.OVERLAY_LARGE_X_SCALE
-        transformation_data['y-scale'] = global_variables.OVERLAY_LARGE_Y_SCALE
-        if places_svg_file in ['document.svg', 'desktop.svg', 'mydocs.svg', 'drive.svg',
-                               'mycomputer.svg', 'netdrive.svg', 'printer.svg']:
-            transformation_data['x'] = '24'
-            transformation_data['y'] = '16'
-        else:
-            transformation_data['x'] = '20'
-            transformation_data['y'] = '10'
-    elif icon_size == global_variables.MEDIUM_SVG_ICON_ID:
-        transformation_data['x-scale'] = global_variables.OVERLAY_MEDIUM_X_SCALE
-        transformation_data['y-scale'] = global_variables.OVERLAY_MEDIUM_Y_SCALE
-        if places_svg_file in ['desktop.svg', 'mydocs.svg', 'drive.svg',
-                               'netdrive.svg', 'printer.svg']:
-            transformation_data['x'] = '187'
-            transformation_data['y'] = '29'
-        elif places_svg_file in ['mycomputer.svg']:
-            transformation_data['x'] = '188'
-            transformation_data['y'] = '28'
-        elif places_svg_file in ['document.svg']:
-            transformation_data['x'] = '10'
-            transformation_data['y'] = '5'
-        else:
-            transformation_data['x'] = '13'
-            transformation_data['y'] = '7'
-    return transformation_data
-
-
-def xml_do_overlay_svg(xml_base_root, xml_overlay_root, places_svg_file):
-    """ Overlay a scaled down XML SVG Wine icon on the specified XML SVG base icon. """
-    xml_defs_base = xml_base_root.find('svg:defs', global_variables.XMLNS)
-    xml_defs_overlay = xml_overlay_root.find('svg:defs', global_variables.XMLNS)
-    xml_group_overlay = xml_overlay_root.find('svg:g', global_variables.XMLNS)
-    if xml_defs_base is None or xml_defs_overlay is None or xml_group_overlay is None:
-        return xml_base_root
-    xml_defs_base.extend(xml_defs_overlay)
-    if places_svg_file in ['desktop.svg', 'document.svg', 'mycomputer.svg']:
-        icon_order = [global_variables.MEDIUM_SVG_ICON_ID,
-                      global_variables.LARGE_SVG_ICON_ID]
-    else:
-        icon_order = [global_variables.LARGE_SVG_ICON_ID,
-                      global_variables.MEDIUM_SVG_ICON_ID,
-                      global_variables.SMALL_SVG_ICON_ID]
-    for xml_group_base in xml_base_root.findall('svg:g', global_variables.XMLNS):
-        if not icon_order:
-            break
-        xml_group_base.set('id', icon_order[0])
-        transformation_matrix = xml_svg_places_get_transform(icon_order[0], places_svg_file)
-        icon_order = icon_order[1:]
-        if not places_svg_file in ['control.svg']:
-            xml_group_overlay_copy = copy.deepcopy(xml_group_overlay)
-            xml_group_overlay_copy.set('transform',
-                                       'matrix('
-                                       +transformation_matrix['x-scale']+',0,0,'
-                                       +transformation_matrix['y-scale']+','
-                                       +transformation_matrix['x']+','
-                                       +transformation_matrix['y']+')')
-            xml_group_base.append(xml_group_overlay_copy)
-    return xml_base_root
-
-
-def xml_process_apps_svg_id_element(xml_root, element, max_icon_size):
-    """ For the specified application icon embedded PNG icon fix the y coord.
-        Remove larger icon references. """
-    internal_size = (max_icon_size*3)//4
-    icon_border = (max_icon_size-internal_size)//2
-    xml_height = int(element.get("height"))
-    if element.tag == '{'+global_variables.XMLNS['svg']+'}image':
-        y_value = max_icon_size-xml_height-icon_border
-        element.set('y', str(y_value))
-    elif xml_height > max_icon_size:
-        xml_root.remove(element)
-        element = None
-    return xml_root
-
-
-def xml_process_apps_svg_group(xml_root, element, x_offset, y_offset):
-    """ Remove very large application scaled icons (>1x scale) for specified XML element.
-        For all other icons set X and Y offsets. """
-    xml_transform_attrib = element.attrib.get('transform')
-    if xml_transform_attrib is None:
-        return xml_root
-    matrix_regex = (r'^matrix\('
-                    r'([-]*[\.0-9]+)\,'
-                    r'([-]*[\.0-9]+)\,'
-                    r'([-]*[\.0-9]+)\,'
-                    r'([-]*[\.0-9]+)\,'
-                    r'([-]*[\.0-9]+)\,'
-                    r'([-]*[\.0-9]+)\)$')
-    if re.search(matrix_regex, xml_transform_attrib):
-        x_scale = re.sub(matrix_regex, r'\1', xml_transform_attrib)
-        y_scale = re.sub(matrix_regex, r'\4', xml_transform_attrib)
-        x_scale = round(float(x_scale))
-        y_scale = round(float(y_scale))
-        if x_scale == 1 and y_scale == 1:
-            element.set('transform', 'translate()') # dummy translate
-        else:
-            xml_root.remove(element)
-            return xml_root
-    if re.search(r'^translate\(.+\)$', xml_transform_attrib):
-        element.set('transform', 'translate('+str(x_offset)+', '+str(y_offset)+')')
-    return xml_root
-
-
-def xml_apps_svg_parse_groups(xml_root, apps_svg_file):
-    """ Set ID tags for all application SVG scalable icons.
-        Set X and Y translation offsets for all application SVG icons
-        - to ensure these are 'neatly' lined up. """
-    for element in xml_root.findall(".//*[@id]"):
-        if re.search(r'^icon\:[0-9]+\-[0-9]+$', element.attrib.get('id')):
-            xml_root = xml_process_apps_svg_id_element(xml_root,
-                                                       element,
-                                                       global_variables.NEW_ICON_SIZE)
-    icon_order = [global_variables.LARGE_SVG_ICON_ID,
-                  global_variables.MEDIUM_SVG_ICON_ID,
-                  global_variables.SMALL_SVG_ICON_ID]
-    if apps_svg_file in ['iexplore.svg', 'notepad.svg']:
-        icon_order = [global_variables.SMALL_SVG_ICON_ID,
-                      global_variables.MEDIUM_SVG_ICON_ID,
-                      global_variables.LARGE_SVG_ICON_ID]
-    elif apps_svg_file in ['taskmgr.svg', 'winecfg.svg', 'wordpad.svg']:
-        icon_order = [global_variables.MEDIUM_SVG_ICON_ID,
-                      global_variables.LARGE_SVG_ICON_ID]
-    first = True
-    for element in xml_root.findall(".//svg:g", global_variables.XMLNS):
-        x_offset = y_offset = 0
-        if icon_order:
-            element.set('id', icon_order[0])
-            icon_order = icon_order[1:]
-        if int(xml_root.get('height')) <= global_variables.NEW_ICON_SIZE:
-            continue
-        if first:
-            first = False
-            if apps_svg_file in ['taskmgr.svg', 'wcmd.svg', 'winefile.svg',
-                                 'winhelp.svg', 'winemine.svg']:
-                x_offset = y_offset = 8
-            elif apps_svg_file in ['winecfg.svg']:
-                x_offset = 176
-                y_offset = 24
-        if element.get('transform') != None:
-            xml_root = xml_process_apps_svg_group(xml_root, element, x_offset, y_offset)
-    return xml_root
+def xml_svg_dedupe_bitmaps(xml_root):
+    """ Hash, re-compress and collapse duplicate embedded PNG bitmaps, of an XML SVG icon, if
+        enabled. Returns a list of (image id, PNG hash, original size, size) tuples, or None. """
+    if not global_variables.BITMAP_DEDUPE:
+        return None
+    return dedupe_embedded_pngs(xml_root,
+                                global_variables.XMLNS['svg'],
+                                global_variables.XMLNS['xlink'],
+                                global_variables.VENDOR_ID+'-png',
+                                True)
+
+
+def xml_svg_optimize(xml_root):
+    """ Optimize an XML SVG icon, if enabled - keeping the attributes set by
+        xml_svg_fix_icon_size(). Returns the unoptimized icon size, or None. """
+    if not global_variables.SVG_OPTIMIZE:
+        return None
+    original_size = len(global_variables.XML_BACKEND.tostring(xml_root))
+    optimize_svg(xml_root,
+                 global_variables.XMLNS['svg'],
+                 [global_variables.XMLNS[name_space]
+                  for name_space in global_variables.SVG_EDITOR_NAMESPACES],
+                 ['{'+global_variables.XMLNS['inkscape']+'}version'],
+                 global_variables.SVG_PRECISION)
+    global_variables.XML_BACKEND.cleanup_namespaces(xml_root)
+    return original_size
 
 
 def xml_svg_fix_icon_size(xml_root):
@@ -545,163 +270,543 @@ def xml_svg_fix_icon_size(xml_root):
     return xml_root
 
 
-def process_wine_icon(wine_source_directory, target_root_directory):
-    """ Clone wine (Windows) icon file. """
-    print(f'{global_variables.WINE_ICON_LOGO_FILENAME} ', end='')
-    source_path = os.path.join(wine_source_directory, global_variables.WINE_LOGO_DIRECTORY)
-    source_path = os.path.join(source_path, global_variables.WINE_ICON_LOGO_FILENAME)
-    destination_path = os.path.join(target_root_directory, global_variables.ICONS_TARGET_RELPATH)
-    destination_path = os.path.join(destination_path, global_variables.WINE_ICON_LOGO_FILENAME)
-    shutil.copyfile(source_path, destination_path)
-
-
-def process_apps_svg_files(wine_source_directory, target_root_directory):
-    """ Loop through and process all application icons
-        - cloning these from the specified Wine Source tree. """
-    for apps_svg_file in global_variables.APP_SVG_FILES:
-        print(f'{apps_svg_file} ', end='')
-        sys.stdout.flush()
-        source_rel_directory = global_variables.APP_SVG_FILES[apps_svg_file]['srpath']
-        source_directory = os.path.join(wine_source_directory, source_rel_directory)
-        target_rel_path = global_variables.APP_SVG_FILES[apps_svg_file]['trpath']
-        target_directory = os.path.join(target_root_directory, target_rel_path)
-        xml_tree = xml_svg_load_and_parse(source_directory, apps_svg_file)
-        xml_root = xml_tree.getroot()
-        xml_root = xml_apps_svg_parse_groups(xml_root, apps_svg_file)
-        xml_root = xml_svg_fix_icon_size(xml_root)
-        if apps_svg_file == global_variables.WINE_SVG_LOGO_FILENAME:
-            apps_svg_file = 'wine.svg'
-        else:
-            apps_svg_file = 'wine-'+apps_svg_file
-        xml_svg_write(xml_tree, target_directory, apps_svg_file)
-
-
-def process_places_svg_files(wine_source_directory, target_root_directory):
-    """ Loop through and process all places icons
-        - cloning these from the specified Wine Source tree. """
+def process_apps_svg_file(wine_source_directory, apps_svg_file):
+    """ Process a single application icon - cloning it from the specified Wine Source tree.
+        Returns the (SVG file, unoptimized size, size, bitmap list, {path (relative to the
+        target directory): data}) result. """
+    source_rel_directory = global_variables.APP_SVG_FILES[apps_svg_file]['srpath']
+    source_directory = os.path.join(wine_source_directory, source_rel_directory)
+    target_rel_path = global_variables.APP_SVG_FILES[apps_svg_file]['trpath']
+    if apps_svg_file == global_variables.WINE_SVG_LOGO_FILENAME:
+        target_svg_file = global_variables.VENDOR_ID+'.svg'
+    else:
+        target_svg_file = global_variables.VENDOR_ID+'-'+apps_svg_file
+    icon_path = os.path.join(target_rel_path, target_svg_file)
+    if (global_variables.SVG_STREAMING and not global_variables.SVG_OPTIMIZE
+            and not global_variables.BITMAP_DEDUPE):
+        icon_data, image_list = xml_apps_svg_stream(os.path.join(source_directory,
+                                                                 apps_svg_file),
+                                                    apps_svg_file, icon_path)
+        output_dict = export_apps_png_icons(wine_source_directory, apps_svg_file, image_list)
+        output_dict[icon_path] = icon_data
+        return apps_svg_file, None, None, None, output_dict
+    xml_tree = xml_svg_load_and_parse(source_directory, apps_svg_file)
+    xml_root = xml_tree.getroot()
+    output_dict = export_apps_png_icons(wine_source_directory, apps_svg_file,
+                                        xml_apps_svg_get_images(xml_root))
+    xml_root = xml_apps_svg_parse_groups(xml_root, apps_svg_file)
+    xml_root = xml_svg_fix_icon_size(xml_root)
+    bitmap_list = xml_svg_dedupe_bitmaps(xml_root)
+    original_size = xml_svg_optimize(xml_root)
+    output_dict[icon_path] = global_variables.XML_BACKEND.serialize(xml_tree)
+    return (apps_svg_file, original_size, len(output_dict[icon_path]), bitmap_list,
+            output_dict)
+
+
+def process_places_svg_file(wine_source_directory, places_svg_file):
+    """ Process a single places icon - cloning it from the specified Wine Source tree,
+        and overlaying the (pre-parsed) Wine logo.
+        Returns the (SVG file, unoptimized size, size, bitmap list, {path (relative to the
+        target directory): data}) result. """
+    source_rel_directory = global_variables.PLACES_SVG_FILES[places_svg_file]['srpath']
+    source_directory = os.path.join(wine_source_directory, source_rel_directory)
+    target_rel_path = global_variables.PLACES_SVG_FILES[places_svg_file]['trpath']
+    prepare_function = None
+    if places_svg_file == 'document.svg':
+        prepare_function = xml_svg_join_fragmented_groups
+    xml_tree = xml_svg_load_and_parse(source_directory, places_svg_file, prepare_function)
+    xml_root = xml_tree.getroot()
+    if global_variables.OVERLAY_MODE == 'use':
+        xml_root = xml_do_overlay_svg_use(xml_root, global_variables.WINE_LOGO_OVERLAY,
+                                          places_svg_file)
+    else:
+        xml_root = xml_do_overlay_svg(xml_root, global_variables.WINE_LOGO_OVERLAY,
+                                      places_svg_file)
+    xml_root = xml_svg_fix_icon_size(xml_root)
+    bitmap_list = xml_svg_dedupe_bitmaps(xml_root)
+    original_size = xml_svg_optimize(xml_root)
+    icon_path = os.path.join(target_rel_path, global_variables.VENDOR_ID+'-'+places_svg_file)
+    icon_data = global_variables.XML_BACKEND.serialize(xml_tree)
+    return places_svg_file, original_size, len(icon_data), bitmap_list, {icon_path: icon_data}
+
+
+def load_wine_logo_overlay(wine_source_directory):
+    """ Parse the Wine logo, once, for overlaying on all places icons. """
     source_directory = os.path.join(wine_source_directory, global_variables.WINE_LOGO_DIRECTORY)
     xml_overlay_tree = xml_svg_load_and_parse(source_directory,
-                                              global_variables.WINE_SVG_LOGO_FILENAME)
-    xml_overlay_root = xml_overlay_tree.getroot()
-    xml_overlay_root = xml_svg_overlay_parse_groups(xml_overlay_root)
-    for places_svg_file in global_variables.PLACES_SVG_FILES:
-        print(f'{places_svg_file} ', end='')
-        sys.stdout.flush()
-        source_rel_directory = global_variables.PLACES_SVG_FILES[places_svg_file]['srpath']
-        source_directory = os.path.join(wine_source_directory, source_rel_directory)
-        target_rel_path = global_variables.PLACES_SVG_FILES[places_svg_file]['trpath']
-        target_directory = os.path.join(target_root_directory, target_rel_path)
-        xml_tree = xml_svg_load_and_parse(source_directory, places_svg_file)
-        xml_root = xml_tree.getroot()
-        if places_svg_file == 'document.svg':
-            xml_root = xml_svg_join_fragmented_groups(xml_root)
-        xml_root = xml_do_overlay_svg(xml_root, xml_overlay_root, places_svg_file)
-        xml_root = xml_svg_fix_icon_size(xml_root)
-        places_svg_file = global_variables.VENDOR_ID+'-'+places_svg_file
-        xml_svg_write(xml_tree, target_directory, places_svg_file)
-
-
-def create_makefile_variable(root_directory, subdirectory, variable_name, file_type):
-    """ Create a single variable for Makefile. """
-    search_directory = os.path.join(root_directory, subdirectory)
-    if not os.path.exists(search_directory):
-        os.makedirs(search_directory)
-    source_files = []
-    with os.scandir(search_directory) as it_directory:
-        for directory_entry in it_directory:
-            if (not directory_entry.name.startswith('.') and
-                    directory_entry.is_file() and
-                    directory_entry.name.endswith("."+file_type)
-               ):
-                path = os.path.join(search_directory, directory_entry)
-                path = os.path.relpath(path, root_directory)
-                source_files.append(path)
-    if len(source_files) == 1:
-        file_text = variable_name+" = "+source_files[0]
-    elif len(source_files) > 1:
-        source_files.sort()
-        file_text = variable_name+"  = "
-        for source_file in source_files:
-            file_text += " \\\n\t"+source_file
-    else:
-        file_text = ""
-    if len(source_files) >= 1:
-        file_text += "\n\n"
-    return file_text
-
-
-def create_makefile(root_directory):
-    """ Generate Makefile - referencing all file_types which are to be installed """
-    file_installation_list = \
-        [('MENU_FILES',
-          'menu',
-          'xdg/',
-          '/etc/xdg/menus/applications-merged'),
-         ('DESKTOP_FILES',
-          'desktop',
-          'applications/',
-          '/usr/share/applications'),
-         ('DIRECTORY_FILES',
-          'directory',
-          'desktop-directories/',
-          '/usr/share/desktop-directories'),
-         ('APPS_ICONS',
-          'svg',
-          global_variables.SVG_APPS_TARGET_RELPATH,
-          '/usr/share/icons/hicolor/scalable/apps'),
-         ('PLACES_ICONS',
-          'svg',
-          global_variables.SVG_PLACES_TARGET_RELPATH,
-          '/usr/share/icons/hicolor/scalable/places'),
-         ('WINE_ICO',
-          'ico',
-          global_variables.ICONS_TARGET_RELPATH,
-          '/usr/share/wine/icons')]
-    file_text = ""
-    for file_type_tuple in file_installation_list:
-        file_text += create_makefile_variable(root_directory,
-                                              file_type_tuple[2],
-                                              file_type_tuple[0],
-                                              file_type_tuple[1]
-                                             )
-    file_text += 'all:'
-    for file_type_tuple in file_installation_list:
-        file_text += ' $('+file_type_tuple[0]+')'
-    file_text += '\n\ninstall: all\n'
-    for file_type_tuple in file_installation_list:
-        file_text += ('\tinstall -d "$(DESTDIR)$(EPREFIX)'
-                      +file_type_tuple[3]
-                      +'"\n')
-        file_text += ('\tinstall -m0644 $('
-                      +file_type_tuple[0]
-                      +') "$(DESTDIR)$(EPREFIX)'
-                      +file_type_tuple[3]
-                      +'"\n')
-    if not os.path.exists(root_directory):
-        os.makedirs(root_directory)
-    path = os.path.join(root_directory, "Makefile")
-    with open(path, "w") as file_handle:
-        file_handle.write(file_text)
+                                              global_variables.WINE_SVG_LOGO_FILENAME,
+                                              xml_svg_overlay_parse_groups)
+    return xml_overlay_tree.getroot()
+
+
+def get_icon_worker_settings():
+    """ Get the settings, all icon worker processes are initialised with - passed explicitly, with
+        each task, rather than inherited from a (forked) parent process: the icon global
+        variables, the XML backend, the (serialized) Wine logo overlay and the SVG cache. """
+    return (get_global_inputs(ICON_WORKER_NAMES), global_variables.XML_BACKEND.name,
+            global_variables.XML_BACKEND.dumps(global_variables.WINE_LOGO_OVERLAY),
+            global_variables.SVG_CACHE)
+
+
+def init_icon_worker(worker_settings):
+    """ Initialise an icon worker process, on its first task (or if the settings change): global
+        variables, the XML backend, SVG namespaces, the SVG cache and the Wine logo overlay. """
+    global_variable_dict, xml_backend_name, xml_overlay_data, svg_cache = worker_settings
+    global_variables.SVG_CACHE = svg_cache
+    if ICON_WORKER_STATE.get('settings') == worker_settings[:3]:
+        return
+    if global_variables.VENDOR_ID is None:
+        global_variables.init()
+    for name, value in global_variable_dict.items():
+        setattr(global_variables, name, value)
+    init_xml_backend(xml_backend_name)
+    xml_register_svg_ns()
+    global_variables.WINE_LOGO_OVERLAY = global_variables.XML_BACKEND.loads(xml_overlay_data)
+    ICON_WORKER_STATE['settings'] = worker_settings[:3]
+
+
+def run_icon_task(worker_settings, process_svg_file, wine_source_directory, svg_file):
+    """ Run an icon task, in a worker process - initialised on its first task. """
+    init_icon_worker(worker_settings)
+    return process_svg_file(wine_source_directory, svg_file)
+
+
+def process_svg_files(wine_source_directory, svg_file_list, jobs):
+    """ Process a list of (process function, SVG file) icon tasks, using a bounded pool of
+        worker processes. Progress is reported in task order.
+        Returns the (SVG file, unoptimized size, size, bitmap list, {path: data}) result
+        of each task. """
+    result_list = []
+    if jobs <= 1:
+        for process_svg_file, svg_file in svg_file_list:
+            print(f'{svg_file} ', end='')
+            sys.stdout.flush()
+            result_list += [process_svg_file(wine_source_directory, svg_file)]
+        return result_list
+    worker_settings = get_icon_worker_settings()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        future_list = [executor.submit(run_icon_task, worker_settings, process_svg_file,
+                                       wine_source_directory, svg_file)
+                       for process_svg_file, svg_file in svg_file_list]
+        for future in future_list:
+            result_list += [future.result()]
+            print(f'{result_list[-1][0]} ', end='')
+            sys.stdout.flush()
+    return result_list
+
+
+def report_svg_optimization(result_list):
+    """ Print the bytes saved, by the SVG optimizer, for each icon and in total. """
+    total_original_size = total_size = 0
+    print('\nOptimize SVG icons...')
+    for svg_file, original_size, size, _, _ in result_list:
+        if original_size is None:
+            continue
+        print(f'{svg_file}: {original_size} -> {size} bytes ({original_size-size} bytes saved)')
+        total_original_size += original_size
+        total_size += size
+    print(f'Total: {total_original_size} -> {total_size} bytes'
+          f' ({total_original_size-total_size} bytes saved)', end='')
+
+
+def report_bitmap_dedupe(result_list):
+    """ Print the embedded PNG bitmaps, and bytes saved, for each icon - then all bitmaps
+        duplicated within, or across, icons (by content hash). """
+    total_original_size = total_size = 0
+    png_hash_dict = {}
+    print('\nDeduplicate embedded PNG bitmaps...')
+    for svg_file, _, _, bitmap_list, _ in result_list:
+        if not bitmap_list:
+            continue
+        original_size = sum(bitmap[2] for bitmap in bitmap_list)
+        size = sum(bitmap[3] for bitmap in bitmap_list)
+        collapsed_count = sum(1 for bitmap in bitmap_list if not bitmap[3])
+        print(f'{svg_file}: {len(bitmap_list)} bitmaps, {collapsed_count} duplicates collapsed,'
+              f' {original_size} -> {size} bytes')
+        total_original_size += original_size
+        total_size += size
+        for image_id, png_hash, _, _ in bitmap_list:
+            png_hash_dict.setdefault(png_hash, [])
+            png_hash_dict[png_hash] += [f'{svg_file}#{image_id}']
+    for png_hash in sorted(png_hash_dict):
+        if len(png_hash_dict[png_hash]) > 1:
+            print(f'Duplicate {png_hash[:12]}: {", ".join(png_hash_dict[png_hash])}')
+    print(f'Total: {total_original_size} -> {total_size} bytes'
+          f' ({total_original_size-total_size} bytes saved)', end='')
+
+
+def process_apps_places_svg_files(wine_source_directory):
+    """ Loop through and process all application and places icons
+        - cloning these from the specified Wine Source tree. Only the icons with changed
+        build graph node inputs are processed, the others are loaded.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    build_state = global_variables.BUILD_STATE
+    output_dict = {}
+    svg_file_list = []
+    digest_list = []
+    for process_svg_file, svg_file_dict in [(process_apps_svg_file,
+                                              global_variables.APP_SVG_FILES),
+                                             (process_places_svg_file,
+                                              global_variables.PLACES_SVG_FILES)]:
+        for svg_file in svg_file_dict:
+            digest = None
+            if build_state is not None:
+                digest = build_state.get_node_digest(get_svg_file_inputs(wine_source_directory,
+                                                                         svg_file_dict,
+                                                                         svg_file))
+                node_output_dict = build_state.load_node(f'icon:{svg_file}', digest)
+                if node_output_dict is not None:
+                    output_dict.update(node_output_dict)
+                    continue
+                if build_state.check_only:
+                    output_dict.update(build_state.get_previous_outputs(f'icon:{svg_file}',
+                                                                        digest))
+                    continue
+            svg_file_list += [(process_svg_file, svg_file)]
+            digest_list += [digest]
+    if not svg_file_list:
+        return output_dict
+    global_variables.WINE_LOGO_OVERLAY = load_wine_logo_overlay(wine_source_directory)
+    result_list = process_svg_files(wine_source_directory, svg_file_list,
+                                    global_variables.ICON_JOBS)
+    if global_variables.BITMAP_DEDUPE:
+        report_bitmap_dedupe(result_list)
+    if global_variables.SVG_OPTIMIZE:
+        report_svg_optimization(result_list)
+    for result, digest in zip(result_list, digest_list):
+        if build_state is not None:
+            build_state.store_node(f'icon:{result[0]}', digest, result[4])
+        output_dict.update(result[4])
+    return output_dict
+
+
+def get_variant_directory(vendor_id, prefix):
+    """ Get the target subdirectory name, for a (vendor id, prefix) variant. """
+    return prefix.lower()+vendor_id
+
+
+def rename_variant_icons(icon_output_dict, source_vendor_id):
+    """ Rename all hicolor icons, generated for a (source) vendor id, for the current vendor id
+        - the Wine (Windows) icon file is not renamed.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    ico_path = os.path.join(global_variables.ICONS_TARGET_RELPATH,
+                            global_variables.WINE_ICON_LOGO_FILENAME)
+    output_dict = {}
+    for icon_path, icon_data in icon_output_dict.items():
+        if icon_path != ico_path:
+            directory, icon_file = os.path.split(icon_path)
+            icon_path = os.path.join(directory,
+                                     global_variables.VENDOR_ID+icon_file[len(source_vendor_id):])
+        output_dict[icon_path] = icon_data
+    return output_dict
+
+
+def get_variant_icon_inputs(icon_output_dict, source_vendor_id):
+    """ Get the build graph node inputs, of the hicolor icons renamed for a vendor variant:
+        the digest of each icon generated for the (source) vendor id. """
+    return [source_vendor_id, global_variables.VENDOR_ID,
+            get_global_inputs(['ICONS_TARGET_RELPATH', 'WINE_ICON_LOGO_FILENAME']),
+            {icon_path:get_output_digest(icon_data)
+             for icon_path, icon_data in icon_output_dict.items()}]
+
+
+def generate_icons(wine_source_directory):
+    """ Clone and modify all Wine icons - for the current vendor id.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    xml_register_svg_ns()
+    output_dict = build_node(f'icon:{global_variables.WINE_ICON_LOGO_FILENAME}',
+                             get_wine_icon_inputs, process_wine_icon, wine_source_directory)
+    output_dict.update(process_apps_places_svg_files(wine_source_directory))
+    return output_dict
 
 
-def main():
-    """ Module to generate Distribution Agnostic Wine icon, .desktop and .menu data files. """
-    global_variables.init()
+def generate_variant(icon_output_dict):
+    """ Generate all Wine .desktop, .menu and Makefile data files, for the current vendor
+        variant - along with its (already generated) icons.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    output_dict = dict(icon_output_dict)
+    print('\nCreate Wine Desktop files... ', end='')
+    sys.stdout.flush()
+    output_dict.update(create_wine_desktop_files("applications"))
+    print('\nCreate Wine XDG Menu files...', end='')
+    sys.stdout.flush()
+    output_dict.update(build_node('menu', get_menu_file_inputs, create_menu_file,
+                                  "xdg", global_variables.VENDOR_PREFIX))
+    print('\nCreate Wine Menu files... ', end='')
+    sys.stdout.flush()
+    output_dict.update(create_wine_menu_files("desktop-directories",
+                                              global_variables.VENDOR_PREFIX))
+    print()
+    if global_variables.ICON_THEME_CACHE:
+        print('Create icon theme cache...')
+        output_dict.update(build_node('icon-theme-cache', get_icon_theme_cache_inputs,
+                                      create_icon_theme_cache_file, list(output_dict)))
+    print('Create artifact manifest and Makefile...')
+    manifest = create_manifest(output_dict)
+    output_dict.update(build_node('manifest', get_manifest_inputs, create_manifest_file,
+                                  manifest))
+    output_dict.update(build_node('Makefile', get_makefile_inputs, create_makefile, manifest))
+    return output_dict
+
+
+def build_translations():
+    """ Translate all terms and phrases - recording the translations of each phrase, and the
+        inputs these were derived from, in the build state. In check mode nothing is translated:
+        only the translation inputs of each phrase are checked. """
+    build_state = global_variables.BUILD_STATE
+    phrase_list = get_translatable_phrases()
+    translation_plan = plan_translations(phrase_list)
+    report_translation_plan(phrase_list, translation_plan)
+    term_key, phrase_key_dict = get_translation_keys(phrase_list)
+    if build_state is not None and build_state.check_only:
+        print('Check the translation inputs of all phrases...')
+        build_state.load_translations(get_translation_digests(term_key, phrase_key_dict))
+        return
+    print('Translate (non-)technical, (un)protected terms and all phrases...')
+    translate_all_phrases(phrase_list, translation_plan, global_variables.TRANSLATION_JOBS)
+    if build_state is not None:
+        build_state.set_translations(
+            {phrase:{'inputs': input_digest, 'digest': get_phrase_digest(phrase)}
+             for phrase, input_digest in get_translation_digests(term_key,
+                                                                 phrase_key_dict).items()})
+
+
+def build_outputs(wine_source_directory, target_directory=None):
+    """ Generate all Wine icon, .desktop, .menu and Makefile data files, in memory - for the
+        target directory, or for a target subdirectory of each vendor variant. All phrases are
+        translated, and all icons processed, once - for all vendor variants. Streamed icons
+        are spooled to the target directory, if specified - as output files.
+        With a build state, only the build graph nodes with changed inputs are generated. In
+        check mode nothing is translated: phrases with changed translation inputs are stale.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    build_state = global_variables.BUILD_STATE
+    build_translations()
+    output_dict = {}
+    icon_vendor_id = icon_output_dict = None
+    for vendor_id, prefix in get_vendor_variants():
+        init_vendor_variant(vendor_id, prefix)
+        variant_directory = ""
+        if global_variables.VENDOR_VARIANTS:
+            variant_directory = get_variant_directory(vendor_id, prefix)
+            print(f'Generate vendor variant: {vendor_id} (prefix: "{prefix}")'
+                  f' in {variant_directory}/')
+        if build_state is not None:
+            build_state.set_directory(variant_directory)
+        if icon_output_dict is None:
+            print('Clone and modify Wine icons... ', end='')
+            icon_vendor_id = vendor_id
+            if target_directory is not None:
+                global_variables.SPOOL_DIRECTORY = os.path.join(target_directory,
+                                                                variant_directory)
+            icon_output_dict = generate_icons(wine_source_directory)
+            global_variables.SPOOL_DIRECTORY = None
+            variant_icon_output_dict = icon_output_dict
+        else:
+            print(f'Rename Wine icons, generated for: {icon_vendor_id}', end='')
+            variant_icon_output_dict = build_node('icons', get_variant_icon_inputs,
+                                                  rename_variant_icons, icon_output_dict,
+                                                  icon_vendor_id)
+        variant_output_dict = generate_variant(variant_icon_output_dict)
+        for path, data in variant_output_dict.items():
+            output_dict[os.path.join(variant_directory, path)] = data
+    if build_state is not None:
+        build_state.set_directory("")
+    return output_dict
+
+
+def get_variant_directories():
+    """ Get the target subdirectory of each vendor variant - or only the target directory
+        itself, if no variants were specified. """
+    if not global_variables.VENDOR_VARIANTS:
+        return [""]
+    return [get_variant_directory(vendor_id, prefix)
+            for vendor_id, prefix in global_variables.VENDOR_VARIANTS]
+
+
+def get_root_directories(target_directory):
+    """ Get the root directory, of each vendor variant, in the target directory. """
+    return [os.path.normpath(os.path.join(target_directory, variant_directory))
+            for variant_directory in get_variant_directories()]
+
+
+def clean_outputs(target_directory):
+    """ Remove all target subdirectories, and the Makefile (of each vendor variant). """
+    print('Clean all subdirectories and files...')
+    for root_directory in get_root_directories(target_directory):
+        clean_all(root_directory)
+
+
+def write_outputs(target_directory, output_dict):
+    """ Write all generated files, from a {path (relative to the target directory): data}
+        dictionary, to the target directory - then remove all stale files, from the target
+        subdirectories (of each vendor variant). """
+    global_variables.OUTPUT_FILE_DICT = {}
+    root_directory_list = get_root_directories(target_directory)
+    print('Create all subdirectories...')
+    for root_directory in root_directory_list:
+        create_subdirectories(root_directory)
+    print('Write all files...')
+    write_output_files(target_directory, output_dict)
+    print('Remove stale files...')
+    removed_count = sum(remove_stale_output_files(root_directory)
+                        for root_directory in root_directory_list)
+    report_output_files(removed_count)
+
+
+def build_all(wine_source_directory, target_directory):
+    """ Generate all Wine icon, .desktop, .menu and Makefile data files
+        - and write these to the target directory, then save the build state. All target
+        subdirectories are removed first, if requested - so streamed icons can be spooled to
+        the target directory. """
+    if global_variables.CLEAN_OUTPUT:
+        clean_outputs(target_directory)
+    write_outputs(target_directory, build_outputs(wine_source_directory, target_directory))
+    build_state = global_variables.BUILD_STATE
+    if build_state is not None:
+        build_state.save()
+        print(f'Build graph: {len(build_state.rebuilt_node_list)} of'
+              f' {len(build_state.visited_nodes)} nodes rebuilt')
+
+
+def check_all(wine_source_directory):
+    """ Check the build graph, without generating (or translating) anything: report all
+        stale nodes - those with changed inputs, or missing or modified output files, and
+        phrases with changed translation inputs - and all nodes of the last build, no longer
+        generated. Returns True if all nodes are up to date. """
+    build_outputs(wine_source_directory)
+    build_state = global_variables.BUILD_STATE
+    removed_node_list = build_state.get_removed_nodes()
+    print()
+    for node in build_state.stale_node_list:
+        print(f'Stale: {node}')
+    for node in removed_node_list:
+        print(f'Removed: {node}')
+    stale_count = len(build_state.stale_node_list)+len(removed_node_list)
+    node_count = (len(build_state.visited_nodes)+len(build_state.translation_node_list)
+                  +len(removed_node_list))
+    print(f'Build check: {stale_count} of {node_count} nodes stale')
+    return not stale_count
+
+
+def generate_outputs(config, wine_source_directory):
+    """ Generate all Wine icon, .desktop, .menu and Makefile data files, in memory, for a
+        build configuration (global_variables.BuildConfig) - no files are written.
+        Backends and caches, not set in the configuration, are created with their defaults
+        (and kept in the configuration). Concurrent builds are not supported: the generators
+        read the global variables (and print progress), so in-process builds are serialized -
+        each uses its configuration, as the global variables, while it runs, then the global
+        variables, as the build left these, are saved to the configuration. Output files (of
+        unchanged build graph nodes, with a build state) are read into memory.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    with BUILD_LOCK:
+        if config.XML_BACKEND is None:
+            config.XML_BACKEND = create_xml_backend('etree')
+        if config.TRANSLATION_BACKEND is None:
+            config.TRANSLATION_BACKEND = \
+                create_translation_backend('trans', config.TRANSLATION_BATCH_DELIMITER)
+        if config.TRANSLATION_CACHE is None:
+            config.TRANSLATION_CACHE = TranslationCache(None,
+                                                        config.TRANSLATION_BACKEND.identity(),
+                                                        config.TRANSLATION_CACHE_MAX_ENTRIES)
+        global_variables.use_config(config)
+        try:
+            return {path:read_output_data(data)
+                    for path, data in build_outputs(wine_source_directory).items()}
+        finally:
+            global_variables.save_config(config)
+
+
+def create_argument_parser():
+    """ Create the command line argument parser, with all build and install options. """
     parser = argparse.ArgumentParser(description=('Python script to generate Wine .svg/.ico icon,'
                                                   '.desktop and .menu data files.'),
-                                     usage='%(prog)s [options]')
+                                     usage='%(prog)s [build|install] [options]')
+    parser.add_argument('command', nargs='?', choices=['build', 'install'], default='build',
+                        help=('Build all files (the default) - or install these, from the artifact'
+                              ' manifest of the target directory'))
     parser.add_argument('-t', '--target', nargs='?', default=os.getcwd(),
                         help='Root directory target for building')
     parser.add_argument('-w', '--wine', nargs='?',
                         help='Wine Source directory')
-    args = parser.parse_args()
-    target_directory = args.target
-    target_directory = os.path.realpath(target_directory)
-    if not os.path.isdir(target_directory):
-        parser.print_help()
-        print(f'\nTarget: {target_directory} is not a valid, pre-existing directory')
-        exit(1)
-    wine_source_directory = args.wine
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Number of parallel translation workers and icon worker processes')
+    parser.add_argument('--translation-backend', choices=TRANSLATION_BACKENDS, default='trans',
+                        help='Backend used for all translations')
+    parser.add_argument('--translation-catalog', nargs='?',
+                        help='JSON catalog file, for the offline catalog translation backend')
+    parser.add_argument('--fake-translation-latency', type=float, default=0.0,
+                        help='Latency (in seconds) per call, of the fake translation backend')
+    parser.add_argument('--translation-timeout', type=float, default=30.0,
+                        help='Timeout (in seconds) per request, of the trans-pool worker processes')
+    parser.add_argument('--export-backend-catalog', nargs='?',
+                        help='Write all translation backend results to a JSON catalog file')
+    parser.add_argument('--import-catalog', action='append', default=[],
+                        help=('Import translations from a JSON catalog file, .po file or directory'
+                              ' of .po files - these take precedence over the backend'))
+    parser.add_argument('--export-catalog', nargs='?',
+                        help=('Export all translations to a JSON catalog file (*.json)'
+                              ' or a directory of .po files'))
+    parser.add_argument('--plan', action='store_true',
+                        help='Only report the translation work a build would incur')
+    parser.add_argument('--cache-directory', nargs='?',
+                        default=global_variables.CACHE_DIRECTORY,
+                        help='Directory for the persistent translation and SVG caches')
+    parser.add_argument('--no-translation-cache', action='store_true',
+                        help='Bypass the persistent translation cache')
+    parser.add_argument('--no-svg-cache', action='store_true',
+                        help='Bypass the persistent cache of parsed SVG trees')
+    parser.add_argument('--xml-backend', choices=XML_BACKENDS, default='etree',
+                        help=('XML backend for all SVG handling - the output of each differs, so'
+                              ' auto (lxml, if available) depends on the environment'))
+    parser.add_argument('--overlay-mode', choices=OVERLAY_MODES, default='copy',
+                        help=('Overlay the Wine icon on places icons as a copy per icon size,'
+                              ' or defined once and instantiated with <use>'))
+    parser.add_argument('--optimize-svg', action='store_true',
+                        help=('Optimize all icons: strip editor-only content, prune unused defs,'
+                              ' round coordinates and minify whitespace (disables streaming)'))
+    parser.add_argument('--svg-precision', type=int, default=3,
+                        help='Decimal places, coordinates are rounded to, by the SVG optimizer')
+    parser.add_argument('--mimeinfo-cache', action='store_true',
+                        help=('Write the applications mimeinfo.cache, as update-desktop-database'
+                              ' would, to check the launchers - it is not installed (only a'
+                              ' header, unless a launcher with a MimeType is not hidden)'))
+    parser.add_argument('--clean', action='store_true',
+                        help=('Remove all target subdirectories, and the Makefile, before building'
+                              ' - rather than only replacing changed files'))
+    parser.add_argument('--png-icons', action='store_true',
+                        help=('Export the embedded PNG icons, of application icons, and the Wine'
+                              ' icon frames, as fixed size hicolor icons'))
+    parser.add_argument('--icon-theme-cache', action='store_true',
+                        help=('Write a GTK icon-theme.cache for the hicolor icons generated, to'
+                              ' check these - it is not installed (make install runs'
+                              ' gtk-update-icon-cache)'))
+    parser.add_argument('--dedupe-bitmaps', action='store_true',
+                        help=('Re-compress embedded PNG bitmaps losslessly, collapse duplicates'
+                              ' within each icon and report duplicates (disables streaming)'))
+    parser.add_argument('--variant', action='append', default=[], metavar='VENDOR_ID[:PREFIX]',
+                        help=('Generate the files for a vendor id, and Wine menu prefix'
+                              ' (e.g. Staging-), in a target subdirectory - may be repeated'))
+    parser.add_argument('--streaming-svg', action='store_true',
+                        help=('Stream application icons, element by element,'
+                              ' rather than parsing each into a tree - to a file in the'
+                              ' target directory, so no icon is held in memory'))
+    parser.add_argument('--refresh-translation-cache', action='store_true',
+                        help='Ignore all cached translations and replace them')
+    parser.add_argument('--destdir', default='',
+                        help='Install: staging directory, all files are installed in (as DESTDIR)')
+    parser.add_argument('--eprefix', default='',
+                        help='Install: prefix of all install destinations (as EPREFIX)')
+    parser.add_argument('--hardlink', action='store_true',
+                        help=('Install: hard link files, when possible, rather than copying these'
+                              ' - installed files then share the generated files'))
+    parser.add_argument('--check', action='store_true',
+                        help=('Only report the files a build would regenerate - those with changed'
+                              ' inputs, or missing or modified outputs (exit status 4 if any)'))
+    return parser
+
+
+def get_wine_source_directory(parser, wine_source_directory):
+    """ Get the (real) path of the Wine Source directory - exits if it is not valid. """
     if wine_source_directory is None:
         parser.print_help()
         print(f'\nWine Source directory not specified')
@@ -713,28 +818,110 @@ def main():
               +wine_source_directory
               +' is not a valid, pre-existing directory')
         exit(2)
-    print('Pre-translate (non-)technical, (un)protected terms...')
-    pre_translate_terms()
-    print('Clean all subdirectories and files...')
-    clean_all(target_directory)
-    print('Create all subdirectories...')
-    create_subdirectories(target_directory)
-    print('Clone and modify Wine icons... ', end='')
-    xml_register_svg_ns()
-    process_wine_icon(wine_source_directory, target_directory)
-    process_apps_svg_files(wine_source_directory, target_directory)
-    process_places_svg_files(wine_source_directory, target_directory)
-    print('\nCreate Wine Desktop files... ', end='')
-    sys.stdout.flush()
-    create_wine_desktop_files(os.path.join(target_directory, "applications"))
-    print('\nCreate Wine XDG Menu files...', end='')
-    sys.stdout.flush()
-    create_menu_file(os.path.join(target_directory, "xdg"), "")
-    print('\nCreate Wine Menu files... ', end='')
-    sys.stdout.flush()
-    create_wine_menu_files(os.path.join(target_directory, "desktop-directories"), "")
-    print('\nCreate Makefile...')
-    create_makefile(target_directory)
+    return wine_source_directory
+
+
+def init_vendor_variants(parser, variant_list):
+    """ Set the (vendor id, prefix) variants to generate, from VENDOR_ID[:PREFIX] options
+        - exits if any is not valid, or not unique. """
+    for variant in variant_list:
+        vendor_id, _, prefix = variant.partition(':')
+        variant_directory = get_variant_directory(vendor_id, prefix)
+        if (not VENDOR_ID_REGEX.match(vendor_id) or not VENDOR_PREFIX_REGEX.match(prefix)
+                or variant_directory in [get_variant_directory(*vendor_variant)
+                                         for vendor_variant in global_variables.VENDOR_VARIANTS]):
+            parser.print_help()
+            print(f'\nVendor variant: {variant} is not valid, or not unique')
+            exit(3)
+        global_variables.VENDOR_VARIANTS += [(vendor_id, prefix)]
+
+
+def init_build_options(args):
+    """ Set the global variables, for all build options. """
+    global_variables.TRANSLATION_JOBS = args.jobs
+    global_variables.ICON_JOBS = args.jobs
+    global_variables.SVG_STREAMING = args.streaming_svg
+    global_variables.OVERLAY_MODE = args.overlay_mode
+    global_variables.SVG_OPTIMIZE = args.optimize_svg
+    global_variables.SVG_PRECISION = args.svg_precision
+    global_variables.BITMAP_DEDUPE = args.dedupe_bitmaps
+    global_variables.PNG_ICONS = args.png_icons
+    global_variables.ICON_THEME_CACHE = args.icon_theme_cache
+    global_variables.CLEAN_OUTPUT = args.clean
+    global_variables.MIMEINFO_CACHE = args.mimeinfo_cache
+
+
+def init_build(args, target_directory):
+    """ Initialise the XML and translation backends, the translation and SVG caches and the
+        build state - then import all translation catalogs. """
+    init_xml_backend(args.xml_backend)
+    init_translation_backend(args.translation_backend, args.translation_catalog,
+                             args.fake_translation_latency, args.translation_timeout)
+    cache_directory = None
+    if not args.no_translation_cache:
+        cache_directory = os.path.realpath(args.cache_directory)
+    init_translation_cache(cache_directory, args.refresh_translation_cache)
+    svg_cache_directory = None
+    if not args.no_svg_cache:
+        svg_cache_directory = os.path.realpath(args.cache_directory)
+    init_svg_cache(svg_cache_directory)
+    init_build_state(target_directory, args.check)
+    for catalog_path in args.import_catalog:
+        import_count = import_catalog(catalog_path, global_variables.TRANSLATION_DICTIONARY)
+        print(f'Imported {import_count} translations from catalog: {catalog_path}')
+
+
+def run_build(args, wine_source_directory, target_directory):
+    """ Build (or only check) all files, then save the translation cache and evict the SVG
+        cache - and export the translation catalogs. Exits (status 4) if a check finds any
+        stale nodes. """
+    try:
+        if args.check:
+            up_to_date = check_all(wine_source_directory)
+        else:
+            build_all(wine_source_directory, target_directory)
+    finally:
+        translation_cache = global_variables.TRANSLATION_CACHE
+        translation_cache.save()
+        global_variables.TRANSLATION_BACKEND.close()
+        print(f'Translation cache: {translation_cache.hits} hits,'
+              f' {translation_cache.misses} misses')
+        if global_variables.SVG_CACHE is not None:
+            entry_count, total_size = global_variables.SVG_CACHE.evict()
+            print(f'SVG cache: {entry_count} trees, {total_size} bytes')
+    if args.check:
+        if not up_to_date:
+            exit(4)
+        return
+    if args.export_backend_catalog is not None:
+        export_backend_catalog(args.export_backend_catalog)
+    if args.export_catalog is not None:
+        export_catalog(args.export_catalog, global_variables.TRANSLATION_DICTIONARY)
+
+
+def main():
+    """ Module to generate Distribution Agnostic Wine icon, .desktop and .menu data files. """
+    global_variables.init()
+    parser = create_argument_parser()
+    args = parser.parse_args()
+    target_directory = args.target
+    target_directory = os.path.realpath(target_directory)
+    if not os.path.isdir(target_directory):
+        parser.print_help()
+        print(f'\nTarget: {target_directory} is not a valid, pre-existing directory')
+        exit(1)
+    if args.command == 'install':
+        install_all(target_directory, args.destdir, args.eprefix, args.hardlink)
+        return
+    wine_source_directory = get_wine_source_directory(parser, args.wine)
+    init_vendor_variants(parser, args.variant)
+    init_build_options(args)
+    init_build(args, target_directory)
+    if args.plan:
+        phrase_list = get_translatable_phrases()
+        report_translation_plan(phrase_list, plan_translations(phrase_list))
+        return
+    run_build(args, wine_source_directory, target_directory)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3.6
+
+""" Cache files, generated to check the build of build_tool.py script: the applications MIME
+    type cache (mimeinfo.cache) and the GTK icon theme cache (icon-theme.cache). Neither is
+    installed - make install updates the system caches. """
+
+import os
+import global_variables
+from build_graph import get_global_inputs
+from icon_theme_cache import create_icon_theme_cache, get_icon_dict, read_icon_theme_cache
+
+
+def create_mimeinfo_cache(directory):
+    """ Create the MIME type cache (mimeinfo.cache) for the Wine .desktop launcher files - in
+        the format update-desktop-database writes. Launchers with Hidden=true are ignored: the
+        only launcher with a MimeType (wine-mime-msi) is hidden, so by default the cache has
+        only its header. MIME types, and the launchers for each, are sorted.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    mime_type_dict = {}
+    for desktop_file, file_content in global_variables.DESKTOP_FILE_DICT.items():
+        if str(file_content.get("Hidden", "")).lower() == "true":
+            continue
+        for mime_type in file_content.get("MimeType", []):
+            mime_type_dict.setdefault(mime_type, set())
+            mime_type_dict[mime_type].add(desktop_file+".desktop")
+    file_text = "[MIME Cache]\n"
+    for mime_type in sorted(mime_type_dict):
+        file_text += mime_type+"="+"".join(desktop_id+";"
+                                           for desktop_id in sorted(mime_type_dict[mime_type]))
+        file_text += "\n"
+    path = os.path.join(directory, global_variables.MIMEINFO_CACHE_FILENAME)
+    print(f'{global_variables.MIMEINFO_CACHE_FILENAME} ', end='')
+    return {path: file_text.encode('utf-8')}
+
+
+def get_mimeinfo_cache_inputs(directory):
+    """ Get the build graph node inputs, of the MIME type cache: only the MimeType and Hidden
+        entries, of each Wine .desktop launcher file. """
+    return [directory, global_variables.MIMEINFO_CACHE_FILENAME,
+            {desktop_file:[file_content.get("MimeType"), file_content.get("Hidden")]
+             for desktop_file, file_content in global_variables.DESKTOP_FILE_DICT.items()}]
+
+
+def create_icon_theme_cache_file(path_list):
+    """ Create the GTK icon theme cache, for the hicolor icon theme, from the list of paths
+        generated (relative to the target directory). Then verify it - by reading it back
+        and comparing it with the icons in the icon theme directory. The cache is only a build
+        check artifact: it is not installed (gtk-update-icon-cache updates the system cache).
+        Returns a {path (relative to the target directory): data} dictionary. """
+    theme_directory = os.path.normpath(global_variables.ICON_THEME_RELPATH)
+    icon_dict = get_icon_dict([os.path.relpath(path, theme_directory) for path in path_list
+                               if path.startswith(theme_directory+os.sep)])
+    path = os.path.join(theme_directory, global_variables.ICON_THEME_CACHE_FILENAME)
+    cache_data = create_icon_theme_cache(icon_dict)
+    if read_icon_theme_cache(cache_data) != icon_dict:
+        raise SystemError(f'Icon theme cache: {path} does not match the icon theme directory')
+    return {path: cache_data}
+
+
+def get_icon_theme_cache_inputs(path_list):
+    """ Get the build graph node inputs, of the GTK icon theme cache. """
+    return [get_global_inputs(['ICON_THEME_RELPATH', 'ICON_THEME_CACHE_FILENAME']),
+            sorted(path_list)]
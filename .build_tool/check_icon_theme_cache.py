@@ -0,0 +1,48 @@
+#!/usr/bin/env python3.6
+
+""" Verification of an icon theme cache (icon-theme.cache), as written by build_tool.py
+    script: the cache is read back and compared with a scan of its icon theme directory. """
+
+import argparse
+import os
+import sys
+from icon_theme_cache import read_icon_theme_cache, scan_icon_theme
+
+
+def main():
+    """ Compare the icons listed by an icon theme cache with the icon theme directory. """
+    parser = argparse.ArgumentParser(description=('Check an icon theme cache against a scan of'
+                                                  ' its icon theme directory.'))
+    parser.add_argument('-d', '--directory', required=True,
+                        help='Icon theme directory, e.g. icons/hicolor of a build target')
+    parser.add_argument('-c', '--cache', nargs='?',
+                        help=('Icon theme cache to check (default: icon-theme.cache, in the icon'
+                              ' theme directory) - e.g. as written by gtk-update-icon-cache'))
+    args = parser.parse_args()
+    path = args.cache or os.path.join(args.directory, 'icon-theme.cache')
+    if not os.path.isfile(path):
+        print(f'Icon theme cache: {path} does not exist')
+        sys.exit(2)
+    with open(path, "rb") as file_handle:
+        try:
+            cache_icon_dict = read_icon_theme_cache(file_handle.read())
+        except ValueError as error:
+            print(f'Icon theme cache: {path} is invalid - {error}')
+            sys.exit(2)
+    scan_icon_dict = scan_icon_theme(args.directory)
+    mismatch_count = 0
+    for icon_name in sorted(set(cache_icon_dict) | set(scan_icon_dict)):
+        if cache_icon_dict.get(icon_name) != scan_icon_dict.get(icon_name):
+            print(f'{icon_name}: cache {cache_icon_dict.get(icon_name)},'
+                  f' directory {scan_icon_dict.get(icon_name)}')
+            mismatch_count += 1
+    directory_count = len({directory for directory_dict in scan_icon_dict.values()
+                           for directory in directory_dict})
+    print(f'{len(cache_icon_dict)} icons cached, {len(scan_icon_dict)} icons'
+          f' in {directory_count} directories, {mismatch_count} mismatches')
+    if mismatch_count:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3.6
+
+""" Byte-for-byte check of the mimeinfo.cache written by build_tool.py script, against the
+    reference tool (update-desktop-database) run on a copy of the generated .desktop files. """
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+MIMEINFO_CACHE_FILENAME = 'mimeinfo.cache'
+# Exit status when the check is skipped - as used by automake test harnesses
+SKIP_EXIT_STATUS = 77
+
+
+def main():
+    """ Compare the generated mimeinfo.cache with that written by update-desktop-database. """
+    parser = argparse.ArgumentParser(description=('Check a generated mimeinfo.cache against'
+                                                  ' update-desktop-database. Exits with status'
+                                                  f' {SKIP_EXIT_STATUS} (skipped) if'
+                                                  ' update-desktop-database is not available.'
+                                                  ' The default cache has only a header: the'
+                                                  ' only launcher with a MimeType'
+                                                  ' (wine-mime-msi) is Hidden=true.'))
+    parser.add_argument('-d', '--directory', required=True,
+                        help='Applications directory, e.g. applications of a build target')
+    args = parser.parse_args()
+    path = os.path.join(args.directory, MIMEINFO_CACHE_FILENAME)
+    if not os.path.isfile(path):
+        print(f'MIME type cache: {path} does not exist')
+        sys.exit(2)
+    tool_path = shutil.which('update-desktop-database')
+    if tool_path is None:
+        print('update-desktop-database: not available - check skipped')
+        sys.exit(SKIP_EXIT_STATUS)
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for filename in os.listdir(args.directory):
+            if filename.endswith('.desktop'):
+                shutil.copyfile(os.path.join(args.directory, filename),
+                                os.path.join(temporary_directory, filename))
+        subprocess.run([tool_path, '-q', temporary_directory], check=True)
+        with open(os.path.join(temporary_directory, MIMEINFO_CACHE_FILENAME), "rb") as file_handle:
+            reference_data = file_handle.read()
+    with open(path, "rb") as file_handle:
+        data = file_handle.read()
+    if data != reference_data:
+        print(f'MIME type cache: {path} differs from update-desktop-database output')
+        sys.exit(2)
+    print(f'MIME type cache: {path} matches update-desktop-database output')
+
+
+if __name__ == '__main__':
+    main()
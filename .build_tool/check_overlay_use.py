@@ -0,0 +1,161 @@
+#!/usr/bin/env python3.6
+
+""" Size and render equivalence check, of the places icon overlay modes of build_tool.py
+    script: the Wine icon copied per icon size (copy) against defined once and instantiated
+    with <use> (use). Both outputs are flattened - <use> references expanded, <defs> removed,
+    all other references replaced by the (flattened) content they reference and ids dropped
+    - then compared. """
+
+import argparse
+import os
+import sys
+from xml.etree import ElementTree
+import build_tool
+import global_variables
+import svg_overlay
+from xml_backend import XML_BACKENDS
+
+
+def get_reference_id(value):
+    """ Get the id referenced by a #id href value, or None. """
+    if value.startswith('#'):
+        return value[1:]
+    return None
+
+
+def get_canonical_reference(element_id, id_dict, canonical_dict):
+    """ Get the canonical form, of the element referenced by an id: its flattened content. """
+    if element_id not in canonical_dict:
+        canonical_dict[element_id] = f'#{element_id}'
+        if element_id in id_dict:
+            canonical_element = flatten_element(id_dict[element_id], id_dict, canonical_dict)
+            canonical_dict[element_id] = ElementTree.tostring(canonical_element,
+                                                              encoding='unicode')
+    return canonical_dict[element_id]
+
+
+def flatten_element(xml_element, id_dict, canonical_dict):
+    """ Get a flattened copy of an element: <use> references expanded, <defs> removed,
+        references replaced by their canonical form, ids and whitespace dropped and
+        attributes sorted. """
+    use_tag = '{'+global_variables.XMLNS['svg']+'}use'
+    defs_tag = '{'+global_variables.XMLNS['svg']+'}defs'
+    href_key = '{'+global_variables.XMLNS['xlink']+'}href'
+    if xml_element.tag == use_tag and get_reference_id(xml_element.get(href_key, '')) in id_dict:
+        used_element = id_dict[get_reference_id(xml_element.get(href_key))]
+        flat_element = flatten_element(used_element, id_dict, canonical_dict)
+        if xml_element.get('transform') is not None:
+            transform = xml_element.get('transform')
+            if flat_element.get('transform') is not None:
+                transform += ' '+flat_element.get('transform')
+            flat_element.set('transform', transform)
+        flat_element.attrib = dict(sorted(flat_element.attrib.items()))
+        return flat_element
+    attrib = {}
+    for key, value in sorted(xml_element.attrib.items()):
+        if key == 'id':
+            continue
+        reference_id = get_reference_id(value)
+        if reference_id is not None:
+            value = get_canonical_reference(reference_id, id_dict, canonical_dict)
+        elif 'url(#' in value:
+            value = svg_overlay.SVG_URL_REFERENCE_REGEX.sub(
+                lambda match: 'url('+get_canonical_reference(match.group(1), id_dict,
+                                                             canonical_dict)+')',
+                value)
+        attrib[key] = value
+    flat_element = ElementTree.Element(xml_element.tag, attrib)
+    if xml_element.text is not None and xml_element.text.strip():
+        flat_element.text = xml_element.text
+    for xml_child in xml_element:
+        if xml_child.tag == defs_tag:
+            continue
+        flat_child = flatten_element(xml_child, id_dict, canonical_dict)
+        if xml_child.tail is not None and xml_child.tail.strip():
+            flat_child.tail = xml_child.tail
+        flat_element.append(flat_child)
+    return flat_element
+
+
+def flatten_tree(xml_root):
+    """ Get the flattened (rendered) form of an SVG tree, as a string. """
+    flat_root = flatten_element(xml_root, svg_overlay.xml_svg_get_id_dict(xml_root), {})
+    return ElementTree.tostring(flat_root, encoding='unicode')
+
+
+def get_overlay_ids(xml_root, xml_overlay_root):
+    """ Get all ids that the base icon shares with the overlay - but with different content. """
+    overlay_id_dict = {}
+    for xml_overlay_element in xml_overlay_root:
+        overlay_id_dict.update(svg_overlay.xml_svg_get_id_dict(xml_overlay_element))
+    base_id_dict = svg_overlay.xml_svg_get_id_dict(xml_root)
+    return sorted(element_id for element_id in overlay_id_dict
+                  if element_id in base_id_dict
+                  and (global_variables.XML_BACKEND.tostring(overlay_id_dict[element_id])
+                       != global_variables.XML_BACKEND.tostring(base_id_dict[element_id])))
+
+
+def load_places_svg_file(wine_source_directory, places_svg_file):
+    """ Load a places icon - as prepared by build_tool.py script. """
+    source_rel_directory = global_variables.PLACES_SVG_FILES[places_svg_file]['srpath']
+    source_directory = os.path.join(wine_source_directory, source_rel_directory)
+    prepare_function = None
+    if places_svg_file == 'document.svg':
+        prepare_function = build_tool.xml_svg_join_fragmented_groups
+    return build_tool.xml_svg_load_and_parse(source_directory, places_svg_file,
+                                             prepare_function).getroot()
+
+
+def overlay_places_svg_file(wine_source_directory, places_svg_file, overlay_mode):
+    """ Load a places icon and overlay the Wine icon, with the specified overlay mode. """
+    xml_root = load_places_svg_file(wine_source_directory, places_svg_file)
+    if overlay_mode == 'use':
+        return svg_overlay.xml_do_overlay_svg_use(xml_root, global_variables.WINE_LOGO_OVERLAY,
+                                                  places_svg_file)
+    return svg_overlay.xml_do_overlay_svg(xml_root, global_variables.WINE_LOGO_OVERLAY,
+                                          places_svg_file)
+
+
+def main():
+    """ Compare the size, and flattened form, of all places icons for both overlay modes. """
+    global_variables.init()
+    parser = argparse.ArgumentParser(description=('Check the <use> overlay mode, of places'
+                                                  ' icons, against the copy overlay mode.'))
+    parser.add_argument('-w', '--wine', required=True,
+                        help='Wine Source directory')
+    parser.add_argument('--xml-backend', choices=XML_BACKENDS, default='etree',
+                        help='XML backend for all SVG handling')
+    args = parser.parse_args()
+    build_tool.init_xml_backend(args.xml_backend)
+    build_tool.xml_register_svg_ns()
+    global_variables.WINE_LOGO_OVERLAY = build_tool.load_wine_logo_overlay(args.wine)
+    total_size = {'copy':0, 'use':0}
+    mismatch_count = 0
+    for places_svg_file in global_variables.PLACES_SVG_FILES:
+        xml_root_dict = {overlay_mode:overlay_places_svg_file(args.wine, places_svg_file,
+                                                              overlay_mode)
+                         for overlay_mode in svg_overlay.OVERLAY_MODES}
+        size_dict = {overlay_mode:len(global_variables.XML_BACKEND.tostring(
+                         xml_root_dict[overlay_mode]))
+                     for overlay_mode in xml_root_dict}
+        for overlay_mode in size_dict:
+            total_size[overlay_mode] += size_dict[overlay_mode]
+        status = 'equivalent'
+        if flatten_tree(xml_root_dict['copy']) != flatten_tree(xml_root_dict['use']):
+            collision_list = get_overlay_ids(load_places_svg_file(args.wine, places_svg_file),
+                                             global_variables.WINE_LOGO_OVERLAY)
+            if collision_list:
+                status = f'differs - colliding overlay ids renamed: {", ".join(collision_list)}'
+            else:
+                status = 'DIFFERS'
+                mismatch_count += 1
+        print(f'{places_svg_file}: {size_dict["copy"]} -> {size_dict["use"]} bytes, {status}')
+    print(f'Total: {total_size["copy"]} -> {total_size["use"]} bytes'
+          f' ({total_size["copy"]-total_size["use"]} bytes saved)')
+    if mismatch_count:
+        print(f'{mismatch_count} places icons render differently')
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
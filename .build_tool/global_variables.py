@@ -3,20 +3,64 @@
 """ Global variables for build_tool.py script """
 
 import os
+import sys
 
+# All defined by init() - containers default to an empty value, of their type, until then
 VENDOR_ID = None
-TRANSLATION_DICTIONARY = None
-PROTECTED_TERMS_DICT = None
-UNPROTECTED_TERMS = None
-WINE_CATEGORIES = None
-GENERAL_CATEGORIES = None
+VENDOR_PREFIX = None
+VENDOR_VARIANTS: list = []
+TRANSLATION_DICTIONARY: dict = {}
+TRANSLATION_BACKEND = None
+TRANSLATION_CACHE = None
+TRANSLATION_CACHE_FILENAME = None
+TRANSLATION_CACHE_MAX_ENTRIES = None
+CACHE_DIRECTORY = None
+SVG_CACHE = None
+SVG_CACHE_DIRNAME = None
+SVG_CACHE_MAX_BYTES = None
+TRANSLATION_JOBS = None
+TRANSLATION_BATCH_SIZE = None
+ICON_JOBS = None
+SVG_STREAMING = None
+OVERLAY_MODE = None
+XML_BACKEND = None
+SVG_OPTIMIZE = None
+SVG_PRECISION = None
+SVG_EDITOR_NAMESPACES: list = []
+BITMAP_DEDUPE = None
+WINE_LOGO_OVERLAY = None
+TRANSLATION_BATCH_DELIMITER = None
+PROTECTED_TERMS_DICT: dict = {}
+PROTECTED_TERMS_IDS: frozenset = frozenset()
+PROTECTED_TERMS_MASKERS = None
+LOCALE_TERMS_MASKERS: dict = {}
+UNPROTECTED_TERMS: list = []
+WINE_CATEGORIES: dict = {}
+GENERAL_CATEGORIES: dict = {}
 TYPE = None
-DESKTOP_FILE_DICT = None
-WINE_DESKTOP_FILES = None
+DESKTOP_FILE_DICT: dict = {}
+WINE_DESKTOP_FILES: list = []
 NEW_INKSCAPE_VERSION = None
 NEW_ICON_SIZE = None
 ICONS_TARGET_RELPATH = None
 SVG_TARGET_RELPATH = None
+PNG_ICONS = None
+PNG_ICON_SIZES: list = []
+PNG_APPS_TARGET_RELPATH = None
+ICON_THEME_CACHE = None
+ICON_THEME_RELPATH = None
+ICON_THEME_CACHE_FILENAME = None
+CLEAN_OUTPUT = None
+SPOOL_DIRECTORY = None
+MIMEINFO_CACHE = None
+MIMEINFO_CACHE_FILENAME = None
+OUTPUT_FILE_DICT: dict = {}
+BUILD_STATE = None
+BUILD_STATE_FILENAME = None
+MANIFEST_FILENAME = None
+MANIFEST_FORMAT = None
+INSTALL_FILE_MODE = None
+SYSTEM_CACHE_UPDATES: list = []
 OVERLAY_LARGE_X_SCALE = None
 OVERLAY_LARGE_Y_SCALE = None
 OVERLAY_MEDIUM_X_SCALE = None
@@ -25,320 +69,415 @@ WINE_LOGO_DIRECTORY = None
 WINE_SVG_LOGO_FILENAME = None
 WINE_ICON_LOGO_FILENAME = None
 SVG_APPS_TARGET_RELPATH = None
-APP_SVG_FILES = None
+APP_SVG_FILES: dict = {}
 SVG_PLACES_TARGET_RELPATH = None
-PLACES_SVG_FILES = None
+PLACES_SVG_FILES: dict = {}
 LARGE_SVG_ICON_ID = None
 MEDIUM_SVG_ICON_ID = None
 SMALL_SVG_ICON_ID = None
-XMLNS = None
-SUBDIRECTORIES = None
+XMLNS: dict = {}
+SUBDIRECTORIES: list = []
 
 
-def init():
-    """ Define all global variables for build_tool.py script """
-    # pylint: disable=global-statement
+def init(config=None):
+    """ Define all global variables for build_tool.py script - or, if specified, all the
+        attributes of a build configuration. """
     # pylint: disable=too-many-statements
-    global VENDOR_ID
-    global TRANSLATION_DICTIONARY
-    global PROTECTED_TERMS_DICT
-    global UNPROTECTED_TERMS
-    global WINE_CATEGORIES
-    global GENERAL_CATEGORIES
-    global TYPE
-    global DESKTOP_FILE_DICT
-    global WINE_DESKTOP_FILES
-    global NEW_INKSCAPE_VERSION
-    global NEW_ICON_SIZE
-    global ICONS_TARGET_RELPATH
-    global SVG_TARGET_RELPATH
-    global OVERLAY_LARGE_X_SCALE
-    global OVERLAY_LARGE_Y_SCALE
-    global OVERLAY_MEDIUM_X_SCALE
-    global OVERLAY_MEDIUM_Y_SCALE
-    global WINE_LOGO_DIRECTORY
-    global WINE_SVG_LOGO_FILENAME
-    global WINE_ICON_LOGO_FILENAME
-    global SVG_APPS_TARGET_RELPATH
-    global APP_SVG_FILES
-    global SVG_PLACES_TARGET_RELPATH
-    global PLACES_SVG_FILES
-    global LARGE_SVG_ICON_ID
-    global MEDIUM_SVG_ICON_ID
-    global SMALL_SVG_ICON_ID
-    global XMLNS
-    global SUBDIRECTORIES
-    VENDOR_ID = 'wine'
-    TRANSLATION_DICTIONARY = {"en":{},
-                              "ar":{}, "bg":{},
-                              "ca":{}, "cs":{},
-                              "da":{}, "de":{},
-                              "el":{}, "eo":{}, "es":{},
-                              "fa":{}, "fi":{}, "fr":{},
-                              "he":{}, "hi":{}, "hr":{}, "hu":{},
-                              "it":{}, "ja":{},
-                              "ko":{}, "lt":{}, "ml":{}, "nl":{},
-                              "pa":{}, "pl":{}, "pt":{}, "pt-BR":{}, "pt-PT":{},
-                              "ro":{}, "ru":{},
-                              "sk":{}, "sl":{}, "sr":{}, "sr-Cyrl":{}, "sr-Latn":{}, "sv":{},
-                              "te":{}, "th":{}, "tr":{}, "uk":{},
-                              "zh":{}, "zh-CN":{}, "zh-TW":{}}
+    if config is None:
+        config = sys.modules[__name__]
+    config.VENDOR_ID = 'wine'
+    # Generate the files for each (vendor id, prefix) variant, in a target subdirectory - rather
+    # than only for the vendor id above (with no prefix), in the target directory
+    config.VENDOR_VARIANTS = []
+    config.TRANSLATION_DICTIONARY = {"en":{},
+                                     "ar":{}, "bg":{},
+                                     "ca":{}, "cs":{},
+                                     "da":{}, "de":{},
+                                     "el":{}, "eo":{}, "es":{},
+                                     "fa":{}, "fi":{}, "fr":{},
+                                     "he":{}, "hi":{}, "hr":{}, "hu":{},
+                                     "it":{}, "ja":{},
+                                     "ko":{}, "lt":{}, "ml":{}, "nl":{},
+                                     "pa":{}, "pl":{}, "pt":{}, "pt-BR":{}, "pt-PT":{},
+                                     "ro":{}, "ru":{},
+                                     "sk":{}, "sl":{}, "sr":{}, "sr-Cyrl":{}, "sr-Latn":{}, "sv":{},
+                                     "te":{}, "th":{}, "tr":{}, "uk":{},
+                                     "zh":{}, "zh-CN":{}, "zh-TW":{}}
+    # Backend used for all translations
+    config.TRANSLATION_BACKEND = None
+    # Persistent translation cache - reused between builds
+    config.TRANSLATION_CACHE = None
+    config.TRANSLATION_CACHE_FILENAME = "translations.json"
+    config.TRANSLATION_CACHE_MAX_ENTRIES = 50000
+    config.CACHE_DIRECTORY = os.path.join(os.environ.get('XDG_CACHE_HOME',
+                                                         os.path.join(os.path.expanduser('~'),
+                                                                      '.cache')),
+                                          'wine-desktop-common')
+    # Persistent cache of parsed (and prepared) Wine source SVG trees - reused between builds
+    config.SVG_CACHE = None
+    config.SVG_CACHE_DIRNAME = "svg"
+    config.SVG_CACHE_MAX_BYTES = 64*1024*1024
+    # Number of locales translated concurrently
+    config.TRANSLATION_JOBS = 1
+    # Maximum number of text blocks per translation backend call - and the (numeric)
+    # delimiter used to separate them, which is not subject to translation
+    config.TRANSLATION_BATCH_SIZE = 32
+    config.TRANSLATION_BATCH_DELIMITER = '9090909090909'
+    # Number of icon worker processes - and the parsed Wine logo overlay, shared by all workers
+    config.ICON_JOBS = 1
+    config.WINE_LOGO_OVERLAY = None
+    # Stream application icons (parse, transform and write these element by element)
+    # - rather than parsing each into a tree
+    config.SVG_STREAMING = False
+    # Overlay the Wine icon on places icons: 'copy' (per icon size) or 'use' (defined once)
+    config.OVERLAY_MODE = 'copy'
+    # XML backend for all SVG handling: the ElementTree module (the default) or lxml - these
+    # serialize some icons differently, so the backend is an input of all icons
+    config.XML_BACKEND = None
+    # Optimize all icons (after these are resized) - rounding coordinates to SVG_PRECISION
+    # decimal places, and stripping the editor-only (and metadata) XMLNS namespaces
+    config.SVG_OPTIMIZE = False
+    config.SVG_PRECISION = 3
+    config.SVG_EDITOR_NAMESPACES = ['sodipodi', 'inkscape', 'rdf', 'cc', 'dc_uri']
+    # Re-compress embedded PNG bitmaps, of all icons, and collapse duplicates into <defs>
+    config.BITMAP_DEDUPE = False
     # Protect these technical/company terms from translation
     # - replace them temporarily, during translation, with a CRC checksum.
-    PROTECTED_TERMS_DICT = {'C:':'001116292070',
-                            'Microsoft®':'002181990571',
-                            'Windows':'001391736148',
-                            'Wine':'002712425879'}
-    UNPROTECTED_TERMS = ['Component', 'Editor', 'Object', 'Model', 'Text', 'Viewer']
+    config.PROTECTED_TERMS_DICT = {'C:':'001116292070',
+                                   'Microsoft®':'002181990571',
+                                   'Windows':'001391736148',
+                                   'Wine':'002712425879'}
+    config.PROTECTED_TERMS_IDS = frozenset(config.PROTECTED_TERMS_DICT.values())
+    # Single-pass (un)masking engines for all terms - built on first use
+    config.PROTECTED_TERMS_MASKERS = None
+    config.LOCALE_TERMS_MASKERS = {}
+    config.UNPROTECTED_TERMS = ['Component', 'Editor', 'Object', 'Model', 'Text', 'Viewer']
+
+    # Categories and desktop launcher files - for the vendor id above (with no prefix)
+    init_vendor(config.VENDOR_ID, "", config)
+
+    # Write a MIME type cache, for the Wine .desktop launcher files (as update-desktop-database)
+    # - only a build check artifact, never installed (see SYSTEM_CACHE_UPDATES)
+    config.MIMEINFO_CACHE = False
+    config.MIMEINFO_CACHE_FILENAME = "mimeinfo.cache"
+
+    # Desktop directory files
+    config.WINE_DESKTOP_FILES = ["Wine", "Wine-Programs", "Wine-Programs-Accessories"]
+
+    # Icon File Constants
+    config.NEW_INKSCAPE_VERSION = "0.92"
+    config.NEW_ICON_SIZE = 64
+    config.ICONS_TARGET_RELPATH = "icons/"
+    config.SVG_TARGET_RELPATH = os.path.join(config.ICONS_TARGET_RELPATH, "hicolor/scalable/")
+    # Export the embedded PNG icons, of application icons, and the Wine (Windows) icon frames
+    # as fixed size hicolor icons - for these sizes (format PNG_APPS_TARGET_RELPATH with size)
+    config.PNG_ICONS = False
+    config.PNG_ICON_SIZES = [16, 22, 24, 32, 48, 64, 96, 128, 256]
+    config.PNG_APPS_TARGET_RELPATH = os.path.join(config.ICONS_TARGET_RELPATH,
+                                                  "hicolor/{size}x{size}/apps/")
+    # Write a GTK icon theme cache, for all the hicolor icons generated - only a build check
+    # artifact, never installed (see SYSTEM_CACHE_UPDATES)
+    config.ICON_THEME_CACHE = False
+    config.ICON_THEME_RELPATH = os.path.join(config.ICONS_TARGET_RELPATH, "hicolor/")
+    config.ICON_THEME_CACHE_FILENAME = "icon-theme.cache"
+    # Remove all output before building - otherwise only changed files are replaced and
+    # stale files removed. All files written (path: changed) are recorded in OUTPUT_FILE_DICT
+    config.CLEAN_OUTPUT = False
+    # Directory streamed icons are spooled to, while generated - the target (vendor variant)
+    # directory, in a build writing files, otherwise None (in memory)
+    config.SPOOL_DIRECTORY = None
+    config.OUTPUT_FILE_DICT = {}
+    # Incremental build state (build_state.BuildState) - the inputs, and outputs, of each
+    # generated artifact are recorded in BUILD_STATE_FILENAME, in the target directory
+    config.BUILD_STATE = None
+    config.BUILD_STATE_FILENAME = ".build-state.json"
+    # Artifact manifest (JSON) - each file to install, with its destination, mode and checksum
+    config.MANIFEST_FILENAME = "build-manifest.json"
+    config.MANIFEST_FORMAT = 1
+    config.INSTALL_FILE_MODE = 0o644
+    # System caches, shared with all other packages, are never installed - each is updated, with
+    # its tool (command, directory), after files are installed in its directory (not in DESTDIR)
+    config.SYSTEM_CACHE_UPDATES = [(['update-desktop-database', '-q'], '/usr/share/applications'),
+                                   (['gtk-update-icon-cache', '-q', '-t', '-f'],
+                                    '/usr/share/icons/hicolor')]
+    config.OVERLAY_LARGE_X_SCALE = '0.70'
+    config.OVERLAY_LARGE_Y_SCALE = '0.66'
+    config.OVERLAY_MEDIUM_X_SCALE = '0.48'
+    config.OVERLAY_MEDIUM_Y_SCALE = '0.44'
+
+    # Global Wine Logo Overlay icon
+    config.WINE_LOGO_DIRECTORY = "dlls/user32/resources/"
+    config.WINE_SVG_LOGO_FILENAME = "oic_winlogo.svg"
+    config.WINE_ICON_LOGO_FILENAME = "oic_winlogo.ico"
+
+    # Application icons
+    config.SVG_APPS_TARGET_RELPATH = os.path.join(config.SVG_TARGET_RELPATH, 'apps/')
+    config.APP_SVG_FILES = {'notepad.svg':{'srpath':'programs/notepad/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'taskmgr.svg':{'srpath':'programs/taskmgr/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'regedit.svg':{'srpath':'programs/regedit/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'msiexec.svg':{'srpath':'programs/msiexec/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            config.WINE_SVG_LOGO_FILENAME:{
+                         'srpath':config.WINE_LOGO_DIRECTORY,
+                         'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'winecfg.svg':{'srpath':'programs/winecfg/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'winefile.svg':{'srpath':'programs/winefile/',
+                                            'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'winemine.svg':{'srpath':'programs/winemine/',
+                                            'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'wcmd.svg':{'srpath':'programs/cmd/',
+                                        'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'iexplore.svg':{'srpath':'programs/iexplore/',
+                                            'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'winhelp.svg':{'srpath':'programs/winhlp32/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH},
+                            'wordpad.svg':{'srpath':'programs/wordpad/',
+                                           'trpath':config.SVG_APPS_TARGET_RELPATH}
+                           }
+
+    # Place icons
+    config.SVG_PLACES_TARGET_RELPATH = os.path.join(config.SVG_TARGET_RELPATH, 'places/')
+    config.PLACES_SVG_FILES = {'document.svg':{'srpath':'dlls/shell32/',
+                                               'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'mydocs.svg':{'srpath':'dlls/shell32/',
+                                             'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'desktop.svg':{'srpath':'dlls/shell32/',
+                                              'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'printer.svg':{'srpath':'dlls/shell32/',
+                                              'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'drive.svg':{'srpath':'dlls/shell32/',
+                                            'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'control.svg':{'srpath':'dlls/shell32/',
+                                              'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'cdrom.svg':{'srpath':'dlls/shell32/',
+                                            'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'netdrive.svg':{'srpath':'dlls/shell32/',
+                                               'trpath':config.SVG_PLACES_TARGET_RELPATH},
+                               'mycomputer.svg':{'srpath':'dlls/shell32/',
+                                                 'trpath':config.SVG_PLACES_TARGET_RELPATH}
+                              }
+
+    # Global icon id names
+    config.LARGE_SVG_ICON_ID = 'icon:large-scaleable'
+    config.MEDIUM_SVG_ICON_ID = 'icon:medium-scaleable'
+    config.SMALL_SVG_ICON_ID = 'icon:small-scaleable'
+
+    # Global SVG namespaces
+    config.XMLNS = {'dc_uri':'http://purl.org/dc/elements/1.1/',
+                    'cc':'http://creativecommons.org/ns#',
+                    'rdf':'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+                    'xlink':'http://www.w3.org/1999/xlink',
+                    'sodipodi':'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
+                    'inkscape':'http://www.inkscape.org/namespaces/inkscape',
+                    'svg':'http://www.w3.org/2000/svg'}
+
+    # Main Directories
+    config.SUBDIRECTORIES = ["applications", "desktop-directories", "icons", "xdg"]
+
+
+def init_vendor(vendor_id, prefix, config=None):
+    """ Define all vendor specific global variables for build_tool.py script - or, if
+        specified, build configuration attributes: the Wine menu categories (with a prefix)
+        and the desktop launcher files (for a vendor id). """
+    if config is None:
+        config = sys.modules[__name__]
 
     # Categories
-    WINE_CATEGORIES = {"wine":"Wine",
-                       "programs":"Wine-Programs",
-                       "accessories":"Wine-Programs-Accessories"}
-    GENERAL_CATEGORIES = {"game":"Game", "logic-game":"LogicGame"}
+    wine_categories = {"wine":prefix+"Wine",
+                       "programs":prefix+"Wine-Programs",
+                       "accessories":prefix+"Wine-Programs-Accessories"}
+    general_categories = {"game":"Game", "logic-game":"LogicGame"}
 
     # Desktop launcher files
-    TYPE = "Application"
-    DESKTOP_FILE_DICT = {
-        VENDOR_ID+"browsecdrive":{"Name":'Wine C: disk-drive',
+    entry_type = "Application"
+    desktop_file_dict = {
+        vendor_id+"browsecdrive":{"Name":'Wine C: disk-drive',
                                   "Comment":'Browse your virtual C: disk-drive',
                                   "Exec":'sh -c "xdg-open $(winepath -u \'C:\' 2>/dev/null)"',
-                                  "Icon":'wine-drive',
+                                  "Icon":vendor_id+'-drive',
                                   "Terminal":"false",
-                                  "Type":TYPE,
-                                  "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"cmd":{"Name":'Wine Command interpreter',
+                                  "Type":entry_type,
+                                  "Categories":[wine_categories["wine"]]},
+        vendor_id+"cmd":{"Name":'Wine Command interpreter',
                          "Comment":'Starts a new instance of the command interpreter CMD',
-                         "Type":TYPE,
+                         "Type":entry_type,
                          "Exec":'wine cmd.exe',
-                         "Icon":'wine-wcmd',
+                         "Icon":vendor_id+'-wcmd',
                          "Hidden":'true',
                          "StartupWMClass":'cmd.exe',
-                         "Categories":[WINE_CATEGORIES["wine"],
-                                       WINE_CATEGORIES["accessories"]]},
-        VENDOR_ID+"control":{"Name":'Wine Control',
+                         "Categories":[wine_categories["wine"],
+                                       wine_categories["accessories"]]},
+        vendor_id+"control":{"Name":'Wine Control',
                              "Comment":'A clone of the Microsoft® Windows Control Panel',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'wine control.exe',
-                             "Icon":'wine-control',
+                             "Icon":vendor_id+'-control',
                              "Terminal":'false',
                              "StartupWMClass":'control.exe',
-                             "Categories":[WINE_CATEGORIES["wine"],
-                                           WINE_CATEGORIES["accessories"]]},
-        VENDOR_ID+"explorer":{"Name":'Wine Explorer',
+                             "Categories":[wine_categories["wine"],
+                                           wine_categories["accessories"]]},
+        vendor_id+"explorer":{"Name":'Wine Explorer',
                               "Comment":'A clone of Microsoft® Windows Explorer',
-                              "Type":TYPE,
+                              "Type":entry_type,
                               "Exec":'wine explorer.exe',
-                              "Icon":'wine-winefile',
+                              "Icon":vendor_id+'-winefile',
                               "Terminal":'false',
                               "StartupWMClass":'explorer.exe',
-                              "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"iexplore":{"Name":'Wine Internet Explorer',
+                              "Categories":[wine_categories["wine"]]},
+        vendor_id+"iexplore":{"Name":'Wine Internet Explorer',
                               "Comment":('Builtin clone of '
                                          'Microsoft® Windows Internet Explorer®'),
-                              "Type":TYPE,
+                              "Type":entry_type,
                               "Exec":'wine iexplore.exe %U',
-                              "Icon":'wine-iexplore',
+                              "Icon":vendor_id+'-iexplore',
                               "Terminal":'false',
                               "StartupWMClass":'iexplore.exe',
-                              "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"notepad":{"Name":'Wine Notepad',
+                              "Categories":[wine_categories["wine"]]},
+        vendor_id+"notepad":{"Name":'Wine Notepad',
                              "Comment":'A clone of the Microsoft® Windows Notepad Text Editor',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'notepad %f',
-                             "Icon":'wine-notepad',
+                             "Icon":vendor_id+'-notepad',
                              "Terminal":'false',
                              "StartupWMClass":'notepad.exe',
-                             "Categories":[WINE_CATEGORIES["wine"],
-                                           WINE_CATEGORIES["accessories"]]},
-        VENDOR_ID+"oleview":{"Name":'Wine OLE/COM Object Viewer',
+                             "Categories":[wine_categories["wine"],
+                                           wine_categories["accessories"]]},
+        vendor_id+"oleview":{"Name":'Wine OLE/COM Object Viewer',
                              "Comment":('Microsoft® Windows Object Linking and '
                                         'Embedding/Component Object Model Object Viewer'),
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'wine oleview.exe',
-                             "Icon":'wine-control',
+                             "Icon":vendor_id+'-control',
                              "Terminal":'false',
                              "StartupWMClass":'oleview.exe',
-                             "Categories":[WINE_CATEGORIES["wine"],
-                                           WINE_CATEGORIES["accessories"]]},
-        VENDOR_ID+"regedit":{"Name":'Wine Registry Editor',
+                             "Categories":[wine_categories["wine"],
+                                           wine_categories["accessories"]]},
+        vendor_id+"regedit":{"Name":'Wine Registry Editor',
                              "Comment":'A clone of the Microsoft® Windows Registry Editor',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'regedit',
-                             "Icon":'wine-regedit',
+                             "Icon":vendor_id+'-regedit',
                              "Terminal":'false',
                              "StartupWMClass":'regedit.exe',
-                             "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"taskmgr":{"Name":'Wine Task Manager',
+                             "Categories":[wine_categories["wine"]]},
+        vendor_id+"taskmgr":{"Name":'Wine Task Manager',
                              "Comment":'A clone of the Microsoft® Windows Task Manager',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'wine taskmgr.exe',
-                             "Icon":'wine-taskmgr',
+                             "Icon":vendor_id+'-taskmgr',
                              "Terminal":'false',
                              "StartupWMClass":'taskmgr.exe',
-                             "Categories":[WINE_CATEGORIES["wine"],
-                                           WINE_CATEGORIES["accessories"]]},
-        VENDOR_ID+"uninstaller":{"Name":'Wine Software uninstaller',
+                             "Categories":[wine_categories["wine"],
+                                           wine_categories["accessories"]]},
+        vendor_id+"uninstaller":{"Name":'Wine Software uninstaller',
                                  "Comment":('A clone of the Microsoft® Windows '
                                             'Add and Remove Programs Utility'),
-                                 "Type":TYPE,
+                                 "Type":entry_type,
                                  "Exec":'wine uninstaller.exe',
-                                 "Icon":'wine-control',
+                                 "Icon":vendor_id+'-control',
                                  "Terminal":'false',
                                  "StartupWMClass":'uninstaller.exe',
-                                 "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"boot":{"Name":'Wine System-Boot',
+                                 "Categories":[wine_categories["wine"]]},
+        vendor_id+"boot":{"Name":'Wine System-Boot',
                           "Comment":'Simulate System-reboot / System-halt',
-                          "Type":TYPE,
+                          "Type":entry_type,
                           "Exec":'wineboot',
-                          "Icon":'wine-mycomputer',
+                          "Icon":vendor_id+'-mycomputer',
                           "Terminal":'false',
                           "StartupWMClass":'wineboot.exe',
-                          "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"cfg":{"Name":'Wine Configuration',
+                          "Categories":[wine_categories["wine"]]},
+        vendor_id+"cfg":{"Name":'Wine Configuration',
                          "Comment":('Change general Wine options '
                                     'and application overrides/options'),
-                         "Type":TYPE,
+                         "Type":entry_type,
                          "Exec":'winecfg',
-                         "Icon":'wine-winecfg',
+                         "Icon":vendor_id+'-winecfg',
                          "Terminal":'false',
                          "StartupWMClass":'winecfg.exe',
-                         "Categories":[WINE_CATEGORIES["wine"],
-                                       WINE_CATEGORIES["accessories"]]},
-        VENDOR_ID+"file":{"Name":'Wine File Browser',
+                         "Categories":[wine_categories["wine"],
+                                       wine_categories["accessories"]]},
+        vendor_id+"file":{"Name":'Wine File Browser',
                           "Comment":'A clone of Microsoft® Windows Explorer',
-                          "Type":TYPE,
+                          "Type":entry_type,
                           "Exec":'winefile',
-                          "Icon":'wine-winefile',
+                          "Icon":vendor_id+'-winefile',
                           "StartupWMClass":'winefile.exe',
                           "Terminal":'false',
-                          "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"mine":{"Name":'Wine Minesweeper',
+                          "Categories":[wine_categories["wine"]]},
+        vendor_id+"mine":{"Name":'Wine Minesweeper',
                           "Comment":'A clone of the Microsoft® Windows Minesweeper game',
-                          "Type":TYPE,
+                          "Type":entry_type,
                           "Exec":'winemine',
-                          "Icon":'wine-winemine',
+                          "Icon":vendor_id+'-winemine',
                           "Terminal":'false',
                           "StartupWMClass":'winemine.exe',
-                          "Categories":[WINE_CATEGORIES["wine"],
-                                        GENERAL_CATEGORIES["game"],
-                                        GENERAL_CATEGORIES["logic-game"]]},
-        VENDOR_ID+"winhelp":{"Name":'Wine Help',
+                          "Categories":[wine_categories["wine"],
+                                        general_categories["game"],
+                                        general_categories["logic-game"]]},
+        vendor_id+"winhelp":{"Name":'Wine Help',
                              "Comment":'A clone of the Microsoft® Windows Help File browser',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'wine winhlp32.exe %f',
-                             "Icon":'wine-winhelp',
+                             "Icon":vendor_id+'-winhelp',
                              "Terminal":'false',
                              "StartupWMClass":'winhlp32.exe',
-                             "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"wordpad":{"Name":'Wine Wordpad',
+                             "Categories":[wine_categories["wine"]]},
+        vendor_id+"wordpad":{"Name":'Wine Wordpad',
                              "Comment":'A clone of the Microsoft® Windows Wordpad Text Editor',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'wine wordpad %f',
-                             "Icon":'wine-wordpad',
+                             "Icon":vendor_id+'-wordpad',
                              "Terminal":'false',
                              "StartupWMClass":'wordpad.exe',
-                             "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"msiexec":{"Name":'Wine clone of Microsoft® Installer',
+                             "Categories":[wine_categories["wine"]]},
+        vendor_id+"msiexec":{"Name":'Wine clone of Microsoft® Installer',
                              "Comment":'Wine installer utility for MSI packages',
-                             "Type":TYPE,
+                             "Type":entry_type,
                              "Exec":'wine msiexec /i %f',
                              "NoDisplay":'true',
-                             "Icon":'wine-msiexec',
+                             "Icon":vendor_id+'-msiexec',
                              "Terminal":'false',
                              "StartupWMClass":'msiexec.exe',
-                             "Categories":[WINE_CATEGORIES["wine"]]},
-        VENDOR_ID+"-mime-msi":{"Name":'Microsoft® Windows Installer File',
-                               "Type":TYPE,
+                             "Categories":[wine_categories["wine"]]},
+        vendor_id+"-mime-msi":{"Name":'Microsoft® Windows Installer File',
+                               "Type":entry_type,
                                "Exec":'wine %f',
                                "Hidden":'true',
                                "MimeType":["application/x-ole-storage", "text/mspg-legacyinfo"],
                                "Terminal":'false',
-                               "Categories":[WINE_CATEGORIES["wine"]]}
+                               "Categories":[wine_categories["wine"]]}
     }
 
-    # Desktop directory files
-    WINE_DESKTOP_FILES = ["Wine", "Wine-Programs", "Wine-Programs-Accessories"]
+    config.VENDOR_ID = vendor_id
+    config.VENDOR_PREFIX = prefix
+    config.WINE_CATEGORIES = wine_categories
+    config.GENERAL_CATEGORIES = general_categories
+    config.TYPE = entry_type
+    config.DESKTOP_FILE_DICT = desktop_file_dict
 
-    # Icon File Constants
-    NEW_INKSCAPE_VERSION = "0.92"
-    NEW_ICON_SIZE = 64
-    ICONS_TARGET_RELPATH = "icons/"
-    SVG_TARGET_RELPATH = os.path.join(ICONS_TARGET_RELPATH, "hicolor/scalable/")
-    OVERLAY_LARGE_X_SCALE = '0.70'
-    OVERLAY_LARGE_Y_SCALE = '0.66'
-    OVERLAY_MEDIUM_X_SCALE = '0.48'
-    OVERLAY_MEDIUM_Y_SCALE = '0.44'
 
-    # Global Wine Logo Overlay icon
-    WINE_LOGO_DIRECTORY = "dlls/user32/resources/"
-    WINE_SVG_LOGO_FILENAME = "oic_winlogo.svg"
-    WINE_ICON_LOGO_FILENAME = "oic_winlogo.ico"
+class BuildConfig:
+    """ A build configuration: all the global variables for build_tool.py script, with their
+        default values, for a single build. Any number of configurations can be kept in one
+        process - but builds cannot run concurrently: a build uses its configuration, while it
+        runs, as the global variables (then saves these back to the configuration). """
+    # pylint: disable=too-few-public-methods
 
-    # Application icons
-    SVG_APPS_TARGET_RELPATH = os.path.join(SVG_TARGET_RELPATH, 'apps/')
-    APP_SVG_FILES = {'notepad.svg':{'srpath':'programs/notepad/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH},
-                     'taskmgr.svg':{'srpath':'programs/taskmgr/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH},
-                     'regedit.svg':{'srpath':'programs/regedit/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH},
-                     'msiexec.svg':{'srpath':'programs/msiexec/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH},
-                     WINE_SVG_LOGO_FILENAME:{
-                         'srpath':WINE_LOGO_DIRECTORY,
-                         'trpath':SVG_APPS_TARGET_RELPATH},
-                     'winecfg.svg':{'srpath':'programs/winecfg/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH},
-                     'winefile.svg':{'srpath':'programs/winefile/',
-                                     'trpath':SVG_APPS_TARGET_RELPATH},
-                     'winemine.svg':{'srpath':'programs/winemine/',
-                                     'trpath':SVG_APPS_TARGET_RELPATH},
-                     'wcmd.svg':{'srpath':'programs/cmd/',
-                                 'trpath':SVG_APPS_TARGET_RELPATH},
-                     'iexplore.svg':{'srpath':'programs/iexplore/',
-                                     'trpath':SVG_APPS_TARGET_RELPATH},
-                     'winhelp.svg':{'srpath':'programs/winhlp32/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH},
-                     'wordpad.svg':{'srpath':'programs/wordpad/',
-                                    'trpath':SVG_APPS_TARGET_RELPATH}
-                    }
+    def __init__(self):
+        init(self)
 
-    # Place icons
-    SVG_PLACES_TARGET_RELPATH = os.path.join(SVG_TARGET_RELPATH, 'places/')
-    PLACES_SVG_FILES = {'document.svg':{'srpath':'dlls/shell32/',
-                                        'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'mydocs.svg':{'srpath':'dlls/shell32/',
-                                      'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'desktop.svg':{'srpath':'dlls/shell32/',
-                                       'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'printer.svg':{'srpath':'dlls/shell32/',
-                                       'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'drive.svg':{'srpath':'dlls/shell32/',
-                                     'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'control.svg':{'srpath':'dlls/shell32/',
-                                       'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'cdrom.svg':{'srpath':'dlls/shell32/',
-                                     'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'netdrive.svg':{'srpath':'dlls/shell32/',
-                                        'trpath':SVG_PLACES_TARGET_RELPATH},
-                        'mycomputer.svg':{'srpath':'dlls/shell32/',
-                                          'trpath':SVG_PLACES_TARGET_RELPATH}
-                       }
 
-    # Global icon id names
-    LARGE_SVG_ICON_ID = 'icon:large-scaleable'
-    MEDIUM_SVG_ICON_ID = 'icon:medium-scaleable'
-    SMALL_SVG_ICON_ID = 'icon:small-scaleable'
+def use_config(config):
+    """ Use a build configuration as the global variables for build_tool.py script. """
+    globals().update(vars(config))
 
-    # Global SVG namespaces
-    XMLNS = {'dc_uri':'http://purl.org/dc/elements/1.1/',
-             'cc':'http://creativecommons.org/ns#',
-             'rdf':'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
-             'xlink':'http://www.w3.org/1999/xlink',
-             'sodipodi':'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
-             'inkscape':'http://www.inkscape.org/namespaces/inkscape',
-             'svg':'http://www.w3.org/2000/svg'}
 
-    # Main Directories
-    SUBDIRECTORIES = ["applications", "desktop-directories", "icons", "xdg"]
+def save_config(config):
+    """ Save the global variables, as a build left these (e.g. for its last vendor variant),
+        to the build configuration it used. """
+    for name in vars(config):
+        setattr(config, name, globals()[name])
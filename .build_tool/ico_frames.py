@@ -0,0 +1,142 @@
+#!/usr/bin/env python3.6
+
+""" Windows icon (.ico) frame extraction for build_tool.py script: PNG frames are passed
+    through, BMP (DIB) frames are converted to 8 bit RGBA PNG images - in pure Python. """
+
+import struct
+from svg_bitmaps import PNG_SIGNATURE, encode_png, get_png_size
+
+ICO_HEADER_SIZE = 6
+ICO_ENTRY_SIZE = 16
+BMP_INFO_HEADER_SIZE = 40
+BMP_BI_RGB = 0
+
+
+def read_ico_frames(ico_data):
+    """ Split Windows icon data into a list of (bit count, frame data) tuples. """
+    if len(ico_data) < ICO_HEADER_SIZE:
+        raise ValueError('Truncated icon header')
+    reserved, image_type, frame_count = struct.unpack('<HHH', ico_data[:ICO_HEADER_SIZE])
+    if reserved != 0 or image_type != 1:
+        raise ValueError('Not a Windows icon: invalid header')
+    frame_list = []
+    for index in range(frame_count):
+        position = ICO_HEADER_SIZE+index*ICO_ENTRY_SIZE
+        if position+ICO_ENTRY_SIZE > len(ico_data):
+            raise ValueError('Truncated icon directory')
+        _, _, _, _, _, bit_count, size, offset = struct.unpack(
+            '<BBBBHHII', ico_data[position:position+ICO_ENTRY_SIZE])
+        if offset+size > len(ico_data):
+            raise ValueError(f'Truncated icon frame: {index}')
+        frame_list += [(bit_count, ico_data[offset:offset+size])]
+    return frame_list
+
+
+def get_bmp_palette(frame_data, bit_count, color_count):
+    """ Get the (RGBA) palette of a BMP frame - with 2^bit count entries by default. """
+    color_count = color_count or 1 << bit_count
+    palette_data = frame_data[BMP_INFO_HEADER_SIZE:BMP_INFO_HEADER_SIZE+color_count*4]
+    if len(palette_data) != color_count*4:
+        raise ValueError('Truncated BMP frame palette')
+    return [bytes((palette_data[index+2], palette_data[index+1], palette_data[index], 255))
+            for index in range(0, len(palette_data), 4)]
+
+
+def get_bmp_pixels(row_data, width, bit_count, palette):
+    """ Get the RGBA pixels (as a list of 4 byte values) of a BMP scanline. """
+    if bit_count == 32:
+        return [bytes((row_data[index+2], row_data[index+1], row_data[index], row_data[index+3]))
+                for index in range(0, width*4, 4)]
+    if bit_count == 24:
+        return [bytes((row_data[index+2], row_data[index+1], row_data[index], 255))
+                for index in range(0, width*3, 3)]
+    if bit_count == 16:
+        pixel_list = []
+        for index in range(0, width*2, 2):
+            value = row_data[index] | row_data[index+1] << 8
+            pixel_list += [bytes((((value >> 10) & 0x1f)*255//31,
+                                  ((value >> 5) & 0x1f)*255//31,
+                                  (value & 0x1f)*255//31,
+                                  255))]
+        return pixel_list
+    pixel_mask = (1 << bit_count)-1
+    pixel_list = []
+    for index in range(width):
+        bit_offset = index*bit_count
+        value = (row_data[bit_offset >> 3] >> (8-bit_count-(bit_offset & 7))) & pixel_mask
+        if value >= len(palette):
+            raise ValueError('Invalid BMP frame palette index')
+        pixel_list += [palette[value]]
+    return pixel_list
+
+
+def read_bmp_header(frame_data):
+    """ Read the header of a BMP (DIB) icon frame - the height is of the XOR bitmap, half the
+        height in the header (which includes the AND mask). Returns the (width, height, bit
+        count, palette color count) tuple. """
+    if len(frame_data) < BMP_INFO_HEADER_SIZE:
+        raise ValueError('Truncated BMP frame header')
+    (header_size, width, double_height, _, bit_count, compression, _, _, _, color_count,
+     _) = struct.unpack('<IiiHHIIiiII', frame_data[:BMP_INFO_HEADER_SIZE])
+    height = double_height//2
+    if header_size != BMP_INFO_HEADER_SIZE or width <= 0 or height <= 0:
+        raise ValueError('Unsupported BMP frame header')
+    if compression != BMP_BI_RGB or bit_count not in [1, 4, 8, 16, 24, 32]:
+        raise ValueError(f'Unsupported BMP frame: {bit_count} bits, compression {compression}')
+    return width, height, bit_count, color_count
+
+
+def apply_bmp_mask(row_list, mask_data, width):
+    """ Set the transparency of all RGBA pixels, of a list of rows (top-down), from the AND
+        mask of a BMP frame (stored bottom-up). """
+    and_row_size = ((width+31)//32)*4
+    for row_index, row in enumerate(row_list):
+        mask_position = (len(row_list)-1-row_index)*and_row_size
+        for index in range(width):
+            if mask_data[mask_position+(index >> 3)] & (0x80 >> (index & 7)):
+                row[index] = bytes(4)
+            else:
+                row[index] = row[index][:3]+b'\xff'
+
+
+def convert_bmp_frame(frame_data):
+    """ Convert a BMP (DIB) icon frame - with the XOR bitmap and AND transparency mask
+        stored bottom-up - to an RGBA PNG image. A 32 bit frame, with no alpha values set,
+        uses the AND mask for transparency. """
+    width, height, bit_count, color_count = read_bmp_header(frame_data)
+    palette = []
+    position = BMP_INFO_HEADER_SIZE
+    if bit_count <= 8:
+        palette = get_bmp_palette(frame_data, bit_count, color_count)
+        position += len(palette)*4
+    xor_row_size = ((width*bit_count+31)//32)*4
+    and_position = position+xor_row_size*height
+    if len(frame_data) < and_position:
+        raise ValueError('Truncated BMP frame bitmap')
+    row_list = [get_bmp_pixels(frame_data[position+row*xor_row_size:
+                                          position+(row+1)*xor_row_size],
+                               width, bit_count, palette)
+                for row in reversed(range(height))]
+    use_mask = bit_count < 32 or not any(pixel[3] for row in row_list for pixel in row)
+    if use_mask and len(frame_data) >= and_position+((width+31)//32)*4*height:
+        apply_bmp_mask(row_list, frame_data[and_position:], width)
+    return encode_png(width, height, [b''.join(row) for row in row_list])
+
+
+def get_ico_png_frames(ico_data):
+    """ Get the PNG image of each square frame, of Windows icon data, by size - selecting the
+        frame with the highest bit count (then the first) for each size. Returns a
+        {size: PNG data} dictionary. """
+    png_frame_dict = {}
+    bit_count_dict = {}
+    for bit_count, frame_data in read_ico_frames(ico_data):
+        if frame_data.startswith(PNG_SIGNATURE):
+            png_data = frame_data
+        else:
+            png_data = convert_bmp_frame(frame_data)
+        width, height = get_png_size(png_data)
+        if width != height or bit_count_dict.get(width, -1) >= bit_count:
+            continue
+        png_frame_dict[width] = png_data
+        bit_count_dict[width] = bit_count
+    return png_frame_dict
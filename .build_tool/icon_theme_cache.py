@@ -0,0 +1,233 @@
+#!/usr/bin/env python3.6
+
+""" GTK icon theme cache (icon-theme.cache) support for build_tool.py script: writing the
+    binary cache (version 1.0, all values big-endian), as gtk-update-icon-cache does, for a
+    list of icon files - reading it back and scanning an icon theme directory, to verify it. """
+
+import os
+import struct
+
+ICON_CACHE_MAJOR_VERSION = 1
+ICON_CACHE_MINOR_VERSION = 0
+ICON_CACHE_NO_OFFSET = 0xffffffff
+# Icon flags, by file suffix
+ICON_CACHE_SUFFIX_FLAGS = {'.xpm':1, '.svg':2, '.png':4}
+ICON_CACHE_HAS_ICON_FILE = 8
+# Hash table sizes - as the GLib g_spaced_primes_closest() function
+ICON_CACHE_SPACED_PRIMES = [11, 19, 37, 73, 109, 163, 251, 367, 557, 823, 1237, 1861, 2777,
+                            4177, 6247, 9371, 14057, 21089, 31627, 47431, 71143, 106721,
+                            160073, 240101, 360163, 540217, 810343, 1215497, 1823231]
+
+
+def get_icon_name_hash(icon_name):
+    """ GTK icon name hash - of the (signed) bytes of the UTF-8 icon name. """
+    icon_hash = 0
+    for index, value in enumerate(icon_name.encode('utf-8')):
+        if value >= 128:
+            value -= 256
+        if index == 0:
+            icon_hash = value & 0xffffffff
+        else:
+            icon_hash = ((icon_hash << 5)-icon_hash+value) & 0xffffffff
+    return icon_hash
+
+
+def get_bucket_count(icon_count):
+    """ Get the hash table size, for a number of icons. """
+    for prime in ICON_CACHE_SPACED_PRIMES:
+        if prime > icon_count:
+            return prime
+    return ICON_CACHE_SPACED_PRIMES[-1]
+
+
+def get_icon_dict(icon_path_list):
+    """ Get the {icon name: {directory: flags}} dictionary, for a list of icon file paths
+        (relative to the icon theme directory). Files with other suffixes are skipped. """
+    icon_dict = {}
+    for icon_path in icon_path_list:
+        directory, icon_file = os.path.split(icon_path.replace(os.sep, '/'))
+        icon_name, suffix = os.path.splitext(icon_file)
+        if suffix == '.icon':
+            flags = ICON_CACHE_HAS_ICON_FILE
+        elif suffix in ICON_CACHE_SUFFIX_FLAGS:
+            flags = ICON_CACHE_SUFFIX_FLAGS[suffix]
+        else:
+            continue
+        if not directory:
+            continue
+        icon_dict.setdefault(icon_name, {})
+        icon_dict[icon_name][directory] = icon_dict[icon_name].get(directory, 0) | flags
+    return icon_dict
+
+
+def scan_icon_theme(theme_directory):
+    """ Get the {icon name: {directory: flags}} dictionary, for all icon files in the
+        subdirectories of an icon theme directory. """
+    icon_path_list = []
+    for directory, _, file_list in os.walk(theme_directory):
+        icon_path_list += [os.path.relpath(os.path.join(directory, icon_file), theme_directory)
+                           for icon_file in file_list]
+    return get_icon_dict(icon_path_list)
+
+
+class IconThemeCacheWriter:
+    """ Lay out the binary icon theme cache: header, directory list, hash table, icon chains
+        and image lists - then all strings. All offsets are from the start of the cache, and
+        are 4 byte aligned. """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.string_dict = {}
+        self.string_offset_list = []
+
+    def reserve(self, size):
+        """ Reserve space, for a block of 32 bit values, returning its offset. """
+        offset = len(self.data)
+        self.data += bytes(size)
+        return offset
+
+    def set_uint32(self, offset, value):
+        """ Set a 32 bit value at an offset. """
+        struct.pack_into('>I', self.data, offset, value)
+
+    def set_string(self, offset, text):
+        """ Set a 32 bit value, at an offset, to the offset of a string - written (once) when
+            the cache is complete. """
+        self.string_offset_list += [(offset, text)]
+
+    def get_cache(self):
+        """ Write all strings (NUL terminated, 4 byte aligned) and return the cache. """
+        for offset, text in self.string_offset_list:
+            if text not in self.string_dict:
+                self.string_dict[text] = len(self.data)
+                string_data = text.encode('utf-8')+b'\0'
+                self.data += string_data+bytes(-len(string_data) % 4)
+            self.set_uint32(offset, self.string_dict[text])
+        return bytes(self.data)
+
+
+def write_icon(writer, icon_name, directory_dict, directory_index_dict):
+    """ Write an icon - its (unchained) hash chain entry, its name and its image list, in
+        directory order. No image data is included. Returns the offset of the icon. """
+    icon_offset = writer.reserve(12)
+    writer.set_uint32(icon_offset, ICON_CACHE_NO_OFFSET)
+    writer.set_string(icon_offset+4, icon_name)
+    image_list_offset = writer.reserve(4+8*len(directory_dict))
+    writer.set_uint32(icon_offset+8, image_list_offset)
+    writer.set_uint32(image_list_offset, len(directory_dict))
+    for index, directory in enumerate(sorted(directory_dict, key=directory_index_dict.get)):
+        struct.pack_into('>HHI', writer.data, image_list_offset+4+8*index,
+                         directory_index_dict[directory], directory_dict[directory], 0)
+    return icon_offset
+
+
+def write_hash_table(writer, icon_dict, directory_index_dict):
+    """ Write the hash table - and all icons, chained within each hash bucket in sorted order.
+        Returns the offset of the hash table. """
+    bucket_count = get_bucket_count(len(icon_dict))
+    hash_offset = writer.reserve(4+4*bucket_count)
+    writer.set_uint32(hash_offset, bucket_count)
+    bucket_list = [[] for _ in range(bucket_count)]
+    for icon_name in sorted(icon_dict):
+        bucket_list[get_icon_name_hash(icon_name) % bucket_count] += [icon_name]
+    for bucket_index, bucket in enumerate(bucket_list):
+        chain_offset = hash_offset+4+4*bucket_index
+        writer.set_uint32(chain_offset, ICON_CACHE_NO_OFFSET)
+        for icon_name in bucket:
+            icon_offset = write_icon(writer, icon_name, icon_dict[icon_name],
+                                     directory_index_dict)
+            writer.set_uint32(chain_offset, icon_offset)
+            chain_offset = icon_offset
+    return hash_offset
+
+
+def create_icon_theme_cache(icon_dict):
+    """ Create the binary icon theme cache, for a {icon name: {directory: flags}} dictionary.
+        Directories are listed, and icons chained within each hash bucket, in sorted order.
+        No image data is included. """
+    writer = IconThemeCacheWriter()
+    directory_list = sorted({directory for directory_dict in icon_dict.values()
+                             for directory in directory_dict})
+    directory_index_dict = {directory:index for index, directory in enumerate(directory_list)}
+    writer.reserve(12)
+    struct.pack_into('>HH', writer.data, 0, ICON_CACHE_MAJOR_VERSION, ICON_CACHE_MINOR_VERSION)
+    writer.set_uint32(4, write_hash_table(writer, icon_dict, directory_index_dict))
+    directory_list_offset = writer.reserve(4+4*len(directory_list))
+    writer.set_uint32(8, directory_list_offset)
+    writer.set_uint32(directory_list_offset, len(directory_list))
+    for index, directory in enumerate(directory_list):
+        writer.set_string(directory_list_offset+4+4*index, directory)
+    return writer.get_cache()
+
+
+class IconThemeCacheReader:
+    """ Read the binary icon theme cache - checking every offset, and string, read: an invalid
+        cache raises ValueError. """
+
+    def __init__(self, cache_data):
+        self.data = cache_data
+
+    def get_uint32(self, offset):
+        """ Get the (4 byte aligned) 32 bit value at an offset. """
+        if offset+4 > len(self.data) or offset % 4:
+            raise ValueError(f'Invalid icon theme cache offset: {offset}')
+        return struct.unpack_from('>I', self.data, offset)[0]
+
+    def get_string(self, offset):
+        """ Get the (NUL terminated) string at an offset. """
+        end_offset = self.data.find(b'\0', offset)
+        if offset >= len(self.data) or end_offset < 0:
+            raise ValueError(f'Invalid icon theme cache string offset: {offset}')
+        return self.data[offset:end_offset].decode('utf-8')
+
+    def read_directory_list(self):
+        """ Check the cache version, then read its directory list. """
+        if len(self.data) < 12:
+            raise ValueError('Truncated icon theme cache header')
+        major_version, minor_version = struct.unpack_from('>HH', self.data, 0)
+        if (major_version, minor_version) != (ICON_CACHE_MAJOR_VERSION,
+                                              ICON_CACHE_MINOR_VERSION):
+            raise ValueError(f'Unsupported icon theme cache version: {major_version}.'
+                             f'{minor_version}')
+        directory_list_offset = self.get_uint32(8)
+        return [self.get_string(self.get_uint32(directory_list_offset+4+4*index))
+                for index in range(self.get_uint32(directory_list_offset))]
+
+    def read_image_list(self, image_list_offset, directory_list, directory_dict):
+        """ Read the image list of an icon, into its {directory: flags} dictionary. """
+        for index in range(self.get_uint32(image_list_offset)):
+            self.get_uint32(image_list_offset+8+8*index)
+            directory_index, flags = struct.unpack_from('>HH', self.data,
+                                                        image_list_offset+4+8*index)
+            if directory_index >= len(directory_list):
+                raise ValueError('Invalid icon theme cache directory index')
+            directory_dict[directory_list[directory_index]] = flags
+
+    def read_bucket(self, hash_offset, bucket_index, directory_list, icon_dict):
+        """ Read the icons, chained in a hash bucket, into a {icon name: {directory: flags}}
+            dictionary. """
+        bucket_count = self.get_uint32(hash_offset)
+        icon_offset = self.get_uint32(hash_offset+4+4*bucket_index)
+        visited_set = set()
+        while icon_offset != ICON_CACHE_NO_OFFSET:
+            if icon_offset in visited_set:
+                raise ValueError('Invalid icon theme cache: looped hash chain')
+            visited_set.add(icon_offset)
+            icon_name = self.get_string(self.get_uint32(icon_offset+4))
+            if get_icon_name_hash(icon_name) % bucket_count != bucket_index:
+                raise ValueError(f'Invalid icon theme cache: {icon_name} in wrong bucket')
+            self.read_image_list(self.get_uint32(icon_offset+8), directory_list,
+                                 icon_dict.setdefault(icon_name, {}))
+            icon_offset = self.get_uint32(icon_offset)
+
+
+def read_icon_theme_cache(cache_data):
+    """ Read a binary icon theme cache, returning its {icon name: {directory: flags}}
+        dictionary. Raises ValueError for an invalid cache. """
+    reader = IconThemeCacheReader(cache_data)
+    directory_list = reader.read_directory_list()
+    hash_offset = reader.get_uint32(4)
+    icon_dict = {}
+    for bucket_index in range(reader.get_uint32(hash_offset)):
+        reader.read_bucket(hash_offset, bucket_index, directory_list, icon_dict)
+    return icon_dict
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3.6
+
+""" File installation for build_tool.py script: each file is installed atomically (a temporary
+    file, in the destination directory, with its mode set - then a rename). The content is
+    cloned (a reflink), copied in the kernel (copy_file_range) or copied - or the file is
+    hard linked, if requested. Files already installed with the same content are skipped. """
+
+import fcntl
+import os
+import shutil
+import subprocess
+
+from output_files import create_temporary_file, get_file_digest
+
+# Linux FICLONE ioctl - share all the data extents of a file (on Btrfs, XFS...)
+FICLONE = 0x40049409
+INSTALL_COPY_CHUNK_SIZE = 1024*1024
+INSTALL_METHODS = ['hardlink', 'reflink', 'copy_file_range', 'copy']
+
+
+def is_installed(path, size, sha256):
+    """ Check if a file is installed, with the specified size and SHA-256 checksum. """
+    try:
+        return os.path.getsize(path) == size and get_file_digest(path) == sha256
+    except OSError:
+        return False
+
+
+def clone_file(source_handle, target_handle):
+    """ Clone the content of a file (a reflink) - returns False if not supported. """
+    try:
+        fcntl.ioctl(target_handle.fileno(), FICLONE, source_handle.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def copy_file_range(source_handle, target_handle, size):
+    """ Copy the content of a file in the kernel - returns False if not supported. """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    offset = 0
+    while offset < size:
+        try:
+            count = os.copy_file_range(source_handle.fileno(), target_handle.fileno(),
+                                       size-offset)
+        except OSError:
+            if offset:
+                raise
+            return False
+        if not count:
+            break
+        offset += count
+    return offset == size
+
+
+def link_file(source_path, temporary_path, mode):
+    """ Replace a temporary file with a hard link to a file - returns False if the file has
+        another mode, or the link is not possible (e.g. across filesystems). """
+    if os.stat(source_path).st_mode & 0o7777 != mode:
+        return False
+    os.unlink(temporary_path)
+    try:
+        os.link(source_path, temporary_path)
+    except OSError:
+        with open(temporary_path, "wb"):
+            pass
+        os.chmod(temporary_path, mode)
+        return False
+    return True
+
+
+def install_file(source_path, path, mode, hardlink=False):
+    """ Atomically install a file, with the specified mode: hard linked (if requested, and
+        possible), cloned, copied in the kernel or copied. Returns the method used. """
+    temporary_path = create_temporary_file(path)
+    try:
+        os.chmod(temporary_path, mode)
+        if hardlink and link_file(source_path, temporary_path, mode):
+            method = 'hardlink'
+        else:
+            with open(source_path, "rb") as source_handle, \
+                    open(temporary_path, "wb") as target_handle:
+                if clone_file(source_handle, target_handle):
+                    method = 'reflink'
+                elif copy_file_range(source_handle, target_handle,
+                                     os.fstat(source_handle.fileno()).st_size):
+                    method = 'copy_file_range'
+                else:
+                    source_handle.seek(0)
+                    target_handle.seek(0)
+                    target_handle.truncate()
+                    shutil.copyfileobj(source_handle, target_handle, INSTALL_COPY_CHUNK_SIZE)
+                    method = 'copy'
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.lexists(temporary_path):
+            os.unlink(temporary_path)
+        raise
+    return method
+
+
+def update_system_cache(command, directory):
+    """ Update the system cache of a directory, files were installed in, with its tool (a
+        command, the directory is appended to) - skipped if the tool is not available.
+        Returns True if the cache was updated. """
+    if shutil.which(command[0]) is None:
+        print(f'{command[0]}: not found - the {directory} cache was not updated')
+        return False
+    try:
+        subprocess.run(command+[directory], check=True)
+    except (OSError, subprocess.CalledProcessError) as error:
+        raise SystemError(f'{command[0]}: {directory} cache update failed ({error})') from error
+    return True
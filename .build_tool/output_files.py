@@ -0,0 +1,134 @@
+#!/usr/bin/env python3.6
+
+""" Output file handling for build_tool.py script: files are replaced atomically (a temporary
+    file, in the same directory, then a rename) - and only when their content has changed, so
+    unchanged files keep their modification time. Generated data is held in memory (bytes),
+    or as an output file reference: a file already written - not read into memory. """
+
+import hashlib
+import os
+import shutil
+import uuid
+
+OUTPUT_CHUNK_SIZE = 1024*1024
+
+
+class OutputFile:
+    """ A generated file, already written, kept as a reference rather than in memory: the path
+        of the file (where its data is now), its size and its SHA-256 digest. A temporary file,
+        in the directory of its target path, is renamed in place - any other file is copied. """
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, path, size, digest, temporary=False):
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self.temporary = temporary
+
+
+def get_file_digest(path):
+    """ Get the SHA-256 digest of a file - read in chunks. """
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as file_handle:
+        for data in iter(lambda: file_handle.read(OUTPUT_CHUNK_SIZE), b''):
+            file_hash.update(data)
+    return file_hash.hexdigest()
+
+
+def create_output_file(path, temporary=False):
+    """ Create a reference to an existing (output) file. """
+    return OutputFile(path, os.path.getsize(path), get_file_digest(path), temporary)
+
+
+def get_output_size(data):
+    """ Get the size of generated data - or of an output file. """
+    if isinstance(data, OutputFile):
+        return data.size
+    return len(data)
+
+
+def read_output_data(data):
+    """ Get generated data, in memory - reading an output file. """
+    if not isinstance(data, OutputFile):
+        return data
+    with open(data.path, "rb") as file_handle:
+        return file_handle.read()
+
+
+def create_temporary_file(path):
+    """ Create a (hidden) temporary file, in the same directory as a target file path - with
+        the default file mode (0666, less the umask - applied as the file is created, so the
+        process umask is never changed). Returns the temporary file path. """
+    directory, filename = os.path.split(path)
+    os.makedirs(directory or '.', exist_ok=True)
+    while True:
+        temporary_path = os.path.join(directory, f'.{filename}.{uuid.uuid4().hex[:8]}.tmp')
+        try:
+            os.close(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+        except FileExistsError:
+            continue
+        return temporary_path
+
+
+def is_file_data(path, data):
+    """ Check if an existing file has exactly the specified content - or the content of an
+        output file. """
+    try:
+        if os.path.getsize(path) != get_output_size(data):
+            return False
+        if isinstance(data, OutputFile):
+            return os.path.samefile(path, data.path) or get_file_digest(path) == data.digest
+        with open(path, "rb") as file_handle:
+            return file_handle.read() == data
+    except OSError:
+        return False
+
+
+def write_file_if_changed(path, data):
+    """ Atomically write a file - unless it already has the specified content. An output file,
+        that is temporary, is renamed in place (or removed, if the file is unchanged) - any
+        other is copied. The output file then refers to the file written.
+        Returns True if the file changed. """
+    if is_file_data(path, data):
+        if isinstance(data, OutputFile):
+            if data.temporary:
+                os.unlink(data.path)
+            data.path, data.temporary = path, False
+        return False
+    if isinstance(data, OutputFile) and data.temporary:
+        os.replace(data.path, path)
+        data.path, data.temporary = path, False
+        return True
+    temporary_path = create_temporary_file(path)
+    try:
+        with open(temporary_path, "wb") as file_handle:
+            if isinstance(data, OutputFile):
+                with open(data.path, "rb") as source_handle:
+                    shutil.copyfileobj(source_handle, file_handle, OUTPUT_CHUNK_SIZE)
+            else:
+                file_handle.write(data)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+    if isinstance(data, OutputFile):
+        data.path = path
+    return True
+
+
+def remove_stale_files(root_directory, subdirectory_list, path_set):
+    """ Remove all files, in the subdirectories of a root directory, that are not in a set of
+        (absolute) output paths - then any directories left empty. Returns the number of
+        files removed. """
+    removed_count = 0
+    for subdirectory in subdirectory_list:
+        directory = os.path.join(root_directory, subdirectory)
+        for walk_directory, _, file_list in os.walk(directory, topdown=False):
+            for filename in file_list:
+                path = os.path.join(walk_directory, filename)
+                if path not in path_set:
+                    os.unlink(path)
+                    removed_count += 1
+            if walk_directory != directory and not os.listdir(walk_directory):
+                os.rmdir(walk_directory)
+    return removed_count
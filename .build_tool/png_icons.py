@@ -0,0 +1,95 @@
+#!/usr/bin/env python3.6
+
+""" Fixed size hicolor PNG icons for build_tool.py script: the embedded PNG icons of the
+    application icons, and the frames of the Wine (Windows) icon file. """
+
+import os
+import global_variables
+from ico_frames import get_ico_png_frames
+from svg_bitmaps import decode_png_data_uri, get_png_size
+from svg_stream import APPS_SVG_ICON_ID_REGEX
+
+
+def create_png_icons(png_icon_dict, target_png_file):
+    """ Create PNG icons, from a {size: PNG data} dictionary, in the hicolor fixed size
+        application icon directories - for all the supported icon sizes.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    output_dict = {}
+    for icon_size in sorted(png_icon_dict):
+        if icon_size not in global_variables.PNG_ICON_SIZES:
+            continue
+        target_directory = global_variables.PNG_APPS_TARGET_RELPATH.format(size=icon_size)
+        output_dict[os.path.join(target_directory, target_png_file)] = png_icon_dict[icon_size]
+    return output_dict
+
+
+def load_wine_ico_png_icons(wine_source_directory):
+    """ Get the PNG image of each frame, of the Wine (Windows) icon file, by size. """
+    source_path = os.path.join(wine_source_directory, global_variables.WINE_LOGO_DIRECTORY)
+    source_path = os.path.join(source_path, global_variables.WINE_ICON_LOGO_FILENAME)
+    with open(source_path, "rb") as file_handle:
+        return get_ico_png_frames(file_handle.read())
+
+
+def get_apps_png_icons(image_list):
+    """ Get the embedded PNG icons, of an application icon, from a list of (image id, href)
+        tuples - selecting the icon with the highest bit depth for each size. Icons that are
+        not square, or not sized as their id states, are skipped. Returns a
+        {size: PNG data} dictionary. """
+    png_icon_dict = {}
+    bit_depth_dict = {}
+    for image_id, href in image_list:
+        id_match = APPS_SVG_ICON_ID_REGEX.search(image_id or '')
+        png_data = decode_png_data_uri(href)
+        if id_match is None or png_data is None:
+            continue
+        icon_size, bit_depth = int(id_match.group(1)), int(id_match.group(2))
+        try:
+            if get_png_size(png_data) != (icon_size, icon_size):
+                continue
+        except ValueError:
+            continue
+        if bit_depth_dict.get(icon_size, -1) >= bit_depth:
+            continue
+        png_icon_dict[icon_size] = png_data
+        bit_depth_dict[icon_size] = bit_depth
+    return png_icon_dict
+
+
+def xml_apps_svg_get_images(xml_root):
+    """ Get the embedded PNG icons, of an application icon, as (image id, href) tuples. """
+    href_key = '{'+global_variables.XMLNS['xlink']+'}href'
+    return [(element.get('id'), element.get(href_key))
+            for element in xml_root.iter('{'+global_variables.XMLNS['svg']+'}image')]
+
+
+def export_apps_png_icons(wine_source_directory, apps_svg_file, image_list):
+    """ Export the embedded PNG icons, of an application icon, as fixed size hicolor icons.
+        For the Wine logo, the frames of the Wine (Windows) icon file take precedence.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    if not global_variables.PNG_ICONS:
+        return {}
+    png_icon_dict = get_apps_png_icons(image_list)
+    if apps_svg_file == global_variables.WINE_SVG_LOGO_FILENAME:
+        for icon_size in load_wine_ico_png_icons(wine_source_directory):
+            png_icon_dict.pop(icon_size, None)
+        target_png_file = global_variables.VENDOR_ID+'.png'
+    else:
+        target_png_file = global_variables.VENDOR_ID+'-'+os.path.splitext(apps_svg_file)[0]+'.png'
+    return create_png_icons(png_icon_dict, target_png_file)
+
+
+def process_wine_icon(wine_source_directory):
+    """ Clone wine (Windows) icon file - and export its frames as fixed size hicolor icons.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    print(f'{global_variables.WINE_ICON_LOGO_FILENAME} ', end='')
+    source_path = os.path.join(wine_source_directory, global_variables.WINE_LOGO_DIRECTORY)
+    source_path = os.path.join(source_path, global_variables.WINE_ICON_LOGO_FILENAME)
+    destination_path = os.path.join(global_variables.ICONS_TARGET_RELPATH,
+                                    global_variables.WINE_ICON_LOGO_FILENAME)
+    with open(source_path, "rb") as file_handle:
+        output_dict = {destination_path: file_handle.read()}
+    if global_variables.PNG_ICONS:
+        output_dict.update(create_png_icons(load_wine_ico_png_icons(wine_source_directory),
+                                            global_variables.VENDOR_ID+'.png'))
+    return output_dict
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3.6
+
+""" Embedded PNG bitmap handling for build_tool.py script: decoding and content hashing of
+    the base64 PNG <image> elements of SVG icons, lossless re-compression and collapsing of
+    duplicate bitmaps (within an icon) into a single <defs> entry - and PNG encoding. Works on
+    any ElementTree API compatible tree. """
+
+import base64
+import binascii
+import hashlib
+import re
+import struct
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_DATA_URI_REGEX = re.compile(r'^\s*data:image/png;base64,(.*)$', re.DOTALL)
+PNG_CHANNELS = {0:1, 2:3, 3:1, 4:2, 6:4}
+# Critical chunks and ancillary chunks that affect rendering - all others are dropped
+PNG_KEEP_CHUNK_TYPES = [b'IHDR', b'PLTE', b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP',
+                        b'IDAT', b'IEND']
+PNG_HASH_CHUNK_TYPES = [b'PLTE', b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP']
+PNG_ZLIB_STRATEGIES = [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED]
+PNG_IDAT_CHUNK_SIZE = 1024*1024
+# <image> attributes, that position an instance (rather than define the bitmap)
+SVG_IMAGE_INSTANCE_ATTRIBUTES = ['id', 'x', 'y', 'transform']
+
+
+def decode_png_data_uri(value):
+    """ Decode a base64 PNG data URI - or return None, if the value is not one. """
+    uri_match = PNG_DATA_URI_REGEX.search(value or '')
+    if uri_match is None:
+        return None
+    try:
+        png_data = base64.b64decode(''.join(uri_match.group(1).split()), validate=True)
+    except binascii.Error:
+        return None
+    if not png_data.startswith(PNG_SIGNATURE):
+        return None
+    return png_data
+
+
+def encode_png_data_uri(png_data):
+    """ Encode PNG data as a base64 data URI. """
+    return 'data:image/png;base64,'+base64.b64encode(png_data).decode('ascii')
+
+
+def read_png_chunks(png_data):
+    """ Split PNG data into a list of (chunk type, chunk data) tuples - checking all CRCs. """
+    if not png_data.startswith(PNG_SIGNATURE):
+        raise ValueError('Not a PNG image: invalid signature')
+    chunk_list = []
+    position = len(PNG_SIGNATURE)
+    while position < len(png_data):
+        if position+8 > len(png_data):
+            raise ValueError('Truncated PNG chunk header')
+        length, chunk_type = struct.unpack('>I4s', png_data[position:position+8])
+        chunk_data = png_data[position+8:position+8+length]
+        crc_data = png_data[position+8+length:position+12+length]
+        if len(chunk_data) != length or len(crc_data) != 4:
+            raise ValueError(f'Truncated PNG chunk: {chunk_type}')
+        if struct.unpack('>I', crc_data)[0] != zlib.crc32(chunk_type+chunk_data):
+            raise ValueError(f'PNG chunk CRC mismatch: {chunk_type}')
+        chunk_list += [(chunk_type, chunk_data)]
+        position += length+12
+        if chunk_type == b'IEND':
+            break
+    if not chunk_list or chunk_list[0][0] != b'IHDR' or chunk_list[-1][0] != b'IEND':
+        raise ValueError('Invalid PNG image: missing IHDR or IEND chunk')
+    return chunk_list
+
+
+def write_png_chunks(chunk_list):
+    """ Join a list of (chunk type, chunk data) tuples into PNG data. """
+    png_data = [PNG_SIGNATURE]
+    for chunk_type, chunk_data in chunk_list:
+        png_data += [struct.pack('>I4s', len(chunk_data), chunk_type), chunk_data,
+                     struct.pack('>I', zlib.crc32(chunk_type+chunk_data))]
+    return b''.join(png_data)
+
+
+def get_png_header(chunk_list):
+    """ Get the (width, height, bit depth, color type, interlace) of a PNG image. """
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB',
+                                                                          chunk_list[0][1])
+    if color_type not in PNG_CHANNELS:
+        raise ValueError(f'Invalid PNG color type: {color_type}')
+    return width, height, bit_depth, color_type, interlace
+
+
+def get_png_scanline_size(chunk_list):
+    """ Get the (row size, bytes per pixel) of the scanlines of a non-interlaced PNG image. """
+    width, _, bit_depth, color_type, _ = get_png_header(chunk_list)
+    bits_per_pixel = PNG_CHANNELS[color_type]*bit_depth
+    return (width*bits_per_pixel+7)//8, max(1, bits_per_pixel//8)
+
+
+def paeth_predictor(left, above, upper_left):
+    """ PNG Paeth predictor. """
+    estimate = left+above-upper_left
+    left_distance = abs(estimate-left)
+    above_distance = abs(estimate-above)
+    upper_left_distance = abs(estimate-upper_left)
+    if left_distance <= above_distance and left_distance <= upper_left_distance:
+        return left
+    if above_distance <= upper_left_distance:
+        return above
+    return upper_left
+
+
+def filter_scanline(filter_type, row, previous_row, bytes_per_pixel):
+    """ Apply a PNG filter type to a scanline (a bytes object). """
+    if filter_type == 0:
+        return row
+    left_row = bytes(bytes_per_pixel)+row[:-bytes_per_pixel]
+    if filter_type == 1:
+        return bytes((value-left) & 0xff for value, left in zip(row, left_row))
+    if filter_type == 2:
+        return bytes((value-above) & 0xff for value, above in zip(row, previous_row))
+    if filter_type == 3:
+        return bytes((value-((left+above)>>1)) & 0xff
+                     for value, left, above in zip(row, left_row, previous_row))
+    upper_left_row = bytes(bytes_per_pixel)+previous_row[:-bytes_per_pixel]
+    return bytes((value-paeth_predictor(left, above, upper_left)) & 0xff
+                 for value, left, above, upper_left
+                 in zip(row, left_row, previous_row, upper_left_row))
+
+
+def unfilter_scanlines(filtered_data, row_size, bytes_per_pixel):
+    """ Reverse the PNG filters of all scanlines - returning a list of (raw) rows. """
+    row_list = []
+    previous_row = bytearray(row_size)
+    for position in range(0, len(filtered_data), row_size+1):
+        filter_type = filtered_data[position]
+        row = bytearray(filtered_data[position+1:position+1+row_size])
+        if len(row) != row_size or filter_type > 4:
+            raise ValueError('Invalid PNG image data')
+        for index in range(row_size):
+            left = row[index-bytes_per_pixel] if index >= bytes_per_pixel else 0
+            above = previous_row[index]
+            if filter_type == 1:
+                row[index] = (row[index]+left) & 0xff
+            elif filter_type == 2:
+                row[index] = (row[index]+above) & 0xff
+            elif filter_type == 3:
+                row[index] = (row[index]+((left+above)>>1)) & 0xff
+            elif filter_type == 4:
+                upper_left = (previous_row[index-bytes_per_pixel]
+                              if index >= bytes_per_pixel else 0)
+                row[index] = (row[index]+paeth_predictor(left, above, upper_left)) & 0xff
+        row_list += [bytes(row)]
+        previous_row = row
+    return row_list
+
+
+def filter_scanlines_adaptive(row_list, bytes_per_pixel):
+    """ Filter all scanlines, choosing the filter type for each row by the minimum sum of
+        absolute differences heuristic (as libpng does). """
+    filtered_data = []
+    previous_row = bytes(len(row_list[0]) if row_list else 0)
+    for row in row_list:
+        candidate_list = []
+        for filter_type in range(5):
+            filtered_row = filter_scanline(filter_type, row, previous_row, bytes_per_pixel)
+            score = sum(value if value < 128 else 256-value for value in filtered_row)
+            candidate_list += [(score, filter_type, filtered_row)]
+        _, filter_type, filtered_row = min(candidate_list, key=lambda item: item[:2])
+        filtered_data += [bytes([filter_type]), filtered_row]
+        previous_row = row
+    return b''.join(filtered_data)
+
+
+def decode_png(png_data):
+    """ Decode a PNG image - returning its chunk list, decompressed (filtered) image data and
+        raw scanlines (or None, for an interlaced image). """
+    chunk_list = read_png_chunks(png_data)
+    try:
+        filtered_data = zlib.decompress(b''.join(chunk_data for chunk_type, chunk_data
+                                                 in chunk_list if chunk_type == b'IDAT'))
+    except zlib.error as error:
+        raise ValueError(f'Invalid PNG image data: {error}') from error
+    if get_png_header(chunk_list)[4]:
+        return chunk_list, filtered_data, None
+    row_size, bytes_per_pixel = get_png_scanline_size(chunk_list)
+    if len(filtered_data) != (row_size+1)*get_png_header(chunk_list)[1]:
+        raise ValueError('Invalid PNG image data: unexpected size')
+    return chunk_list, filtered_data, unfilter_scanlines(filtered_data, row_size,
+                                                         bytes_per_pixel)
+
+
+def get_png_hash(png_data):
+    """ Get the content address of a PNG image: a hash of its header, rendering chunks and
+        (unfiltered) pixel data - independent of the compression settings used. """
+    chunk_list, filtered_data, row_list = decode_png(png_data)
+    png_hash = hashlib.sha256(chunk_list[0][1])
+    for chunk_type, chunk_data in chunk_list:
+        if chunk_type in PNG_HASH_CHUNK_TYPES:
+            png_hash.update(chunk_type+struct.pack('>I', len(chunk_data))+chunk_data)
+    if row_list is None:
+        png_hash.update(filtered_data)
+    else:
+        png_hash.update(b''.join(row_list))
+    return png_hash.hexdigest()
+
+
+def compress_data(data, strategy):
+    """ Compress data with zlib - at the maximum compression level and memory level. """
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data)+compressor.flush()
+
+
+def recompress_png(png_data):
+    """ Re-compress a PNG image losslessly: drop chunks that do not affect rendering and try
+        the maximum zlib compression level, with both the original and adaptively chosen
+        scanline filters. Returns the smallest of the result and the original data. """
+    chunk_list, filtered_data, row_list = decode_png(png_data)
+    filtered_data_list = [filtered_data]
+    if row_list is not None:
+        filtered_data_list += [filter_scanlines_adaptive(row_list,
+                                                         get_png_scanline_size(chunk_list)[1])]
+    compressed_data = min((compress_data(data, strategy)
+                           for data in filtered_data_list for strategy in PNG_ZLIB_STRATEGIES),
+                          key=len)
+    new_chunk_list = []
+    for chunk_type, chunk_data in chunk_list:
+        if chunk_type == b'IDAT':
+            if not any(new_chunk_type == b'IDAT' for new_chunk_type, _ in new_chunk_list):
+                new_chunk_list += [(b'IDAT', compressed_data[position:position
+                                                             +PNG_IDAT_CHUNK_SIZE])
+                                   for position in range(0, len(compressed_data),
+                                                         PNG_IDAT_CHUNK_SIZE)]
+        elif chunk_type in PNG_KEEP_CHUNK_TYPES:
+            new_chunk_list += [(chunk_type, chunk_data)]
+    new_png_data = write_png_chunks(new_chunk_list)
+    if len(new_png_data) < len(png_data):
+        return new_png_data
+    return png_data
+
+
+def encode_png(width, height, row_list):
+    """ Encode a PNG image (8 bit RGBA) from a list of raw scanlines - with adaptively chosen
+        scanline filters, at the maximum zlib compression level. """
+    filtered_data = filter_scanlines_adaptive(row_list, 4)
+    compressed_data = min((compress_data(filtered_data, strategy)
+                           for strategy in PNG_ZLIB_STRATEGIES), key=len)
+    return write_png_chunks([(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+                             (b'IDAT', compressed_data),
+                             (b'IEND', b'')])
+
+
+def get_png_size(png_data):
+    """ Get the (width, height) of a PNG image - from its header alone. """
+    if not png_data.startswith(PNG_SIGNATURE) or png_data[12:16] != b'IHDR':
+        raise ValueError('Not a PNG image: invalid signature or header')
+    return struct.unpack('>II', png_data[16:24])
+
+
+def get_unique_id(element_id, used_id_set):
+    """ Get an id, not in the set of used ids - by appending a numeric suffix, if required. """
+    unique_id = element_id
+    suffix = 1
+    while unique_id in used_id_set:
+        unique_id = f'{element_id}-{suffix}'
+        suffix += 1
+    used_id_set.add(unique_id)
+    return unique_id
+
+
+def get_embedded_pngs(xml_root, svg_namespace, xlink_namespace):
+    """ Get all <image> elements, with an embedded PNG bitmap - as a list of
+        (parent, <image> element, PNG data) tuples, in document order. """
+    image_tag = '{'+svg_namespace+'}image'
+    href_key = '{'+xlink_namespace+'}href'
+    image_list = []
+    for xml_parent in xml_root.iter():
+        for xml_element in xml_parent:
+            if xml_element.tag != image_tag:
+                continue
+            png_data = decode_png_data_uri(xml_element.get(href_key))
+            if png_data is not None:
+                image_list += [(xml_parent, xml_element, png_data)]
+    return image_list
+
+
+def get_root_defs(xml_root, svg_namespace):
+    """ Get the first <defs> child of the root element - adding one, if there is none. """
+    defs_tag = '{'+svg_namespace+'}defs'
+    for xml_element in xml_root:
+        if xml_element.tag == defs_tag:
+            return xml_element
+    xml_defs = xml_root.makeelement(defs_tag, {})
+    xml_defs.tail = xml_root.text
+    xml_root.insert(0, xml_defs)
+    return xml_defs
+
+
+def collapse_duplicate_images(xml_root, svg_namespace, xlink_namespace, id_prefix,
+                              image_list):
+    """ Replace a list of (parent, <image> element) tuples, with the same bitmap and sizing,
+        by a single <image> in <defs> - and a <use> element for each original image. """
+    href_key = '{'+xlink_namespace+'}href'
+    used_id_set = {xml_element.get('id') for xml_element in xml_root.iter()
+                   if xml_element.get('id') is not None}
+    xml_image = image_list[0][1]
+    shared_attrib = {key:value for key, value in xml_image.attrib.items()
+                     if key not in SVG_IMAGE_INSTANCE_ATTRIBUTES}
+    xml_defs = get_root_defs(xml_root, svg_namespace)
+    shared_id = get_unique_id(id_prefix, used_id_set)
+    xml_defs.append(xml_defs.makeelement(xml_image.tag, dict(shared_attrib, id=shared_id)))
+    for xml_parent, xml_image in image_list:
+        attrib = {key:value for key, value in xml_image.attrib.items()
+                  if key in SVG_IMAGE_INSTANCE_ATTRIBUTES}
+        attrib[href_key] = '#'+shared_id
+        xml_use = xml_parent.makeelement('{'+svg_namespace+'}use', attrib)
+        xml_use.tail = xml_image.tail
+        xml_parent[list(xml_parent).index(xml_image)] = xml_use
+
+
+def recompress_embedded_png(xml_image, href_key, png_data, png_hash, png_dict):
+    """ Re-compress an embedded PNG bitmap losslessly - once for each PNG hash, in a {PNG hash:
+        PNG data} dictionary - replacing it, if smaller. """
+    if png_hash not in png_dict:
+        png_dict[png_hash] = recompress_png(png_data)
+    if len(png_dict[png_hash]) < len(png_data):
+        xml_image.set(href_key, encode_png_data_uri(png_dict[png_hash]))
+
+
+def get_duplicate_key(xml_image, href_key, png_hash):
+    """ Get the key, of an embedded PNG bitmap, all its duplicates share: the PNG hash and the
+        sizing (all <image> attributes, other than those of each instance and the bitmap). """
+    return (png_hash, tuple(sorted((key, value) for key, value in xml_image.attrib.items()
+                                   if key not in SVG_IMAGE_INSTANCE_ATTRIBUTES
+                                   and key != href_key)))
+
+
+def collapse_duplicates(xml_root, svg_namespace, xlink_namespace, id_prefix, duplicate_dict):
+    """ Collapse each list of duplicate images, in a {duplicate key: (parent, <image> element)
+        list} dictionary, into a single <defs> entry. """
+    for (png_hash, _), image_list in duplicate_dict.items():
+        if len(image_list) > 1:
+            collapse_duplicate_images(xml_root, svg_namespace, xlink_namespace,
+                                      f'{id_prefix}-{png_hash[:12]}', image_list)
+
+
+def dedupe_embedded_pngs(xml_root, svg_namespace, xlink_namespace, id_prefix, recompress):
+    """ Hash all embedded PNG bitmaps - re-compressing each (if enabled) and collapsing
+        duplicates (same bitmap and sizing) into a single <defs> entry.
+        Returns a list of (image id, PNG hash, original size, size) tuples - with a size of 0
+        for each duplicate collapsed. """
+    href_key = '{'+xlink_namespace+'}href'
+    bitmap_list = []
+    duplicate_dict = {}
+    png_dict = {}
+    for xml_parent, xml_image, png_data in get_embedded_pngs(xml_root, svg_namespace,
+                                                             xlink_namespace):
+        try:
+            png_hash = get_png_hash(png_data)
+        except ValueError:
+            continue
+        if recompress:
+            recompress_embedded_png(xml_image, href_key, png_data, png_hash, png_dict)
+        duplicate_key = get_duplicate_key(xml_image, href_key, png_hash)
+        size = 0
+        if duplicate_key not in duplicate_dict:
+            size = len(decode_png_data_uri(xml_image.get(href_key)))
+        duplicate_dict.setdefault(duplicate_key, [])
+        duplicate_dict[duplicate_key] += [(xml_parent, xml_image)]
+        bitmap_list += [(xml_image.get('id'), png_hash, len(png_data), size)]
+    collapse_duplicates(xml_root, svg_namespace, xlink_namespace, id_prefix, duplicate_dict)
+    return bitmap_list
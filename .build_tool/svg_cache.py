@@ -0,0 +1,101 @@
+#!/usr/bin/env python3.6
+
+""" Persistent, on-disk cache of parsed (and prepared) SVG trees for build_tool.py script """
+
+import hashlib
+import os
+import sys
+import tempfile
+
+SVG_CACHE_FORMAT = 3
+SVG_CACHE_MAGIC = 'wine-desktop-common-svg-cache'
+SVG_CACHE_SUFFIX = '.cache'
+
+
+class SvgCache:
+    """ Store parsed SVG root elements, serialized as XML by the XML backend, keyed by a hash
+        of the source file content, the tool version and a variant: the XML backend, the
+        preparation applied (if any) after parsing and the settings it depends on.
+        Each entry is a separate file - so the cache is safe to share between worker processes.
+        Each file starts with a header line (the cache format, tool version and key) - an entry
+        is only loaded if its header matches.
+        The least recently used entries are evicted once the cache grows beyond max_bytes. """
+
+    def __init__(self, directory, tool_version, max_bytes):
+        self.directory = directory
+        self.tool_version = tool_version
+        self.max_bytes = max_bytes
+
+    def get_key(self, source_data, variant):
+        """ Get the cache key for the content of an SVG source file, and a preparation variant. """
+        key_hash = hashlib.sha256(f'{SVG_CACHE_FORMAT} {sys.version_info[0]}.{sys.version_info[1]}'
+                                  f' {self.tool_version} {variant}\n'.encode('utf-8'))
+        key_hash.update(source_data)
+        return key_hash.hexdigest()
+
+    def get_path(self, key):
+        """ Get the path of the cache file for a key. """
+        return os.path.join(self.directory, key+SVG_CACHE_SUFFIX)
+
+    def get_header(self, key):
+        """ Get the header line, of the cache file for a key. """
+        return f'{SVG_CACHE_MAGIC} {SVG_CACHE_FORMAT} {self.tool_version} {key}\n'.encode('utf-8')
+
+    def load(self, key):
+        """ Return the serialized SVG root element for a key, or None - marking the entry used.
+            An entry without the header, of this cache format and tool version, is ignored. """
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as file_handle:
+                if file_handle.readline() != self.get_header(key):
+                    return None
+                xml_data = file_handle.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return xml_data
+
+    def store(self, key, xml_data):
+        """ Atomically add (or replace) the serialized SVG root element for a key. """
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, "wb") as file_handle:
+                file_handle.write(self.get_header(key))
+                file_handle.write(xml_data)
+            os.replace(temporary_path, self.get_path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def evict(self):
+        """ Remove the least recently used entries above the size limit.
+            Returns the number of entries, and the total size, remaining. """
+        if not os.path.isdir(self.directory):
+            return 0, 0
+        entry_list = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(SVG_CACHE_SUFFIX):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                entry_stat = os.stat(path)
+            except OSError:
+                continue
+            entry_list += [(entry_stat.st_mtime, entry_stat.st_size, path)]
+        entry_list.sort(reverse=True)
+        total_size = 0
+        entry_count = 0
+        evicting = False
+        for _, entry_size, path in entry_list:
+            if evicting or total_size+entry_size > self.max_bytes:
+                evicting = True
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            total_size += entry_size
+            entry_count += 1
+        return entry_count, total_size
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3.6
+
+""" SVG output optimizer for build_tool.py script: strips editor-only content, prunes
+    unreferenced <defs>, rounds coordinates and minifies whitespace - without changing any
+    rendering-visible content. Works on any ElementTree API compatible tree. """
+
+import re
+
+SVG_URL_REFERENCE_REGEX = re.compile(r'url\(\s*#([^)\s]+)\s*\)')
+SVG_NUMBER_REGEX = re.compile(r'[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+|[0-9]+)(?:[eE][-+]?[0-9]+)?')
+SVG_ROUNDED_ATTRIBUTES = ['x', 'y', 'x1', 'y1', 'x2', 'y2', 'cx', 'cy', 'r', 'rx', 'ry',
+                          'fx', 'fy', 'width', 'height', 'd', 'points', 'viewBox',
+                          'transform', 'gradientTransform', 'patternTransform']
+SVG_KEEP_DEFS_TAGS = ['style', 'script']
+SVG_TEXT_TAGS = ['text', 'tspan', 'textPath', 'title', 'desc', 'style', 'script',
+                 'flowRoot', 'flowPara', 'flowDiv', 'flowSpan']
+XML_SPACE_ATTRIBUTE = '{http://www.w3.org/XML/1998/namespace}space'
+
+
+def get_namespace(name):
+    """ Get the namespace uri of an ElementTree tag or attribute name - or None. """
+    if isinstance(name, str) and name[:1] == '{':
+        return name[1:].split('}', 1)[0]
+    return None
+
+
+def get_local_name(name):
+    """ Get the local part of an ElementTree tag or attribute name. """
+    if not isinstance(name, str):
+        return None
+    return name.rsplit('}', 1)[-1]
+
+
+def remove_element(xml_parent, xml_element):
+    """ Remove a child element - keeping any tail text, e.g. in text content. """
+    if xml_element.tail:
+        index = list(xml_parent).index(xml_element)
+        if index > 0:
+            xml_parent[index-1].tail = (xml_parent[index-1].tail or '')+xml_element.tail
+        else:
+            xml_parent.text = (xml_parent.text or '')+xml_element.tail
+        xml_element.tail = None
+    xml_parent.remove(xml_element)
+
+
+def strip_editor_content(xml_root, svg_namespace, strip_namespace_set, keep_root_attribute_set):
+    """ Remove all <metadata> elements, and all elements and attributes in the editor-only
+        namespaces - except the listed root attributes. Returns the number removed. """
+    removed_count = 0
+    for xml_parent in list(xml_root.iter()):
+        for xml_element in list(xml_parent):
+            if (get_namespace(xml_element.tag) in strip_namespace_set
+                    or xml_element.tag == '{'+svg_namespace+'}metadata'):
+                remove_element(xml_parent, xml_element)
+                removed_count += 1
+    for xml_element in xml_root.iter():
+        for key in list(xml_element.attrib):
+            if get_namespace(key) not in strip_namespace_set:
+                continue
+            if xml_element is xml_root and key in keep_root_attribute_set:
+                continue
+            del xml_element.attrib[key]
+            removed_count += 1
+    return removed_count
+
+
+def get_element_references(xml_element):
+    """ Get all ids referenced - by #id or url(#id) values, or style sheets - in an element
+        (but not its descendants). """
+    reference_set = set()
+    for value in xml_element.attrib.values():
+        if value.startswith('#'):
+            reference_set.add(value[1:])
+        reference_set.update(SVG_URL_REFERENCE_REGEX.findall(value))
+    if get_local_name(xml_element.tag) == 'style' and xml_element.text:
+        reference_set.update(SVG_URL_REFERENCE_REGEX.findall(xml_element.text))
+    return reference_set
+
+
+def get_referenced_ids(xml_root, svg_namespace):
+    """ Get all ids referenced, directly or indirectly, from rendered content
+        - i.e. from content outside any <defs> element. """
+    defs_tag = '{'+svg_namespace+'}defs'
+    id_dict = {}
+    for xml_element in xml_root.iter():
+        if xml_element.get('id') is not None:
+            id_dict.setdefault(xml_element.get('id'), xml_element)
+    reference_set = set()
+    visited_set = set()
+    pending_list = [xml_root]
+    while pending_list:
+        xml_element = pending_list.pop()
+        if id(xml_element) in visited_set:
+            continue
+        visited_set.add(id(xml_element))
+        for reference_id in get_element_references(xml_element) - reference_set:
+            reference_set.add(reference_id)
+            if reference_id in id_dict:
+                pending_list += [id_dict[reference_id]]
+        pending_list += [xml_child for xml_child in xml_element if xml_child.tag != defs_tag]
+    return reference_set
+
+
+def prune_defs(xml_root, svg_namespace):
+    """ Remove all <defs> entries that are not referenced (directly or indirectly) from
+        rendered content - and any <defs> left empty. Returns the number removed. """
+    defs_tag = '{'+svg_namespace+'}defs'
+    reference_set = get_referenced_ids(xml_root, svg_namespace)
+    removed_count = 0
+    for xml_parent in list(xml_root.iter()):
+        for xml_defs in [xml_child for xml_child in xml_parent if xml_child.tag == defs_tag]:
+            for xml_element in list(xml_defs):
+                if get_local_name(xml_element.tag) in SVG_KEEP_DEFS_TAGS:
+                    continue
+                if any(xml_descendant.get('id') in reference_set
+                       for xml_descendant in xml_element.iter()):
+                    continue
+                remove_element(xml_defs, xml_element)
+                removed_count += 1
+            if (len(xml_defs) == 0 and not (xml_defs.text or '').strip()
+                    and xml_defs.get('id') not in reference_set):
+                remove_element(xml_parent, xml_defs)
+    return removed_count
+
+
+def format_number(value, precision):
+    """ Format a number, rounded to a number of decimal places - without trailing zeros. """
+    text = f'{round(value, precision):.{precision}f}'
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ['-0', '']:
+        text = '0'
+    return text
+
+
+def round_numbers(value, precision):
+    """ Round all numbers in an attribute value. A separator is inserted where two numbers
+        were adjacent (e.g. '1.5.5') - so these still parse as separate numbers. """
+    text_list = []
+    position = 0
+    for match in SVG_NUMBER_REGEX.finditer(value):
+        number_text = format_number(float(match.group(0)), precision)
+        if match.start() > 0 and value[match.start()-1] in '0123456789.':
+            number_text = ' '+number_text
+        text_list += [value[position:match.start()], number_text]
+        position = match.end()
+    text_list += [value[position:]]
+    return ''.join(text_list)
+
+
+def round_coordinates(xml_root, precision):
+    """ Round all coordinates, lengths and transforms to a number of decimal places.
+        Path data with elliptical arcs is left unchanged - as arc flags may be unseparated. """
+    for xml_element in xml_root.iter():
+        for key in SVG_ROUNDED_ATTRIBUTES:
+            value = xml_element.get(key)
+            if value is None or (key == 'd' and re.search(r'[aA]', value)):
+                continue
+            xml_element.set(key, round_numbers(value, precision))
+
+
+def minify_whitespace(xml_element):
+    """ Remove all whitespace-only text between elements - except within text content,
+        or where whitespace is preserved (xml:space). """
+    if (get_local_name(xml_element.tag) in SVG_TEXT_TAGS
+            or xml_element.get(XML_SPACE_ATTRIBUTE) == 'preserve'):
+        return
+    if xml_element.text is not None and not xml_element.text.strip():
+        xml_element.text = None
+    for xml_child in xml_element:
+        if xml_child.tail is not None and not xml_child.tail.strip():
+            xml_child.tail = None
+        minify_whitespace(xml_child)
+
+
+def optimize_svg(xml_root, svg_namespace, strip_namespace_list, keep_root_attribute_list,
+                 precision):
+    """ Optimize an SVG tree, in place: strip editor-only content, prune unreferenced <defs>,
+        round coordinates (if precision is not None) and minify whitespace. """
+    strip_editor_content(xml_root, svg_namespace, set(strip_namespace_list),
+                         set(keep_root_attribute_list))
+    prune_defs(xml_root, svg_namespace)
+    if precision is not None:
+        round_coordinates(xml_root, precision)
+    minify_whitespace(xml_root)
+    return xml_root
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3.6
+
+""" Wine logo overlay, of the places icons, for build_tool.py script: the Wine icon is scaled
+    down and copied into each icon size group - or defined once, with its ids made unique, and
+    instantiated with <use> references. """
+
+import copy
+import re
+import global_variables
+
+OVERLAY_MODES = ['copy', 'use']
+SVG_URL_REFERENCE_REGEX = re.compile(r'url\(#([^)]+)\)')
+
+
+def xml_svg_overlay_parse_groups(xml_root):
+    """ Remove sections of an Wine icon (overlay) that are not required. """
+    first = True
+    for xml_node in xml_root.findall('svg:g', global_variables.XMLNS):
+        if first:
+            first = False
+            xml_node.set('transform', 'matrix()')
+        else:
+            xml_root.remove(xml_node)
+    return xml_root
+
+
+def xml_svg_places_get_transform(icon_size, places_svg_file):
+    """ Get transformation matrix for the specified places icon. """
+    transformation_data = {}
+    if icon_size == global_variables.LARGE_SVG_ICON_ID:
+        transformation_data['x-scale'] = global_variables.OVERLAY_LARGE_X_SCALE
+        transformation_data['y-scale'] = global_variables.OVERLAY_LARGE_Y_SCALE
+        if places_svg_file in ['document.svg', 'desktop.svg', 'mydocs.svg', 'drive.svg',
+                               'mycomputer.svg', 'netdrive.svg', 'printer.svg']:
+            transformation_data['x'] = '24'
+            transformation_data['y'] = '16'
+        else:
+            transformation_data['x'] = '20'
+            transformation_data['y'] = '10'
+    elif icon_size == global_variables.MEDIUM_SVG_ICON_ID:
+        transformation_data['x-scale'] = global_variables.OVERLAY_MEDIUM_X_SCALE
+        transformation_data['y-scale'] = global_variables.OVERLAY_MEDIUM_Y_SCALE
+        if places_svg_file in ['desktop.svg', 'mydocs.svg', 'drive.svg',
+                               'netdrive.svg', 'printer.svg']:
+            transformation_data['x'] = '187'
+            transformation_data['y'] = '29'
+        elif places_svg_file in ['mycomputer.svg']:
+            transformation_data['x'] = '188'
+            transformation_data['y'] = '28'
+        elif places_svg_file in ['document.svg']:
+            transformation_data['x'] = '10'
+            transformation_data['y'] = '5'
+        else:
+            transformation_data['x'] = '13'
+            transformation_data['y'] = '7'
+    return transformation_data
+
+
+def xml_svg_places_get_groups(xml_base_root, places_svg_file):
+    """ Set the ids of the icon groups of the specified places icon.
+        Returns the list of (group, icon size id) pairs. """
+    if places_svg_file in ['desktop.svg', 'document.svg', 'mycomputer.svg']:
+        icon_order = [global_variables.MEDIUM_SVG_ICON_ID,
+                      global_variables.LARGE_SVG_ICON_ID]
+    else:
+        icon_order = [global_variables.LARGE_SVG_ICON_ID,
+                      global_variables.MEDIUM_SVG_ICON_ID,
+                      global_variables.SMALL_SVG_ICON_ID]
+    group_list = []
+    for xml_group_base in xml_base_root.findall('svg:g', global_variables.XMLNS):
+        if not icon_order:
+            break
+        xml_group_base.set('id', icon_order[0])
+        group_list += [(xml_group_base, icon_order[0])]
+        icon_order = icon_order[1:]
+    return group_list
+
+
+def xml_svg_places_get_matrix(icon_size, places_svg_file):
+    """ Get the overlay transform attribute for the specified places icon size. """
+    transformation_matrix = xml_svg_places_get_transform(icon_size, places_svg_file)
+    return ('matrix('
+            +transformation_matrix['x-scale']+',0,0,'
+            +transformation_matrix['y-scale']+','
+            +transformation_matrix['x']+','
+            +transformation_matrix['y']+')')
+
+
+def xml_do_overlay_svg(xml_base_root, xml_overlay_root, places_svg_file):
+    """ Overlay a scaled down XML SVG Wine icon on the specified XML SVG base icon. """
+    xml_defs_base = xml_base_root.find('svg:defs', global_variables.XMLNS)
+    xml_defs_overlay = xml_overlay_root.find('svg:defs', global_variables.XMLNS)
+    xml_group_overlay = xml_overlay_root.find('svg:g', global_variables.XMLNS)
+    if xml_defs_base is None or xml_defs_overlay is None or xml_group_overlay is None:
+        return xml_base_root
+    xml_defs_base.extend([copy.deepcopy(xml_element) for xml_element in xml_defs_overlay])
+    for xml_group_base, icon_size in xml_svg_places_get_groups(xml_base_root, places_svg_file):
+        if not places_svg_file in ['control.svg']:
+            xml_group_overlay_copy = copy.deepcopy(xml_group_overlay)
+            xml_group_overlay_copy.set('transform',
+                                       xml_svg_places_get_matrix(icon_size, places_svg_file))
+            xml_group_base.append(xml_group_overlay_copy)
+    return xml_base_root
+
+
+def xml_svg_get_id_dict(xml_root):
+    """ Get all elements with an id - the first element, in document order, for each id. """
+    id_dict = {}
+    for element in xml_root.iter():
+        element_id = element.get('id')
+        if element_id is not None and element_id not in id_dict:
+            id_dict[element_id] = element
+    return id_dict
+
+
+def xml_svg_get_references(xml_element):
+    """ Get all ids referenced (by #id href or url(#id) values) within an element. """
+    reference_set = set()
+    for element in xml_element.iter():
+        for value in element.attrib.values():
+            if value.startswith('#'):
+                reference_set.add(value[1:])
+            reference_set.update(SVG_URL_REFERENCE_REGEX.findall(value))
+    return reference_set
+
+
+def xml_svg_rename_ids(xml_element, id_map):
+    """ Rename all ids, and references to these ids, within an element. """
+    for element in xml_element.iter():
+        for key, value in element.items():
+            if key == 'id' and value in id_map:
+                element.set(key, id_map[value])
+            elif value.startswith('#') and value[1:] in id_map:
+                element.set(key, '#'+id_map[value[1:]])
+            elif 'url(#' in value:
+                element.set(key, SVG_URL_REFERENCE_REGEX.sub(
+                    lambda match: 'url(#'+id_map.get(match.group(1), match.group(1))+')',
+                    value))
+
+
+def xml_svg_get_unique_id(element_id, used_id_set):
+    """ Get a new id, based on an existing id, that is not yet used. """
+    unique_id = f'{global_variables.VENDOR_ID}-{element_id}'
+    index = 1
+    while unique_id in used_id_set:
+        index += 1
+        unique_id = f'{global_variables.VENDOR_ID}-{element_id}-{index}'
+    used_id_set.add(unique_id)
+    return unique_id
+
+
+def xml_svg_merge_overlay_ids(xml_base_root, xml_defs_overlay, xml_group_overlay):
+    """ Resolve collisions between ids in the base icon and in (copies of) the overlay <defs>
+        and group. An overlay <defs> entry identical to the base entry, with the same id,
+        is dropped - unless it references another renamed id. All other colliding ids are
+        renamed, along with all references to these, in the overlay. """
+    base_id_dict = xml_svg_get_id_dict(xml_base_root)
+    overlay_id_dict = xml_svg_get_id_dict(xml_defs_overlay)
+    overlay_id_dict.update(xml_svg_get_id_dict(xml_group_overlay))
+    duplicate_dict = {}
+    for element in xml_defs_overlay:
+        element_id = element.get('id')
+        if (element_id in base_id_dict
+                and (global_variables.XML_BACKEND.tostring(element)
+                     == global_variables.XML_BACKEND.tostring(base_id_dict[element_id]))):
+            duplicate_dict[element_id] = element
+    renamed_id_set = {element_id for element_id in overlay_id_dict
+                      if element_id in base_id_dict and element_id not in duplicate_dict}
+    renamed = True
+    while renamed:
+        renamed = False
+        for element_id in list(duplicate_dict):
+            if xml_svg_get_references(duplicate_dict[element_id]) & renamed_id_set:
+                renamed_id_set.add(element_id)
+                del duplicate_dict[element_id]
+                renamed = True
+    for element in duplicate_dict.values():
+        xml_defs_overlay.remove(element)
+    used_id_set = set(base_id_dict) | set(overlay_id_dict)
+    id_map = {element_id:xml_svg_get_unique_id(element_id, used_id_set)
+              for element_id in sorted(renamed_id_set)}
+    xml_svg_rename_ids(xml_defs_overlay, id_map)
+    xml_svg_rename_ids(xml_group_overlay, id_map)
+    if xml_group_overlay.get('id') is None:
+        xml_group_overlay.set('id', xml_svg_get_unique_id('overlay', used_id_set))
+
+
+def xml_do_overlay_svg_use(xml_base_root, xml_overlay_root, places_svg_file):
+    """ Overlay a scaled down XML SVG Wine icon on the specified XML SVG base icon.
+        The Wine icon group is defined once, in the base <defs>, and instantiated for each
+        icon size with a <use> reference - transformed as by xml_do_overlay_svg(). """
+    xml_defs_base = xml_base_root.find('svg:defs', global_variables.XMLNS)
+    xml_defs_overlay = xml_overlay_root.find('svg:defs', global_variables.XMLNS)
+    xml_group_overlay = xml_overlay_root.find('svg:g', global_variables.XMLNS)
+    if xml_defs_base is None or xml_defs_overlay is None or xml_group_overlay is None:
+        return xml_base_root
+    group_list = xml_svg_places_get_groups(xml_base_root, places_svg_file)
+    xml_defs_overlay = copy.deepcopy(xml_defs_overlay)
+    xml_group_overlay = copy.deepcopy(xml_group_overlay)
+    xml_svg_merge_overlay_ids(xml_base_root, xml_defs_overlay, xml_group_overlay)
+    xml_defs_base.extend(xml_defs_overlay)
+    if places_svg_file in ['control.svg']:
+        return xml_base_root
+    xml_group_overlay.attrib.pop('transform', None)
+    xml_defs_base.append(xml_group_overlay)
+    for xml_group_base, icon_size in group_list:
+        global_variables.XML_BACKEND.module.SubElement(
+            xml_group_base,
+            '{'+global_variables.XMLNS['svg']+'}use',
+            {'{'+global_variables.XMLNS['xlink']+'}href':'#'+xml_group_overlay.get('id'),
+             'transform':xml_svg_places_get_matrix(icon_size, places_svg_file)})
+    return xml_base_root
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3.6
+
+""" Streaming (expat based) SVG transforms, for build_tool.py script.
+    Elements are rewritten, and serialized, as they are parsed - no element tree is built. """
+
+import io
+import re
+import shutil
+import sys
+import tempfile
+from xml.parsers import expat
+
+SVG_STREAM_CHUNK_SIZE = 64*1024
+# Application icon ids (icon:size-bit depth), scaled icon group and translated group transforms
+APPS_SVG_ICON_ID_REGEX = re.compile(r'^icon\:([0-9]+)\-([0-9]+)$')
+APPS_SVG_MATRIX_REGEX = re.compile(r'^matrix\('
+                                   r'([-]*[\.0-9]+)\,'
+                                   r'([-]*[\.0-9]+)\,'
+                                   r'([-]*[\.0-9]+)\,'
+                                   r'([-]*[\.0-9]+)\,'
+                                   r'([-]*[\.0-9]+)\,'
+                                   r'([-]*[\.0-9]+)\)$')
+APPS_SVG_TRANSLATE_REGEX = re.compile(r'^translate\(.+\)$')
+XLINK_NAMESPACE = 'http://www.w3.org/1999/xlink'
+# The ElementTree module writes attributes sorted by name before Python 3.8 - not in document order
+ATTRIBUTES_SORTED = sys.version_info < (3, 8)
+
+
+def escape_cdata(text):
+    """ Escape XML character data - as the ElementTree module does. """
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attrib(text):
+    """ Escape an XML attribute value - as the ElementTree module does. """
+    text = escape_cdata(text).replace("\"", "&quot;")
+    return text.replace("\r", "&#13;").replace("\n", "&#10;").replace("\t", "&#09;")
+
+
+def fix_name(name):
+    """ Convert an expat namespace qualified name, 'uri}local', to ElementTree form. """
+    if '}' in name:
+        return '{'+name
+    return name
+
+
+class SvgStreamWriter:
+    """ Parse an XML file, passing each element start tag (depth, tag and attributes) to a
+        handler - which returns the (rewritten) attributes, or None to remove the element.
+        Output is serialized, as it is parsed, exactly as the ElementTree module writes
+        a tree with the same changes (on the running Python version): all namespace declarations
+        on the root element, attributes in the same order, empty elements closed with ' />' and
+        removed elements dropped along with their tail text.
+        Only the root start tag is held back (the rest of the output is spooled to a temporary
+        file) - until all the namespaces used are known. """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, handler, prefix_dict):
+        self.handler = handler
+        self.prefix_dict = prefix_dict
+        self.namespaces = {}
+        self.qnames = {}
+        self.spool = None
+        self.root_qname = None
+        self.root_start_tag = None
+        self.tag_stack = []
+        self.remove_depth = None
+        self.remove_tail = False
+        self.pending_start_tag = False
+
+    def get_qname(self, name):
+        """ Get the serialized (prefix:local) form of an ElementTree name
+            - recording each namespace, as it is first used. """
+        qname = self.qnames.get(name)
+        if qname is not None:
+            return qname
+        qname = name
+        if name[:1] == '{':
+            uri, local_name = name[1:].rsplit('}', 1)
+            prefix = self.namespaces.get(uri)
+            if prefix is None:
+                prefix = self.prefix_dict.get(uri)
+                if prefix is None:
+                    prefix = f'ns{len(self.namespaces)}'
+                if prefix != 'xml':
+                    self.namespaces[uri] = prefix
+            if prefix:
+                qname = f'{prefix}:{local_name}'
+            else:
+                qname = local_name
+        self.qnames[name] = qname
+        return qname
+
+    def close_start_tag(self):
+        """ Complete the current start tag - as the element is not empty. """
+        if self.pending_start_tag:
+            self.spool.write('>')
+            self.pending_start_tag = False
+
+    def get_attributes(self, attrib):
+        """ Serialize the attributes of a start tag - in the order the ElementTree module writes
+            these. Namespaces are recorded in document order, as ElementTree does. """
+        attribute_list = [(key, f' {self.get_qname(key)}="{escape_attrib(value)}"')
+                          for key, value in attrib.items()]
+        if ATTRIBUTES_SORTED:
+            attribute_list.sort()
+        return ''.join(attribute for _, attribute in attribute_list)
+
+    def start(self, name, attribute_list):
+        """ Expat start element handler. """
+        depth = len(self.tag_stack)
+        tag = fix_name(name)
+        attrib = {}
+        for index in range(0, len(attribute_list), 2):
+            attrib[fix_name(attribute_list[index])] = attribute_list[index+1]
+        attrib = self.handler.start(depth, tag, attrib)
+        self.remove_tail = False
+        if self.remove_depth is None and attrib is None:
+            self.remove_depth = depth
+        if self.remove_depth is not None:
+            self.tag_stack += [None]
+            return
+        self.close_start_tag()
+        qname = self.get_qname(tag)
+        if depth == 0:
+            self.root_qname = qname
+            self.root_start_tag = self.get_attributes(attrib)
+        else:
+            self.spool.write(f'<{qname}{self.get_attributes(attrib)}')
+        self.tag_stack += [qname]
+        self.pending_start_tag = True
+
+    def end(self, _name):
+        """ Expat end element handler. """
+        qname = self.tag_stack.pop()
+        depth = len(self.tag_stack)
+        self.handler.end(depth)
+        if self.remove_depth is not None:
+            if depth == self.remove_depth:
+                self.remove_depth = None
+                self.remove_tail = True
+            return
+        self.remove_tail = False
+        if self.pending_start_tag:
+            self.spool.write(' />')
+            self.pending_start_tag = False
+        else:
+            self.spool.write(f'</{qname}>')
+
+    def data(self, text):
+        """ Expat character data handler. """
+        if self.remove_depth is not None or self.remove_tail:
+            return
+        self.close_start_tag()
+        self.spool.write(escape_cdata(text))
+
+    def get_root_start_tag(self):
+        """ Get the root start tag - with all the namespace declarations, sorted by prefix. """
+        start_tag = f'<{self.root_qname}'
+        for uri, prefix in sorted(self.namespaces.items(), key=lambda item: item[1]):
+            if prefix:
+                prefix = ':'+prefix
+            start_tag += f' xmlns{prefix}="{escape_attrib(uri)}"'
+        return start_tag+self.root_start_tag
+
+    def transform(self, source_path, target_file):
+        """ Stream the source XML file to a (binary) target file object - using the us-ascii
+            encoding, with character references, as ElementTree.write does by default. """
+        parser = expat.ParserCreate(None, '}')
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        with tempfile.TemporaryFile("w+", encoding='utf-8', newline="\n") as spool:
+            self.spool = spool
+            with open(source_path, "rb") as file_handle:
+                while True:
+                    source_data = file_handle.read(SVG_STREAM_CHUNK_SIZE)
+                    parser.Parse(source_data, not source_data)
+                    if not source_data:
+                        break
+            self.spool.seek(0)
+            file_handle = io.TextIOWrapper(target_file, encoding='us-ascii',
+                                           errors='xmlcharrefreplace', newline="\n")
+            file_handle.write(self.get_root_start_tag())
+            shutil.copyfileobj(self.spool, file_handle, SVG_STREAM_CHUNK_SIZE)
+            file_handle.flush()
+            file_handle.detach()
+
+
+class AppsSvgStreamHandler:
+    """ Streaming equivalent of the application icon transform, in build_tool.py: first
+        xml_apps_svg_parse_groups() - then the root attributes set by xml_svg_fix_icon_size().
+        The embedded PNG icons (icon:NN-NN ids) have their y coordinate fixed, any other
+        (non-image) icon larger than the icon size is removed. Then groups have their ids set
+        in order, and those scaled (>1x) are removed - or offsets are set. As with the tree
+        transform, groups inside a removed group still take an id, groups inside a removed
+        icon do not. The embedded PNG icons are recorded, as (image id, href) tuples. """
+    # pylint: disable=too-many-instance-attributes,too-many-arguments
+
+    def __init__(self, svg_namespace, icon_size, icon_order, first_offsets, root_attrib_dict):
+        self.svg_namespace = svg_namespace
+        self.icon_size = icon_size
+        self.icon_order = list(icon_order)
+        self.first_offsets = first_offsets
+        self.root_attrib_dict = root_attrib_dict
+        self.root_height = None
+        self.first = True
+        self.removed_icon_depth = None
+        self.image_list = []
+
+    @staticmethod
+    def remove_child(depth):
+        """ As ElementTree remove() on the root element - only children can be removed. """
+        if depth != 1:
+            raise ValueError('list.remove(x): x not in list')
+
+    def start_icon(self, depth, tag, attrib):
+        """ Fix the y coordinate of an embedded PNG icon, or remove a larger icon. """
+        internal_size = (self.icon_size*3)//4
+        icon_border = (self.icon_size-internal_size)//2
+        height = int(attrib.get('height'))
+        if tag == '{'+self.svg_namespace+'}image':
+            self.image_list += [(attrib.get('id'), attrib.get('{'+XLINK_NAMESPACE+'}href'))]
+            attrib['y'] = str(self.icon_size-height-icon_border)
+        elif height > self.icon_size:
+            self.remove_child(depth)
+            return None
+        return attrib
+
+    def start_group(self, depth, attrib):
+        """ Set the id of a group - then remove it, if scaled, or set its offsets. """
+        x_offset = y_offset = 0
+        if self.icon_order:
+            attrib['id'] = self.icon_order[0]
+            self.icon_order = self.icon_order[1:]
+        if int(self.root_height) <= self.icon_size:
+            return attrib
+        if self.first:
+            self.first = False
+            x_offset, y_offset = self.first_offsets
+        transform = attrib.get('transform')
+        if transform is None:
+            return attrib
+        matrix_match = APPS_SVG_MATRIX_REGEX.search(transform)
+        if matrix_match:
+            x_scale = round(float(matrix_match.group(1)))
+            y_scale = round(float(matrix_match.group(4)))
+            if x_scale == 1 and y_scale == 1:
+                attrib['transform'] = 'translate()'
+            else:
+                self.remove_child(depth)
+                return None
+        if APPS_SVG_TRANSLATE_REGEX.search(transform):
+            attrib['transform'] = f'translate({x_offset}, {y_offset})'
+        return attrib
+
+    def start(self, depth, tag, attrib):
+        """ Rewrite the attributes of an element - or return None to remove it. """
+        if depth == 0:
+            self.root_height = attrib.get('height')
+            attrib.update(self.root_attrib_dict)
+            return attrib
+        if 'id' in attrib and APPS_SVG_ICON_ID_REGEX.search(attrib['id']):
+            attrib = self.start_icon(depth, tag, attrib)
+            if attrib is None and self.removed_icon_depth is None:
+                self.removed_icon_depth = depth
+        if self.removed_icon_depth is not None:
+            return None
+        if tag == '{'+self.svg_namespace+'}g':
+            return self.start_group(depth, attrib)
+        return attrib
+
+    def end(self, depth):
+        """ Track the end of a removed icon. """
+        if depth == self.removed_icon_depth:
+            self.removed_icon_depth = None
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3.6
+
+""" Single-pass, multi-pattern term masking and unmasking for build_tool.py script """
+
+import re
+
+
+def compile_term_regex(term_list):
+    """ Compile a single alternation, matching any of the (non-empty) terms - longest first. """
+    term_list = sorted((term for term in term_list if term), key=len, reverse=True)
+    if not term_list:
+        return None
+    return re.compile('|'.join(re.escape(term) for term in term_list))
+
+
+def splice_text(text, replacement_list):
+    """ Apply a sorted list of non-overlapping (start, end, replacement) edits in one pass. """
+    text_list = []
+    position = 0
+    for start, end, replacement in replacement_list:
+        text_list += [text[position:start], replacement]
+        position = end
+    text_list += [text[position:]]
+    return ''.join(text_list)
+
+
+class TermMasker:
+    """ Replace any of a set of terms, with their substitutes, in a single pass over a text. """
+
+    def __init__(self, replacement_dict):
+        self.replacement_dict = dict(replacement_dict)
+        self.regex = compile_term_regex(self.replacement_dict)
+
+    def find(self, text):
+        """ Get the position (start, end) and the term, of all non-overlapping term matches. """
+        if self.regex is None:
+            return []
+        return [(match.start(), match.end(), match.group(0))
+                for match in self.regex.finditer(text)]
+
+    def replace(self, text, match_list=None):
+        """ Replace all (or only the listed) term matches, with their substitutes. """
+        if match_list is None:
+            match_list = self.find(text)
+        return splice_text(text, [(start, end, self.replacement_dict[term])
+                                  for start, end, term in match_list])
+
+    def mask(self, text):
+        """ Replace all terms, in a text, with their substitutes.
+            Returns the masked text and the list of terms replaced (in replacement_dict order). """
+        match_list = self.find(text)
+        matched_term_set = {term for _, _, term in match_list}
+        return (self.replace(text, match_list),
+                [term for term in self.replacement_dict if term in matched_term_set])
+
+
+def compile_term_forms(term_form_dict):
+    """ Compile the forms of each term (e.g. translated, then lower-case translated), for
+        unmask_terms(). Returns the ({form: [(term, rank)]} dictionary, form regex) tuple.
+        A later form of a term is only kept if it differs from the earlier form. """
+    form_dict = {}
+    for term in term_form_dict:
+        for rank, form in enumerate(term_form_dict[term]):
+            if form and (term, rank-1) not in form_dict.get(form, []):
+                form_dict.setdefault(form, []).append((term, rank))
+    return form_dict, compile_term_regex(form_dict)
+
+
+def unmask_terms(text, term_list, term_forms):
+    """ Restore all the listed terms, from their (compiled) forms, in a single pass over a text.
+        A later form of a term is only restored when no earlier form, that differs from the
+        term itself, is present. Terms are restored in order: a match already restored, for
+        one term, is not available to any later term. Returns the restored text - or None if
+        any term, in the list, is not present (in any form) to be restored. """
+    form_dict, regex = term_forms
+    rank_match_dict = {}
+    if regex is not None:
+        for match in regex.finditer(text):
+            for term, rank in form_dict[match.group(0)]:
+                rank_match_dict.setdefault(term, {}).setdefault(rank, []).append(match)
+    replacement_list = []
+    restored_position_set = set()
+    for term in term_list:
+        selected_match_list = None
+        for rank in sorted(rank_match_dict.get(term, {})):
+            match_list = [match for match in rank_match_dict[term][rank]
+                          if match.start() not in restored_position_set]
+            if match_list and match_list[0].group(0) != term:
+                selected_match_list = match_list
+                break
+        if selected_match_list is None:
+            return None
+        restored_position_set.update(match.start() for match in selected_match_list)
+        replacement_list += [(match.start(), match.end(), term)
+                             for match in selected_match_list]
+    return splice_text(text, sorted(replacement_list))
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3.6
+
+""" Translation backends for build_tool.py script """
+
+import hashlib
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import threading
+import time
+from translation_catalog import read_catalog
+
+
+class TranslationBackend:
+    """ Base class for all translation backends. A backend translates text blocks, from
+        English, returning an unfiltered list of candidate translations for each block. """
+
+    name = None
+    version = None
+
+    def identity(self):
+        """ Get a unique identity, for this backend and version, e.g. to key cached results. """
+        return f'{self.name} {self.version}'
+
+    def translate(self, text, locale):
+        """ Translate a single text block, returning a list of candidate translations. """
+        raise NotImplementedError
+
+    def translate_batch(self, text_list, locale):
+        """ Translate a list of text blocks, returning a list of candidate translation lists
+            - or None if the results cannot be mapped back to their text blocks. """
+        return [self.translate(text, locale) for text in text_list]
+
+    def close(self):
+        """ Release any resources held by the backend. """
+
+
+def split_translation_output(translation_output):
+    """ Split the output of shell utility trans into an unfiltered list of translations. """
+    return re.split(r'\n|\,|^\(|\)$', translation_output, flags=re.MULTILINE)
+
+
+def split_delimited_output(line_list, delimiter):
+    """ Split lines of trans output, for a list of delimited text blocks, into the output for
+        each text block. Repeated delimiter lines, e.g. alternative translations of the
+        delimiter, are merged. """
+    translation_output_list = [""]
+    in_delimiter = False
+    for line in line_list:
+        if line.strip() == delimiter:
+            if not in_delimiter:
+                translation_output_list += [""]
+            in_delimiter = True
+        elif not in_delimiter or line.strip():
+            translation_output_list[-1] += line+"\n"
+            in_delimiter = False
+    return translation_output_list
+
+
+class TransBackend(TranslationBackend):
+    """ Translation backend, using the shell utility trans (translate-shell).
+        Each call runs a new (bash) subprocess. """
+
+    name = 'trans'
+
+    def __init__(self, batch_delimiter):
+        self.batch_delimiter = batch_delimiter
+        self.version = self.get_version()
+
+    @staticmethod
+    def get_version():
+        """ Read the version from the trans script itself - to avoid spawning a process. """
+        trans_path = shutil.which('trans')
+        if trans_path is None:
+            return 'unknown'
+        try:
+            with open(trans_path, "r", encoding='utf-8', errors='replace') as file_handle:
+                version_match = re.search(r'^\s*Version\s*=\s*"([^"]+)"', file_handle.read(),
+                                          flags=re.MULTILINE)
+        except OSError:
+            version_match = None
+        if version_match is None:
+            return f'{os.stat(trans_path).st_size}-{int(os.stat(trans_path).st_mtime)}'
+        return version_match.group(1)
+
+    @staticmethod
+    def get_command(text_list, locale):
+        """ Get the shell command to translate a list of text blocks. """
+        shell_command = 'trans'
+        shell_parameters = (f' -indent 0 -no-ansi -no-auto'
+                            f' -show-languages N -show-dictionary N -show-prompt-message N'
+                            f' -show-original N -s en -t {locale}')
+        for text in text_list:
+            shell_parameters += f' "{text}"'
+        return shell_command+shell_parameters
+
+    def run(self, text_list, locale):
+        """ Run trans for a list of text blocks, returning the output or None on failure. """
+        try:
+            out = subprocess.run(["/bin/bash",
+                                  "-c",
+                                  self.get_command(text_list, locale)],
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.DEVNULL,
+                                 encoding='utf-8',
+                                 check=True)
+        except subprocess.CalledProcessError:
+            return None
+        return out.stdout
+
+    def translate(self, text, locale):
+        translation_output = self.run([text], locale)
+        if translation_output is None:
+            raise SystemError(f'Unable to translate "{text}" to locale: {locale}')
+        return split_translation_output(translation_output)
+
+    def translate_batch(self, text_list, locale):
+        """ Translate a list of text blocks with a single call to trans. The text blocks
+            are separated by a numeric delimiter - which is not subject to translation. """
+        delimited_text_list = []
+        for text in text_list:
+            delimited_text_list += [text, self.batch_delimiter]
+        translation_output = self.run(delimited_text_list[:-1], locale)
+        if translation_output is None:
+            return None
+        translation_output_list = split_delimited_output(translation_output.splitlines(),
+                                                         self.batch_delimiter)
+        if len(translation_output_list) != len(text_list):
+            return None
+        return [split_translation_output(translation_output)
+                for translation_output in translation_output_list]
+
+
+class TransWorker:
+    """ A long-lived trans interactive shell process, translating to a single locale.
+        Requests are written to the shell one text block per line - each followed by a
+        (numeric) delimiter, whose translation marks the end of the output for that block. """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, locale, batch_delimiter, timeout):
+        self.locale = locale
+        self.batch_delimiter = batch_delimiter
+        self.timeout = timeout
+        self.process = None
+        self.reader_thread = None
+        self.line_queue = None
+        self.delimiter = None
+        self.previous_delimiter = None
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        """ Start the trans interactive shell, with a thread to queue all lines it outputs.
+            The shell outlives this method, so it is not managed by a with block: stop()
+            always waits for it (or kills it), then closes its pipes. """
+        # pylint: disable=consider-using-with
+        self.process = subprocess.Popen(['trans', '-I', '-no-rlwrap', '-indent', '0',
+                                         '-no-ansi', '-no-auto', '-show-languages', 'N',
+                                         '-show-dictionary', 'N', '-show-prompt-message', 'N',
+                                         '-show-original', 'N', '-s', 'en', '-t', self.locale],
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL,
+                                        encoding='utf-8',
+                                        bufsize=1)
+        self.line_queue = queue.Queue()
+        self.reader_thread = threading.Thread(target=self.read_lines,
+                                              args=(self.process.stdout, self.line_queue),
+                                              daemon=True)
+        self.reader_thread.start()
+
+    @staticmethod
+    def read_lines(stream, line_queue):
+        """ Queue all lines output by the trans shell - None marks the end of its output. """
+        for line in stream:
+            line_queue.put(line.rstrip('\n'))
+        line_queue.put(None)
+
+    def stop(self):
+        """ Stop the trans shell - killing it, if it does not exit promptly. Then close its
+            output pipe, once the reader thread has read all its output. """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.reader_thread.join(timeout=self.timeout)
+        if not self.reader_thread.is_alive():
+            self.process.stdout.close()
+        self.process = None
+        self.reader_thread = None
+
+    def is_running(self):
+        """ Check the trans shell process is still running. """
+        return self.process is not None and self.process.poll() is None
+
+    def next_delimiter(self):
+        """ Get a new (numeric) delimiter for a request - so any late output, from the previous
+            request, is recognised and skipped. """
+        self.previous_delimiter = self.delimiter
+        self.request_count += 1
+        self.delimiter = f'{self.batch_delimiter[:-4]}{self.request_count % 10000:04d}'
+        return self.delimiter
+
+    def exchange(self, text_list):
+        """ Write a request to the trans shell, and read its output - up to the delimiter
+            following the last text block (an empty request is only the delimiter, e.g. to check
+            the shell is responding). Returns the output for each text block - or None if the shell
+            failed, or did not respond within the timeout (the shell is then stopped). """
+        delimiter = self.next_delimiter()
+        request_text = ''.join(f'{text}\n{delimiter}\n' for text in text_list)
+        delimiter_count = len(text_list)
+        if not text_list:
+            request_text = f'{delimiter}\n'
+            delimiter_count = 1
+        line_list = []
+        in_delimiter = False
+        try:
+            self.process.stdin.write(request_text)
+            self.process.stdin.flush()
+            while delimiter_count > 0:
+                line = self.line_queue.get(timeout=self.timeout)
+                if line is None:
+                    raise OSError('trans shell exited')
+                if line.strip() == self.previous_delimiter:
+                    continue
+                if line.strip() == delimiter:
+                    if not in_delimiter:
+                        delimiter_count -= 1
+                    in_delimiter = True
+                elif line.strip():
+                    in_delimiter = False
+                line_list += [line]
+        except (OSError, ValueError, queue.Empty):
+            self.stop()
+            return None
+        return split_delimited_output(line_list, delimiter)[:-1]
+
+    def request(self, text_list):
+        """ Translate a list of text blocks. Returns the output for each text block - or None
+            if the shell failed, or hung. A (re)started shell must first pass a health check:
+            translating (echoing back) a delimiter within the timeout. """
+        with self.lock:
+            if not self.is_running():
+                self.stop()
+                self.start()
+                if self.exchange([]) is None:
+                    return None
+            return self.exchange(text_list)
+
+
+class TransPoolBackend(TransBackend):
+    """ Translation backend, using a pool of long-lived trans interactive shell processes
+        - one per locale. A worker that fails, or hangs, is restarted for the next request;
+        the failed request falls back to a single (bash) trans subprocess call. """
+
+    name = 'trans-pool'
+
+    def __init__(self, batch_delimiter, timeout):
+        super().__init__(batch_delimiter)
+        self.timeout = timeout
+        self.worker_dict = {}
+        self.lock = threading.Lock()
+
+    def get_worker(self, locale):
+        """ Get the worker for a locale - starting one, if required. """
+        with self.lock:
+            if locale not in self.worker_dict:
+                self.worker_dict[locale] = TransWorker(locale, self.batch_delimiter, self.timeout)
+            return self.worker_dict[locale]
+
+    def translate(self, text, locale):
+        translation_output_list = self.get_worker(locale).request([text])
+        if translation_output_list is None or len(translation_output_list) != 1:
+            return super().translate(text, locale)
+        return split_translation_output(translation_output_list[0])
+
+    def translate_batch(self, text_list, locale):
+        translation_output_list = self.get_worker(locale).request(text_list)
+        if translation_output_list is None or len(translation_output_list) != len(text_list):
+            return None
+        return [split_translation_output(translation_output)
+                for translation_output in translation_output_list]
+
+    def close(self):
+        """ Shut down all the trans shell processes. """
+        with self.lock:
+            for worker in self.worker_dict.values():
+                worker.stop()
+            self.worker_dict = {}
+
+
+class CatalogBackend(TranslationBackend):
+    """ Offline translation backend, serving translations from a local catalog: a JSON file
+        {locale: {text: translation, or [translation, ...]}}, a .po file or a directory of
+        .po files. """
+
+    name = 'catalog'
+
+    def __init__(self, catalog_path):
+        self.catalog = read_catalog(catalog_path)
+        catalog_data = json.dumps(self.catalog, sort_keys=True).encode('utf-8')
+        self.version = hashlib.sha256(catalog_data).hexdigest()[:16]
+
+    def translate(self, text, locale):
+        translation = self.catalog.get(locale, {}).get(text)
+        if translation is None:
+            raise SystemError(f'No catalog translation of "{text}" for locale: {locale}')
+        if isinstance(translation, str):
+            return [translation]
+        return list(translation)
+
+
+class FakeBackend(TranslationBackend):
+    """ Deterministic translation backend, for testing, with a configurable latency
+        per call. Every word is reversed and tagged with the locale - numbers and
+        single letters are left untranslated. """
+
+    name = 'fake'
+    version = '1'
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    @staticmethod
+    def fake_translate(text, locale):
+        """ Get the fake translation of a text block. """
+        word_list = []
+        for word in text.split(' '):
+            if len(word) > 1 and not word.isdigit():
+                word = word[::-1].lower()+'_'+locale
+            word_list += [word]
+        return ' '.join(word_list)
+
+    def translate(self, text, locale):
+        time.sleep(self.latency)
+        return [self.fake_translate(text, locale)]
+
+    def translate_batch(self, text_list, locale):
+        time.sleep(self.latency)
+        return [[self.fake_translate(text, locale)] for text in text_list]
+
+
+TRANSLATION_BACKENDS = ['trans', 'trans-pool', 'catalog', 'fake']
+
+
+def create_translation_backend(backend_name, batch_delimiter,
+                               catalog_path=None, latency=0.0, timeout=30.0):
+    """ Create the named translation backend. """
+    if backend_name == 'trans':
+        return TransBackend(batch_delimiter)
+    if backend_name == 'trans-pool':
+        return TransPoolBackend(batch_delimiter, timeout)
+    if backend_name == 'catalog':
+        if catalog_path is None:
+            raise SystemError('No translation catalog specified for the catalog backend')
+        return CatalogBackend(catalog_path)
+    if backend_name == 'fake':
+        return FakeBackend(latency)
+    raise SystemError(f'Unknown translation backend: {backend_name}')
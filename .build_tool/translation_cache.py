@@ -0,0 +1,138 @@
+#!/usr/bin/env python3.6
+
+""" Persistent, on-disk translation store for build_tool.py script """
+
+import json
+import os
+import tempfile
+import threading
+
+TRANSLATION_CACHE_FORMAT = 1
+
+
+class TranslationCache:
+    """ Store raw translation backend results, keyed by (source text, locale, backend id).
+        Entries are loaded once at startup and written back atomically when the build ends.
+        The least recently used entries are evicted once the cache grows beyond max_entries.
+        Lookups and stores are thread-safe. With no path the cache is held in memory only.
+        Hits and misses count each (text, locale) key once: as served from disk, or as stored. """
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, path, backend_id, max_entries):
+        self.path = path
+        self.backend_id = backend_id
+        self.max_entries = max_entries
+        self.generation = 1
+        self.backends = {}
+        self.hits = 0
+        self.misses = 0
+        self.modified = False
+        self.counted_keys = set()
+        self.lock = threading.Lock()
+
+    def load(self):
+        """ Read the cache file - discarding it if it is unreadable or has an unknown format. """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding='utf-8') as file_handle:
+                cache_data = json.load(file_handle)
+        except (OSError, ValueError):
+            return
+        if (not isinstance(cache_data, dict)
+                or cache_data.get('format') != TRANSLATION_CACHE_FORMAT
+                or not isinstance(cache_data.get('backends'), dict)):
+            return
+        self.generation = int(cache_data.get('generation', 0))+1
+        self.backends = cache_data['backends']
+
+    def lookup(self, text, locale):
+        """ Return the cached translation list for a phrase and locale, or None. """
+        with self.lock:
+            locale_entries = self.backends.get(self.backend_id, {}).get(locale, {})
+            entry = locale_entries.get(text)
+            if entry is None:
+                return None
+            if (text, locale) not in self.counted_keys:
+                self.counted_keys.add((text, locale))
+                self.hits += 1
+            if entry['used'] != self.generation:
+                entry['used'] = self.generation
+                self.modified = True
+            return list(entry['translations'])
+
+    def contains(self, text, locale):
+        """ Check if a phrase and locale is cached - without counting a hit, or marking it used. """
+        with self.lock:
+            return text in self.backends.get(self.backend_id, {}).get(locale, {})
+
+    def peek(self, text, locale):
+        """ Return the cached translation list for a phrase and locale, or None - without
+            counting a hit, or marking it used. """
+        with self.lock:
+            entry = self.backends.get(self.backend_id, {}).get(locale, {}).get(text)
+            if entry is None:
+                return None
+            return list(entry['translations'])
+
+    def store(self, text, locale, translation_list):
+        """ Add (or replace) the translation list for a phrase and locale. """
+        with self.lock:
+            locale_entries = self.backends.setdefault(self.backend_id, {}).setdefault(locale, {})
+            locale_entries[text] = {'translations':list(translation_list), 'used':self.generation}
+            self.modified = True
+            if (text, locale) not in self.counted_keys:
+                self.counted_keys.add((text, locale))
+                self.misses += 1
+
+    def get_backend_entries(self):
+        """ Get all translation lists, used by this build, as a dictionary:
+            {locale: {text: translation list}} . """
+        backend_entries = {}
+        with self.lock:
+            for locale, locale_entries in self.backends.get(self.backend_id, {}).items():
+                for text, entry in locale_entries.items():
+                    if entry['used'] == self.generation:
+                        backend_entries.setdefault(locale, {})[text] = list(entry['translations'])
+        return backend_entries
+
+    def evict(self):
+        """ Drop the least recently used entries, for all backends, above the size limit. """
+        entry_list = [(entry['used'], backend_id, locale, text)
+                      for backend_id, locales in self.backends.items()
+                      for locale, locale_entries in locales.items()
+                      for text, entry in locale_entries.items()]
+        if len(entry_list) <= self.max_entries:
+            return
+        entry_list.sort()
+        for _, backend_id, locale, text in entry_list[:len(entry_list)-self.max_entries]:
+            locale_entries = self.backends[backend_id][locale]
+            del locale_entries[text]
+            if not locale_entries:
+                del self.backends[backend_id][locale]
+            if not self.backends[backend_id]:
+                del self.backends[backend_id]
+        self.modified = True
+
+    def save(self):
+        """ Atomically replace the cache file - if any entries were added or used. """
+        if self.path is None or not self.modified:
+            return
+        self.evict()
+        directory = os.path.dirname(self.path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        cache_data = {'format':TRANSLATION_CACHE_FORMAT,
+                      'generation':self.generation,
+                      'backends':self.backends}
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, "w", encoding='utf-8') as file_handle:
+                json.dump(cache_data, file_handle, ensure_ascii=False, sort_keys=True)
+                file_handle.flush()
+                os.fsync(file_handle.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        self.modified = False
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3.6
+
+""" Import and export of translation dictionaries, as gettext .po or JSON catalogs,
+    for build_tool.py script """
+
+import json
+import os
+import re
+
+
+def po_escape(text):
+    """ Escape a string for a gettext .po file. """
+    text = text.replace('\\', '\\\\').replace('"', '\\"')
+    return text.replace('\n', '\\n').replace('\t', '\\t')
+
+
+def po_unescape(text):
+    """ Unescape a (quoted) string from a gettext .po file. """
+    escape_dict = {'n':'\n', 't':'\t', '"':'"', '\\':'\\'}
+    return re.sub(r'\\(.)', lambda match: escape_dict.get(match.group(1), match.group(1)), text)
+
+
+def get_catalog_dictionary(translation_dictionary):
+    """ Get all translations, for all (non-English) locales, with sorted entries. """
+    return {locale:{text:translation_dictionary[locale][text]
+                    for text in sorted(translation_dictionary[locale])}
+            for locale in sorted(translation_dictionary)
+            if locale != "en"}
+
+
+def export_json_catalog(path, translation_dictionary):
+    """ Write all translations, for all locales, to a single JSON catalog file:
+        {locale: {text: translation}} . """
+    with open(path, "w", encoding='utf-8') as file_handle:
+        json.dump(get_catalog_dictionary(translation_dictionary), file_handle,
+                  ensure_ascii=False, indent=1, sort_keys=True)
+        file_handle.write("\n")
+
+
+def export_po_catalogs(directory, translation_dictionary):
+    """ Write all translations to a gettext .po file, per locale, in the specified directory. """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    catalog_dictionary = get_catalog_dictionary(translation_dictionary)
+    for locale in catalog_dictionary:
+        file_text = ('msgid ""\n'
+                     'msgstr ""\n'
+                     '"Content-Type: text/plain; charset=UTF-8\\n"\n'
+                     f'"Language: {locale}\\n"\n')
+        for text in catalog_dictionary[locale]:
+            file_text += (f'\nmsgid "{po_escape(text)}"\n'
+                          f'msgstr "{po_escape(catalog_dictionary[locale][text])}"\n')
+        with open(os.path.join(directory, locale+".po"), "w", encoding='utf-8') as file_handle:
+            file_handle.write(file_text)
+
+
+def export_catalog(path, translation_dictionary):
+    """ Export all translations: to a JSON catalog file (path ending .json),
+        or else to a directory of gettext .po files. """
+    if path.endswith(".json"):
+        export_json_catalog(path, translation_dictionary)
+    else:
+        export_po_catalogs(path, translation_dictionary)
+
+
+def read_po_catalog(path):
+    """ Read all (non-fuzzy, translated) entries from a gettext .po file.
+        Returns the language, from the .po file header, and a dictionary of translations. """
+    # pylint: disable=too-many-branches
+    with open(path, "r", encoding='utf-8') as file_handle:
+        line_list = file_handle.read().splitlines()
+    entry_list = []
+    entry = {'fuzzy':False}
+    field = None
+    for line in line_list + [""]:
+        line = line.strip()
+        if (not line or (line.startswith('#') and 'msgid' in entry)
+                or (line.startswith(('msgctxt', 'msgid ')) and 'msgstr' in entry)):
+            if 'msgid' in entry:
+                entry_list += [entry]
+            entry = {'fuzzy':False}
+            field = None
+            if not line:
+                continue
+        if line.startswith('#,') and 'fuzzy' in line:
+            entry['fuzzy'] = True
+        elif line.startswith('#'):
+            continue
+        else:
+            match = re.match(r'^(msgctxt|msgid|msgstr)\s+"(.*)"$', line)
+            if match:
+                field = match.group(1)
+                entry[field] = po_unescape(match.group(2))
+            elif field is not None and re.match(r'^".*"$', line):
+                entry[field] += po_unescape(line[1:-1])
+            else:
+                raise SystemError(f'Invalid line in .po catalog {path}: {line}')
+    language = None
+    translations = {}
+    for entry in entry_list:
+        if entry['msgid'] == "":
+            match = re.search(r'^Language:\s*(\S+)\s*$', entry.get('msgstr', ""),
+                              flags=re.MULTILINE)
+            if match:
+                language = match.group(1)
+        elif entry.get('msgstr') and not entry['fuzzy'] and 'msgctxt' not in entry:
+            translations[entry['msgid']] = entry['msgstr']
+    return language, translations
+
+
+def read_catalog(path):
+    """ Read translations from a JSON catalog file, a gettext .po file or a directory of
+        .po files. Returns a dictionary: {locale: {text: translation}} . """
+    catalog_dictionary = {}
+    try:
+        if os.path.isdir(path):
+            po_path_list = [os.path.join(path, filename) for filename in sorted(os.listdir(path))
+                            if filename.endswith(".po")]
+        elif path.endswith(".json"):
+            with open(path, "r", encoding='utf-8') as file_handle:
+                catalog_dictionary = json.load(file_handle)
+            po_path_list = []
+        else:
+            po_path_list = [path]
+    except ValueError as error:
+        raise SystemError(f'Invalid JSON catalog: {path}') from error
+    except OSError as error:
+        raise SystemError(f'Unable to read translation catalog: {path}') from error
+    for po_path in po_path_list:
+        try:
+            language, translations = read_po_catalog(po_path)
+        except (OSError, UnicodeDecodeError) as error:
+            raise SystemError(f'Unable to read translation catalog: {po_path}') from error
+        if language is None:
+            language = os.path.splitext(os.path.basename(po_path))[0]
+        catalog_dictionary.setdefault(language, {}).update(translations)
+    return catalog_dictionary
+
+
+def import_catalog(path, translation_dictionary):
+    """ Import translations, from a catalog, into the translation dictionary - replacing
+        any existing entries. Only locales already in the translation dictionary are imported.
+        Returns the number of translations imported. """
+    import_count = 0
+    catalog_dictionary = read_catalog(path)
+    for locale in catalog_dictionary:
+        if locale == "en" or locale not in translation_dictionary:
+            continue
+        for text, translation in catalog_dictionary[locale].items():
+            if isinstance(translation, str) and translation:
+                translation_dictionary[locale][text] = translation
+                import_count += 1
+    return import_count
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3.6
+
+""" Translation of all terms and phrases, for build_tool.py script: technical terms are
+    protected (masked with their CRC checksum) from the translation backend, the best of the
+    backend translations is selected - and all translations are planned, fetched in batches and
+    recorded in the translation dictionary. """
+
+import concurrent.futures
+import json
+import os
+import re
+import string
+import global_variables
+from build_state import get_digest
+from term_masking import TermMasker, compile_term_forms, unmask_terms
+from translation_backends import create_translation_backend
+from translation_cache import TranslationCache
+
+CRC_CODE_REGEX = re.compile(r'[0-9]{10,}')
+CRC_CODE_ONLY_REGEX = re.compile(r'^[0-9]{10,}$')
+
+
+def mangle_protected_term(protected_term):
+    """ Mangle a protected technical term - to ensure it is note
+    subject to translation. """
+    mangled_protected_term = ''.join(filter(lambda x:
+                                            x in string.ascii_uppercase, protected_term.upper()))
+    return mangled_protected_term
+
+
+def remove_invalid_translations(translated_text_list):
+    """ Remove translations from a translation list that contain
+    mangled CRC codes. """
+    protected_ids = global_variables.PROTECTED_TERMS_IDS
+    return [translated_text for translated_text in translated_text_list
+            if translated_text != ''
+            and all(match in protected_ids for match in CRC_CODE_REGEX.findall(translated_text))]
+
+
+def find_best_translation(untranslated_text, translated_text_list):
+    """ Accepts a base (English) language string and a source list of translation strings.
+    Filters the list of translated strings returning the one with the least matches
+    against any words from the base (English) language string."""
+    untranslated_word_list = untranslated_text.split(' ')
+    untranslated_word_count = len(untranslated_word_list)
+    untranslated_upper_text = untranslated_text.upper()
+    # Normalise all words once: protected (CRC) words score negatively, in a phrase
+    scored_word_list = []
+    for untranslated_word in untranslated_word_list:
+        untranslated_upper_word = untranslated_word.upper()
+        offset = len(untranslated_word)
+        if (untranslated_upper_word in global_variables.PROTECTED_TERMS_IDS
+                and untranslated_word_count > 1):
+            offset = -offset
+        scored_word_list += [(untranslated_upper_word, offset)]
+    current_score = len(untranslated_text)
+    target_text = ""
+    for translated_text in translated_text_list:
+        translated_text = translated_text.strip()
+        translated_text = translated_text.replace('\"', '')
+        if untranslated_word_count > 1 and CRC_CODE_ONLY_REGEX.search(translated_text):
+            continue
+        translated_upper_text = translated_text.upper()
+        score = 0
+        if translated_upper_text == untranslated_upper_text:
+            score = untranslated_word_count
+        score += abs(translated_text.count(' ')+1 - untranslated_word_count)
+        for untranslated_upper_word, offset in scored_word_list:
+            if untranslated_upper_word in translated_upper_text:
+                score += offset
+        if score < current_score or target_text == "":
+            target_text = translated_text
+            current_score = score
+    return target_text
+
+
+def init_translation_backend(backend_name, catalog_path, latency, timeout):
+    """ Create the translation backend, used for all translations. """
+    global_variables.TRANSLATION_BACKEND = \
+        create_translation_backend(backend_name,
+                                   global_variables.TRANSLATION_BATCH_DELIMITER,
+                                   catalog_path=catalog_path,
+                                   latency=latency,
+                                   timeout=timeout)
+
+
+def export_backend_catalog(path):
+    """ Write all translation backend results, used by this build, as a JSON catalog file
+        - suitable for the offline catalog translation backend. """
+    catalog = global_variables.TRANSLATION_CACHE.get_backend_entries()
+    with open(path, "w", encoding='utf-8') as file_handle:
+        json.dump(catalog, file_handle, ensure_ascii=False, indent=1, sort_keys=True)
+        file_handle.write("\n")
+
+
+def init_translation_cache(cache_directory, refresh_cache):
+    """ Create the translation cache and load all entries - unless these are to be
+        refreshed from the translation backend. Without a cache directory, the cache
+        only holds the backend results for the current build. """
+    cache_path = None
+    if cache_directory is not None:
+        cache_path = os.path.join(cache_directory, global_variables.TRANSLATION_CACHE_FILENAME)
+    translation_cache = TranslationCache(cache_path,
+                                         global_variables.TRANSLATION_BACKEND.identity(),
+                                         global_variables.TRANSLATION_CACHE_MAX_ENTRIES)
+    if not refresh_cache:
+        translation_cache.load()
+    global_variables.TRANSLATION_CACHE = translation_cache
+
+
+def prefetch_translations(text_list, locale):
+    """ Fetch all the text blocks, missing from the translation cache, for the specified
+        locale. Uses batched calls to the translation backend - falling back to single calls
+        for any batch with a malformed result. """
+    translation_backend = global_variables.TRANSLATION_BACKEND
+    translation_cache = global_variables.TRANSLATION_CACHE
+    missing_text_list = [text for text in dict.fromkeys(text_list)
+                         if translation_cache.lookup(text, locale) is None]
+    batch_size = global_variables.TRANSLATION_BATCH_SIZE
+    for index in range(0, len(missing_text_list), batch_size):
+        batch_text_list = missing_text_list[index:index+batch_size]
+        batch_translation_list = None
+        if len(batch_text_list) > 1:
+            batch_translation_list = translation_backend.translate_batch(batch_text_list, locale)
+        if batch_translation_list is None:
+            batch_translation_list = [translation_backend.translate(text, locale)
+                                      for text in batch_text_list]
+        for text, translation_list in zip(batch_text_list, batch_translation_list):
+            translation_cache.store(text, locale, translation_list)
+
+
+def do_translate_text(text, locale):
+    """ Translates a block text for the specified locale.
+        Backend results are served from the translation cache, when available. """
+    translation_cache = global_variables.TRANSLATION_CACHE
+    translation_list = None
+    if translation_cache is not None:
+        translation_list = translation_cache.lookup(text, locale)
+    if translation_list is None:
+        translation_list = global_variables.TRANSLATION_BACKEND.translate(text, locale)
+        if translation_cache is not None:
+            translation_cache.store(text, locale, translation_list)
+    translation_list = remove_invalid_translations(translation_list)
+    translated_text = find_best_translation(text, translation_list)
+    return translated_text
+
+
+def get_backend_text_list(locale, phrase_list):
+    """ Get a list of all the text blocks the translation backend is required to translate,
+        for the specified locale: all terms and phrases - in both plain and protected form. """
+    locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
+    text_list = [unprotected_term for unprotected_term in global_variables.UNPROTECTED_TERMS
+                 if not unprotected_term in locale_dictionary]
+    text_list += [protected_term for protected_term in global_variables.PROTECTED_TERMS_DICT
+                  if not protected_term in locale_dictionary
+                  and not re.search(r'^[A-Z]:$', protected_term)]
+    for phrase in phrase_list:
+        if (phrase in locale_dictionary or phrase in global_variables.PROTECTED_TERMS_DICT
+                or phrase in global_variables.UNPROTECTED_TERMS):
+            continue
+        text_list += [phrase]
+        protected_text, protected_term_list = protect_text(phrase)
+        if protected_term_list:
+            text_list += [protected_text]
+    return list(dict.fromkeys(text_list))
+
+
+def pre_translate_locale_terms(locale):
+    """ Translate a list of non-technical terms that are safe to translate,
+    without affecting their meaning - for a single locale."""
+    locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
+    for unprotected_term in global_variables.UNPROTECTED_TERMS:
+        if unprotected_term in locale_dictionary:
+            continue
+        locale_dictionary[unprotected_term] = do_translate_text(unprotected_term, locale)
+    for protected_term in global_variables.PROTECTED_TERMS_DICT:
+        if protected_term in locale_dictionary:
+            continue
+        if re.search(r'^[A-Z]:$', protected_term):
+            locale_dictionary[protected_term] = protected_term
+        else:
+            locale_dictionary[protected_term] = do_translate_text(protected_term, locale)
+
+
+def pre_translate_terms():
+    """ Translate a list of non-technical terms that are safe to translate,
+    without affecting their meaning."""
+    for locale in global_variables.TRANSLATION_DICTIONARY:
+        if locale == "en":
+            continue
+        pre_translate_locale_terms(locale)
+
+
+def get_protected_term_maskers():
+    """ Get the (cached) maskers to replace all protected technical terms, with their
+        CRC checksums - and to restore these CRC checksums back to the terms. """
+    if global_variables.PROTECTED_TERMS_MASKERS is None:
+        protected_terms_dict = global_variables.PROTECTED_TERMS_DICT
+        global_variables.PROTECTED_TERMS_MASKERS = (
+            TermMasker(protected_terms_dict),
+            TermMasker({protected_terms_dict[protected_term]:protected_term
+                        for protected_term in protected_terms_dict}))
+    return global_variables.PROTECTED_TERMS_MASKERS
+
+
+def get_locale_term_maskers(locale):
+    """ Get the (cached) engines, for a locale, to replace all unprotected terms with their
+        translation - and the compiled forms, to restore all translated protected terms back
+        to these terms. These are rebuilt if any translation of these terms changes. """
+    locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
+    term_key = tuple(locale_dictionary.get(term)
+                     for term in (global_variables.UNPROTECTED_TERMS
+                                  + list(global_variables.PROTECTED_TERMS_DICT)))
+    locale_term_maskers = global_variables.LOCALE_TERMS_MASKERS.get(locale)
+    if locale_term_maskers is None or locale_term_maskers[0] != term_key:
+        unprotected_term_masker = \
+            TermMasker({unprotected_term:locale_dictionary[unprotected_term]
+                        for unprotected_term in global_variables.UNPROTECTED_TERMS
+                        if unprotected_term in locale_dictionary})
+        protected_term_forms = \
+            compile_term_forms({protected_term:[locale_dictionary[protected_term],
+                                                locale_dictionary[protected_term].lower()]
+                                for protected_term in global_variables.PROTECTED_TERMS_DICT
+                                if protected_term in locale_dictionary})
+        locale_term_maskers = (term_key, unprotected_term_masker, protected_term_forms)
+        global_variables.LOCALE_TERMS_MASKERS[locale] = locale_term_maskers
+    return locale_term_maskers[1:]
+
+
+def protect_text(text):
+    """ Replace all protected technical terms, in a phrase, with their CRC checksum.
+        Returns the protected phrase and the list of terms replaced. """
+    return get_protected_term_maskers()[0].mask(text)
+
+
+def unprotect_text(text, protected_term_list):
+    """ Restore the CRC checksums, of the listed protected technical terms, in a phrase. """
+    protected_id_masker = get_protected_term_maskers()[1]
+    match_list = [match for match in protected_id_masker.find(text)
+                  if protected_id_masker.replacement_dict[match[2]] in protected_term_list]
+    return protected_id_masker.replace(text, match_list)
+
+
+def translate_text(text, locale):
+    """ Carry out the translation of a non-english phrase. """
+    # Protect technical terms, we do not want to be translated ...
+    unprotected_term_masker, protected_term_forms = get_locale_term_maskers(locale)
+    translated_text = do_translate_text(text, locale)
+    text, protected_term_list = protect_text(text)
+    if not protected_term_list:
+        protected_translated_text = translated_text
+    else:
+        protected_translated_text = do_translate_text(text, locale)
+    translated_text = unprotected_term_masker.replace(translated_text)
+    protected_translated_text = unprotected_term_masker.replace(protected_translated_text)
+    # ... then convert these terms back.
+    protected_translated_text = unprotect_text(protected_translated_text, protected_term_list)
+    if not protected_term_list:
+        return translated_text
+    restored_text = unmask_terms(translated_text, protected_term_list, protected_term_forms)
+    if restored_text is not None:
+        return restored_text
+    return protected_translated_text
+
+
+def translate_text_lookup(text, locale):
+    """ Translate a phrase or word and return result.
+        Use a dictionary so subsequent lookups are faster."""
+    locale_dictionary = global_variables.TRANSLATION_DICTIONARY[locale]
+    if locale == "en":
+        translated_text = text
+    elif not text in locale_dictionary:
+        translated_text = translate_text(text, locale)
+        locale_dictionary[text] = translated_text
+    else:
+        translated_text = locale_dictionary[text]
+    return translated_text
+
+
+def plan_translations(phrase_list):
+    """ Build the full set of unique (text, locale) translation backend jobs, for all terms
+        and phrases - including the protected term variants translate_text() requires.
+        Returns a dictionary of the text blocks to translate, for each locale. """
+    translation_plan = {}
+    for locale in global_variables.TRANSLATION_DICTIONARY:
+        if locale == "en":
+            continue
+        translation_plan[locale] = get_backend_text_list(locale, phrase_list)
+    return translation_plan
+
+
+def report_translation_plan(phrase_list, translation_plan):
+    """ Print the number of translation jobs, cache hits / misses and backend calls,
+        that a translation plan will incur. """
+    translation_cache = global_variables.TRANSLATION_CACHE
+    batch_size = global_variables.TRANSLATION_BATCH_SIZE
+    job_count = miss_count = call_count = 0
+    for locale in translation_plan:
+        missing_text_list = [text for text in translation_plan[locale]
+                             if not translation_cache.contains(text, locale)]
+        job_count += len(translation_plan[locale])
+        miss_count += len(missing_text_list)
+        call_count += (len(missing_text_list)+batch_size-1)//batch_size
+    print(f'Translation plan: {len(phrase_list)} phrases, {len(translation_plan)} locales,'
+          f' {job_count} jobs - {job_count-miss_count} cache hits, {miss_count} misses,'
+          f' {call_count} backend calls')
+
+
+def translate_locale_phrases(locale, phrase_list, text_list):
+    """ Translate all terms, then all phrases, for a single locale.
+        Each locale dictionary is only ever updated by the one worker processing that locale.
+        All backend translations planned, for the locale, are fetched in batches first. """
+    prefetch_translations(text_list, locale)
+    pre_translate_locale_terms(locale)
+    for phrase in phrase_list:
+        translate_text_lookup(phrase, locale)
+
+
+def translate_all_phrases(phrase_list, translation_plan, jobs):
+    """ Translate all terms and phrases for all locales, using a bounded pool of workers.
+        Work is sharded by locale - so the translation order within a locale is unchanged. """
+    if jobs <= 1:
+        for locale in translation_plan:
+            translate_locale_phrases(locale, phrase_list, translation_plan[locale])
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        future_list = [executor.submit(translate_locale_phrases,
+                                       locale, phrase_list, translation_plan[locale])
+                       for locale in translation_plan]
+        for future in future_list:
+            future.result()
+
+
+def get_phrase_digest(phrase):
+    """ Get the digest of the translations, for all locales, of a phrase. """
+    return get_digest([translate_text_lookup(phrase, locale)
+                       for locale in global_variables.TRANSLATION_DICTIONARY])
+
+
+def get_imported_translations(text_list):
+    """ Get the translations, of a list of terms or phrases, already in the translation
+        dictionary (imported from catalogs) - for each locale. """
+    return {locale:{text:locale_dictionary[text] for text in text_list
+                    if text in locale_dictionary}
+            for locale, locale_dictionary in global_variables.TRANSLATION_DICTIONARY.items()}
+
+
+def get_translation_keys(phrase_list):
+    """ Get the translation inputs known before translating: the backend, locales and terms -
+        used by all phrases - and each phrase, with all translations of these already in the
+        translation dictionary (imported from catalogs).
+        Returns the terms key and a {phrase: phrase key} dictionary. """
+    term_key = [global_variables.TRANSLATION_BACKEND.identity(),
+                list(global_variables.TRANSLATION_DICTIONARY), global_variables.UNPROTECTED_TERMS,
+                global_variables.PROTECTED_TERMS_DICT,
+                get_imported_translations(global_variables.UNPROTECTED_TERMS
+                                          +list(global_variables.PROTECTED_TERMS_DICT))]
+    return term_key, {phrase:get_imported_translations([phrase]) for phrase in phrase_list}
+
+
+def get_cached_translations(text_list):
+    """ Get the cached backend translations, of a list of text blocks, for all locales. """
+    translation_cache = global_variables.TRANSLATION_CACHE
+    return {locale:[translation_cache.peek(text, locale) for text in text_list]
+            for locale in global_variables.TRANSLATION_DICTIONARY if locale != "en"}
+
+
+def get_translation_digests(term_key, phrase_key_dict):
+    """ Get the digest of the translation inputs, of each phrase: those known before
+        translating - and the cached backend translations of all terms, and of the phrase (in
+        both plain and protected form). Returns a {phrase: input digest} dictionary. """
+    term_digest = get_digest([term_key, get_cached_translations(
+        global_variables.UNPROTECTED_TERMS+list(global_variables.PROTECTED_TERMS_DICT))])
+    return {phrase:get_digest([term_digest, phrase_key,
+                               get_cached_translations([phrase, protect_text(phrase)[0]])])
+            for phrase, phrase_key in phrase_key_dict.items()}
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3.6
+
+""" XDG files for build_tool.py script: the translated Wine .desktop launcher files, the
+    menu global file and the Wine menu .directory files. """
+
+import os
+import re
+import sys
+import global_variables
+from build_graph import build_node
+from cache_files import create_mimeinfo_cache, get_mimeinfo_cache_inputs
+from translations import translate_text_lookup
+
+
+def create_translated_xdg_entry(entry, content):
+    """ Generate the specified XDG file entry with multiple translations. """
+    file_text = ""
+    for locale in global_variables.TRANSLATION_DICTIONARY:
+        if locale == "en":
+            file_text += f'{entry}={content}\n'
+        else:
+            translated_text = translate_text_lookup(content, locale)
+            file_text += f'{entry}[{locale}]={translated_text}\n'
+    return file_text
+
+
+def create_xdg_type_entry(file_content):
+    """ Generate a XDG file type entry.
+        Also create exec and terminal entries if specified, if is application. """
+    file_text = ""
+    if file_content["Type"] == "Application":
+        # Exec
+        if "Exec" in file_content:
+            file_text += f'Exec={file_content["Exec"]}\n'
+        # Terminal
+        if "Terminal" in file_content:
+            file_text += f'Terminal={file_content["Terminal"]}\n'
+    # Type
+    file_text += f'Type={file_content["Type"]}\n'
+    return file_text
+
+
+def create_xdg_file(filename, file_content):
+    """ Create xdg desktop file data, for the specified filename.
+        Use a dictionary of elements."""
+    print(f'{filename} ', end='')
+    sys.stdout.flush()
+    file_text = "[Desktop Entry]\n"
+    # Name
+    if "Name" in file_content:
+        file_text += create_translated_xdg_entry("Name", file_content["Name"])
+    # Comment
+    if "Comment" in file_content:
+        file_text += create_translated_xdg_entry("Comment", file_content["Comment"])
+    if "Type" in file_content:
+        file_text += create_xdg_type_entry(file_content)
+    # Icon
+    if "Icon" in file_content:
+        file_text += f'Icon={file_content["Icon"]}\n'
+    # MimeType
+    if "MimeType" in file_content:
+        mime_types = ""
+        for mime_type in file_content["MimeType"]:
+            mime_types += mime_type+";"
+        file_text += f'MimeType={mime_types}\n'
+    # Hidden
+    if "Hidden" in file_content and file_content["Hidden"]:
+        file_text += f'Hidden={file_content["Hidden"]}\n'
+    # NoDisplay
+    if "NoDisplay" in file_content and file_content["NoDisplay"]:
+        file_text += f'NoDisplay={file_content["NoDisplay"]}\n'
+    # Categories
+    if "Categories" in file_content:
+        categories = ""
+        for category in file_content["Categories"]:
+            categories += category+";"
+        file_text += f'Categories={categories}\n'
+    if "StartupWMClass" in file_content:
+        file_text += f'StartupWMClass={file_content["StartupWMClass"]}\n'
+    return file_text.encode('utf-8')
+
+
+def get_xdg_file_inputs(file_content):
+    """ Get the build graph node inputs, of a XDG file: its content, the locales - and the
+        digests of the translations of its Name and Comment. """
+    phrase_digest_dict = global_variables.BUILD_STATE.phrase_digest_dict
+    return [file_content, list(global_variables.TRANSLATION_DICTIONARY),
+            [phrase_digest_dict.get(file_content.get(entry)) for entry in ["Name", "Comment"]]]
+
+
+def get_wine_desktop_file_inputs(directory, desktop_file):
+    """ Get the build graph node inputs, of a Wine .desktop launcher file. """
+    return [directory, desktop_file,
+            get_xdg_file_inputs(global_variables.DESKTOP_FILE_DICT[desktop_file])]
+
+
+def create_wine_desktop_file(directory, desktop_file):
+    """ Create a single Wine .desktop launcher file.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    path = os.path.join(directory, desktop_file+".desktop")
+    return {path: create_xdg_file(os.path.basename(path),
+                                  global_variables.DESKTOP_FILE_DICT[desktop_file])}
+
+
+def create_wine_desktop_files(directory):
+    """ Create all Wine .desktop launcher files - and optionally the MIME type cache.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    output_dict = {}
+    for desktop_file in global_variables.DESKTOP_FILE_DICT:
+        output_dict.update(build_node(f'desktop:{desktop_file}', get_wine_desktop_file_inputs,
+                                      create_wine_desktop_file, directory, desktop_file))
+    if global_variables.MIMEINFO_CACHE:
+        output_dict.update(build_node('mimeinfo', get_mimeinfo_cache_inputs,
+                                      create_mimeinfo_cache, directory))
+    return output_dict
+
+
+def create_menu_file(directory, prefix):
+    """ Generate a menu global file, which references custom Wine application Categories.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    def generate_menu_entry(indent, i, names):
+        """ Helper to add a nested menu entry to menu file """
+        file_text = indent*i+"<Menu>\n"
+        name = re.sub(r'^Wine', r'wine', names[0])
+        name = re.sub(r'^wine\-', r'', name)
+        file_text += indent*(i+1)+"<Name>"+prefix+global_variables.VENDOR_ID+"-"+name+"</Name>\n"
+        directory = prefix.lower()+global_variables.VENDOR_ID+"-"+name+".directory"
+        file_text += indent*(i+1)+"<Directory>"+directory+"</Directory>\n"
+        file_text += indent*(i+1)+"<Include>\n"
+        file_text += indent*(i+2)+"<Category>"+prefix+names[0]+"</Category>\n"
+        file_text += indent*(i+1)+"</Include>\n"
+        if len(names) > 1:
+            file_text += generate_menu_entry(indent, i+1, names[1:])
+        file_text += indent*i+"</Menu>\n"
+        return file_text
+    indent = "  "
+    i = 1
+    entry_type = "Applications"
+    file_text = '<!DOCTYPE Menu PUBLIC "-//freedesktop//DTD Menu 1.0//EN"\n'
+    file_text += ' "http://www.freedesktop.org/standards/menu-spec/menu-1.0.dtd">\n'
+    file_text += '<Menu>\n'+indent+'<Name>'+entry_type+'</Name>\n'
+    file_text += generate_menu_entry(indent, i, global_variables.WINE_DESKTOP_FILES)
+    file_text += "</Menu>\n"
+    path = prefix.lower()+global_variables.VENDOR_ID+".menu"
+    print(f'{path} ', end='')
+    path = os.path.join(directory, path)
+    return {path: file_text.encode('utf-8')}
+
+
+def get_menu_file_inputs(directory, prefix):
+    """ Get the build graph node inputs, of the menu global file. """
+    return [directory, prefix, global_variables.VENDOR_ID, global_variables.WINE_DESKTOP_FILES]
+
+
+def get_desktop_directory_name(desktop_file, prefix):
+    """ Get the (untranslated) Name of a Wine menu .directory file. """
+    name = re.sub(r'.*\-', r'', desktop_file)
+    if desktop_file == "Wine":
+        name = prefix+name
+    return name
+
+
+def get_wine_menu_file_contents(desktop_file, prefix):
+    """ Get the contents of a single Wine menu .directory file. """
+    entry_type = "Directory"
+    icon = 'folder'
+    if desktop_file == "Wine":
+        icon = global_variables.VENDOR_ID
+    name = get_desktop_directory_name(desktop_file, prefix)
+    return {"Name":name, "Type":entry_type, "Icon":icon}
+
+
+def get_wine_menu_file_inputs(directory, prefix, desktop_file):
+    """ Get the build graph node inputs, of a single Wine menu .directory file. """
+    return [directory, prefix, global_variables.VENDOR_ID, desktop_file,
+            get_xdg_file_inputs(get_wine_menu_file_contents(desktop_file, prefix))]
+
+
+def create_wine_menu_file(directory, prefix, desktop_file):
+    """ Create a single Wine menu .directory file.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    desktop_filename = re.sub(r'^Wine', r'wine', desktop_file)
+    desktop_filename = re.sub(r'^wine\-', r'', desktop_filename)
+    desktop_filename = (prefix.lower()+global_variables.VENDOR_ID
+                        +"-"+desktop_filename+".directory")
+    path = os.path.join(directory, desktop_filename)
+    return {path: create_xdg_file(desktop_filename,
+                                  get_wine_menu_file_contents(desktop_file, prefix))}
+
+
+def create_wine_menu_files(directory, prefix):
+    """ Create Wine menu files.
+        Returns a {path (relative to the target directory): data} dictionary. """
+    output_dict = {}
+    for desktop_file in global_variables.WINE_DESKTOP_FILES:
+        output_dict.update(build_node(f'directory:{desktop_file}', get_wine_menu_file_inputs,
+                                      create_wine_menu_file, directory, prefix, desktop_file))
+    return output_dict
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3.6
+
+""" XML backends for build_tool.py script: the standard library ElementTree module (the
+    default) - or lxml, when it is importable. Both backends provide the same (ElementTree)
+    element API - these classes cover the differences in parsing, serializing and namespaces.
+    The output differs (e.g. lxml writes empty elements as "<a/>", not "<a />"). """
+
+import io
+from xml.etree import ElementTree
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+XML_BACKENDS = ['auto', 'lxml', 'etree']
+
+
+class EtreeXmlBackend:
+    """ XML backend, using the standard library ElementTree module. Comments and processing
+        instructions are dropped on parsing. Namespace prefixes are those registered. """
+
+    name = 'etree'
+    module = ElementTree
+
+    def register_namespace(self, prefix, uri):
+        """ Register a namespace prefix, for serialization. """
+        self.module.register_namespace(prefix, uri)
+
+    def parse(self, path):
+        """ Parse an XML file. """
+        return self.module.parse(path)
+
+    def fromstring(self, source_data):
+        """ Parse XML data, returning the root element. """
+        return self.module.fromstring(source_data)
+
+    def get_tree(self, xml_root):
+        """ Get the tree for a root element. """
+        return self.module.ElementTree(xml_root)
+
+    def tostring(self, xml_element):
+        """ Serialize an element (and all its descendants). """
+        return self.module.tostring(xml_element)
+
+    def serialize(self, xml_tree):
+        """ Serialize a tree, as an XML file - us-ascii encoded, with character references. """
+        file_handle = io.BytesIO()
+        xml_tree.write(file_handle)
+        return file_handle.getvalue()
+
+    def cleanup_namespaces(self, xml_root):
+        """ Drop unused namespace declarations - ElementTree only ever writes those used. """
+
+    def dumps(self, xml_root):
+        """ Serialize a root element, as XML (never pickled, so loading it cannot run code) - to
+            be loaded, in another process or from the SVG cache, by loads(). """
+        return self.tostring(xml_root)
+
+    def loads(self, data):
+        """ Load a root element serialized by dumps(). """
+        return self.fromstring(data)
+
+
+class LxmlXmlBackend(EtreeXmlBackend):
+    """ XML backend, using the lxml module. Comments and processing instructions are dropped
+        on parsing, as with ElementTree. Namespace prefixes are those in the source files. """
+
+    name = 'lxml'
+    module = lxml_etree
+
+    def __init__(self):
+        self.parser = self.module.XMLParser(remove_comments=True, remove_pis=True,
+                                            huge_tree=True)
+
+    def register_namespace(self, prefix, uri):
+        """ Register a namespace prefix, for new elements - lxml has no default (empty)
+            prefix registration: the default namespace of each source file is kept. """
+        if prefix:
+            self.module.register_namespace(prefix, uri)
+
+    def parse(self, path):
+        return self.module.parse(path, self.parser)
+
+    def fromstring(self, source_data):
+        return self.module.fromstring(source_data, self.parser)
+
+    def get_tree(self, xml_root):
+        return xml_root.getroottree()
+
+    def serialize(self, xml_tree):
+        return self.module.tostring(xml_tree, encoding='us-ascii', xml_declaration=False)
+
+    def cleanup_namespaces(self, xml_root):
+        self.module.cleanup_namespaces(xml_root)
+
+
+def create_xml_backend(backend_name):
+    """ Create the named XML backend - 'auto' selects lxml, if it is importable. """
+    if backend_name == 'auto':
+        backend_name = 'etree' if lxml_etree is None else 'lxml'
+    if backend_name == 'lxml':
+        if lxml_etree is None:
+            raise SystemError('XML backend lxml is not available: unable to import lxml.etree')
+        return LxmlXmlBackend()
+    if backend_name == 'etree':
+        return EtreeXmlBackend()
+    raise SystemError(f'Unknown XML backend: {backend_name}')